@@ -0,0 +1,828 @@
+"""Zustandsbehaftete Filterstufen der Fahrsteuerung (Lenkung, Motor, Kopf).
+
+Die Stufen enthalten die komplette Signalverarbeitung der Hauptschleife aus
+``tricycle.py``, sind aber frei von Hardware-Abhängigkeiten. Damit lassen sie
+sich auch ohne Gamepad und pigpio mit aufgezeichneten oder synthetischen
+Eingaben durchrechnen und benchmarken::
+
+    python drive_pipeline.py --samples 100000
+    python drive_pipeline.py --mapping
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import sys
+import threading
+import time
+from array import array
+from collections import namedtuple
+from typing import Callable, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_PERIOD_S = 0.02
+DT_MIN_S = 0.001
+DT_MAX_S = 0.05
+TABLE_MAX_ENTRIES = 1 << 17
+PULSE_TABLE_RESOLUTION_DEG = 0.01
+MOTOR_SHAPE_TABLE_STEPS = 4096
+
+# Werkseinstellungen der Filterstufen – einzige Quelle für ``tricycle.py`` (Fahrbetrieb, Replay)
+# und die Benchmarks hier. Schlüssel entsprechen den Parametern der Stufen (ohne ``period_s``).
+STEERING_DEFAULTS = {
+    "left_deg": 80.0,
+    "mid_deg": 135.0,
+    "right_deg": 180.0,
+    "deadzone_in": 0.07,
+    "deadzone_out": 0.10,
+    "expo": 0.50,
+    "smooth_a": 0.20,
+    "rate_deg_s": 150.0,
+    "min_step_deg": 0.02,
+    "neutral_hold_s": 2.0,
+    "center_snap_deg": 0.4,
+    "neutral_snap_s": 0.10,
+    "safe_start_s": 0.8,
+    "arm_neutral_ms": 400,
+    "neutral_thresh": 0.08,
+}
+MOTOR_DEFAULTS = {
+    "deadzone": 0.12,
+    "expo": 0.25,
+    "smooth_a": 0.25,
+    "rate_accel": 3.0,
+    "rate_decel": 3.5,
+    "brake_latch_threshold": 0.05,
+    "brake_rearm_forward_thresh": 0.10,
+    "limit_forward": 0.60,
+    "limit_reverse": 0.50,
+    "safe_start_s": 1.0,
+    "arm_neutral_ms": 500,
+    "neutral_thresh": 0.08,
+}
+HEAD_DEFAULTS = {
+    "left_deg": 55.0,
+    "mid_deg": 90.0,
+    "right_deg": 125.0,
+    "smooth_a": 0.8,
+    "rate_deg_s": 80.0,
+    "safe_start_s": 0.8,
+    "update_hysteresis_deg": 0.2,
+}
+
+
+# --------- Hilfsfunktionen: Mathe/Mapping ---------
+def clamp(x, lo, hi):
+    return lo if x < lo else (hi if x > hi else x)
+
+
+def norm_axis_centered(v, lo, hi):
+    """Zentrierte Achse auf [-1..+1]."""
+    if hi == lo:
+        return 0.0
+    mid = (hi + lo) / 2.0
+    span = (hi - lo) / 2.0
+    return (v - mid) / span
+
+
+def norm_axis_trigger(v, lo, hi):
+    """Trigger (GAS/BRAKE) auf [0..1]."""
+    if hi == lo:
+        return 0.0
+    return clamp((v - lo) / (hi - lo), 0.0, 1.0)
+
+
+def shape_expo(x, expo=0.3):
+    return (1 - expo) * x + (x**3) * expo
+
+
+def axis_to_deg(ax, left_deg, mid_deg, right_deg):
+    """Geformte Achse [-1..+1] → Lenkwinkel, links/rechts getrennt skaliert."""
+    if ax >= 0:
+        span = right_deg - mid_deg
+    else:
+        span = mid_deg - left_deg
+    if span <= 0:
+        return mid_deg
+    return clamp(mid_deg + ax * span, left_deg, right_deg)
+
+
+def shape_motor(y_total, deadzone, expo):
+    """Deadzone und Expo der Motorachse (ohne Zustand)."""
+    if abs(y_total) < deadzone:
+        return 0.0
+    sign = 1 if y_total >= 0 else -1
+    denominator = 1 - deadzone
+    if denominator <= 0.0:
+        # Sicherheitscheck: wenn die Deadzone >= 1 ist, Rohwert verwenden
+        return sign
+    y_eff = (abs(y_total) - deadzone) / denominator
+    return shape_expo(sign * y_eff, expo)
+
+
+def smoothing_factor(alpha, dt, reference_dt=DEFAULT_PERIOD_S):
+    """Rechnet einen pro Takt definierten Glättungsfaktor auf die tatsächliche Schrittweite um."""
+    if alpha <= 0.0 or alpha >= 1.0 or reference_dt <= 0.0:
+        return alpha
+    return 1.0 - (1.0 - alpha) ** (dt / reference_dt)
+
+
+# --------- Filterstufen ---------
+class _Stage:
+    """Gemeinsame Basis: Zeitschritt aus ``now`` ableiten und Batch-Betrieb."""
+
+    def __init__(self, *, period_s=DEFAULT_PERIOD_S):
+        self.period_s = period_s
+        self._last_now = None
+
+    def _advance(self, now):
+        last = self._last_now
+        self._last_now = now
+        if last is None:
+            return DT_MIN_S
+        return max(DT_MIN_S, min(DT_MAX_S, now - last))
+
+    def step(self, inputs, now):  # pragma: no cover - abstrakt
+        raise NotImplementedError
+
+    def run_batch(self, samples: Iterable[Tuple[float, object]]) -> List[object]:
+        """Schickt eine Folge von ``(now, inputs)`` durch die Stufe und liefert alle Ausgaben."""
+        step = self.step
+        return [step(inputs, now) for now, inputs in samples]
+
+
+class SteeringStage(_Stage):
+    """Lenkservo: Arming, Deadzone-Hysterese, Expo, Glättung, Ratenbegrenzung, Mitten-Snap.
+
+    Eingabe ist die normierte (ggf. invertierte) Lenkachse in [-1..+1], Ausgabe der Winkel in Grad.
+    """
+
+    def __init__(
+        self,
+        *,
+        left_deg,
+        mid_deg,
+        right_deg,
+        deadzone_in,
+        deadzone_out,
+        expo,
+        smooth_a,
+        rate_deg_s,
+        min_step_deg,
+        neutral_hold_s,
+        center_snap_deg,
+        neutral_snap_s,
+        safe_start_s,
+        arm_neutral_ms,
+        neutral_thresh,
+        period_s=DEFAULT_PERIOD_S,
+    ):
+        super().__init__(period_s=period_s)
+        self.left_deg = left_deg
+        self.mid_deg = mid_deg
+        self.right_deg = right_deg
+        self.deadzone_in = deadzone_in
+        self.deadzone_out = deadzone_out
+        self.expo = expo
+        self.smooth_a = smooth_a
+        self.rate_deg_s = rate_deg_s
+        self.min_step_deg = min_step_deg
+        self.neutral_hold_s = neutral_hold_s
+        self.center_snap_deg = center_snap_deg
+        self.neutral_snap_s = neutral_snap_s
+        self.safe_start_s = safe_start_s
+        self.arm_neutral_ms = arm_neutral_ms
+        self.neutral_thresh = neutral_thresh
+        self.reset(0.0)
+
+    def set_angles(self, left_deg, mid_deg, right_deg):
+        self.left_deg = left_deg
+        self.mid_deg = mid_deg
+        self.right_deg = right_deg
+
+    def axis_to_deg(self, ax):
+        return axis_to_deg(ax, self.left_deg, self.mid_deg, self.right_deg)
+
+    def reset(self, now):
+        self._last_now = now
+        self.safe_start_until = now + self.safe_start_s
+        self.armed = False
+        self._neutral_since = None
+        self._deadzone_hold = True
+        self._last_active = now
+        self._last_zero = None
+        self.axis_value = 0.0
+        self.target_deg = self.mid_deg
+        self.current_deg = self.mid_deg
+
+    def step(self, x, now, precomputed=None):
+        """Ein Takt; ``precomputed`` = ``(geformt, zielwinkel)`` aus einer ``SteeringTable``."""
+        dt = self._advance(now)
+
+        # Arming
+        if abs(x) <= self.neutral_thresh:
+            if self._neutral_since is None:
+                self._neutral_since = now
+            elif (now - self._neutral_since) * 1000.0 >= self.arm_neutral_ms:
+                self.armed = True
+        else:
+            self._neutral_since = None
+
+        mid = self.mid_deg
+        # Safe-Start / un-armed
+        if now < self.safe_start_until or not self.armed:
+            self.axis_value = 0.0
+            self.target_deg = mid
+        else:
+            ax_abs = abs(x)
+            if self._deadzone_hold:
+                if ax_abs >= self.deadzone_out:
+                    self._deadzone_hold = False
+            elif ax_abs <= self.deadzone_in:
+                self._deadzone_hold = True
+
+            if self._deadzone_hold:
+                shaped = 0.0
+                target_deg = None
+                if self._last_zero is None:
+                    self._last_zero = now
+            elif precomputed is not None:
+                shaped, target_deg = precomputed
+                self._last_zero = None
+            else:
+                shaped = shape_expo(x, self.expo)
+                target_deg = None
+                self._last_zero = None
+
+            self.axis_value = clamp(shaped, -1.0, +1.0)
+            self.target_deg = self.axis_to_deg(self.axis_value) if target_deg is None else target_deg
+            if abs(self.axis_value) > 0.01:
+                self._last_active = now
+
+        # Auto-Zentrierung nach Inaktivität
+        if (now - self._last_active) > self.neutral_hold_s:
+            self.target_deg = mid
+
+        target = self.target_deg
+        current = self.current_deg
+        # Snap auf Mitte
+        if target == mid:
+            if self._last_zero is not None and (now - self._last_zero) >= self.neutral_snap_s:
+                current = mid
+            if abs(current - mid) <= self.center_snap_deg:
+                current = mid
+
+        # Sanftes Nachführen
+        filtered_target = current + (target - current) * smoothing_factor(self.smooth_a, dt, self.period_s)
+        max_step = self.rate_deg_s * dt
+        delta = clamp(filtered_target - current, -max_step, +max_step)
+        if 0 < abs(delta) < self.min_step_deg:
+            delta = self.min_step_deg if delta > 0 else -self.min_step_deg
+        if (current != mid) or (target != mid):
+            current += delta
+        self.current_deg = current
+        return current
+
+
+class MotorStage(_Stage):
+    """Motor: centered + GAS - BRAKE, Brems-Latch, Arming, Deadzone/Expo, Rampen, Limits.
+
+    Eingabe ist ``(y_centered, gas, brake)`` (bereits normiert), Ausgabe die Sollgeschwindigkeit [-1..+1].
+    """
+
+    def __init__(
+        self,
+        *,
+        deadzone,
+        expo,
+        smooth_a,
+        rate_accel,
+        rate_decel,
+        brake_latch_threshold,
+        brake_rearm_forward_thresh,
+        limit_forward,
+        limit_reverse,
+        safe_start_s,
+        arm_neutral_ms,
+        neutral_thresh,
+        period_s=DEFAULT_PERIOD_S,
+    ):
+        super().__init__(period_s=period_s)
+        self.deadzone = deadzone
+        self.expo = expo
+        self.smooth_a = smooth_a
+        self.rate_accel = rate_accel
+        self.rate_decel = rate_decel
+        self.brake_latch_threshold = brake_latch_threshold
+        self.brake_rearm_forward_thresh = brake_rearm_forward_thresh
+        self.limit_forward = limit_forward
+        self.limit_reverse = limit_reverse
+        self.safe_start_s = safe_start_s
+        self.arm_neutral_ms = arm_neutral_ms
+        self.neutral_thresh = neutral_thresh
+        self.reset(0.0)
+
+    def set_limits(self, forward, reverse):
+        self.limit_forward = forward
+        self.limit_reverse = reverse
+
+    def reset(self, now):
+        self._last_now = now
+        self.safe_start_until = now + self.safe_start_s
+        self.armed = False
+        self._neutral_since = None
+        self.brake_latched = False
+        self.target = 0.0
+        self.speed = 0.0
+
+    def step(self, inputs, now, shape: Optional[Callable[[float], float]] = None):
+        """Ein Takt; ``shape`` ersetzt optional die Deadzone/Expo-Berechnung (``MotorShapeTable``)."""
+        y_centered, gas, brake = inputs
+        dt = self._advance(now)
+        forward_intent = max(0.0, y_centered, gas)
+
+        y_total = clamp(y_centered + gas - brake, -1.0, +1.0)
+        if brake >= self.brake_latch_threshold:
+            self.brake_latched = True
+        elif self.brake_latched and forward_intent >= self.brake_rearm_forward_thresh:
+            self.brake_latched = False
+
+        if self.brake_latched and y_total > 0.0:
+            y_total = min(y_total, 0.0)
+
+        # Arming & Deadzone
+        if abs(y_total) <= self.neutral_thresh:
+            if self._neutral_since is None:
+                self._neutral_since = now
+            elif (now - self._neutral_since) * 1000.0 >= self.arm_neutral_ms:
+                self.armed = True
+        else:
+            self._neutral_since = None
+
+        if self.armed:
+            if shape is None:
+                y_shaped = shape_motor(y_total, self.deadzone, self.expo)
+            else:
+                y_shaped = shape(y_total)
+            self.target = clamp(y_shaped, -1.0, +1.0)
+        else:
+            self.target = 0.0
+
+        # Filter + Safe-Start
+        speed = self.speed
+        filtered = speed + (self.target - speed) * smoothing_factor(self.smooth_a, dt, self.period_s)
+        delta_u = filtered - speed
+        max_rate = self.rate_accel if delta_u >= 0 else self.rate_decel
+        max_du = max_rate * dt
+        speed += clamp(delta_u, -max_du, +max_du)
+
+        if now < self.safe_start_until:
+            speed = 0.0
+            self.target = 0.0
+
+        # Limits
+        if speed > 0:
+            speed = min(speed, self.limit_forward)
+        elif speed < 0:
+            speed = max(speed, -self.limit_reverse)
+        self.speed = speed
+        return speed
+
+
+class HeadStage(_Stage):
+    """Kopfservo (latchend): Glättung, Smoothstep-Bewegung mit Maximalrate, Ausgabe-Hysterese.
+
+    Eingabe ist ein neuer Zielwinkel oder ``None`` (Ziel bleibt gelatcht). Ausgabe ist der zu
+    sendende Winkel oder ``None``, solange die Änderung unterhalb der Hysterese bleibt.
+    """
+
+    def __init__(
+        self,
+        *,
+        left_deg,
+        mid_deg,
+        right_deg,
+        smooth_a,
+        rate_deg_s,
+        safe_start_s,
+        update_hysteresis_deg,
+        period_s=DEFAULT_PERIOD_S,
+    ):
+        super().__init__(period_s=period_s)
+        self.left_deg = left_deg
+        self.mid_deg = mid_deg
+        self.right_deg = right_deg
+        self.smooth_a = smooth_a
+        self.rate_deg_s = rate_deg_s
+        self.safe_start_s = safe_start_s
+        self.update_hysteresis_deg = update_hysteresis_deg
+        self.reset(0.0)
+
+    def set_angles(self, left_deg, mid_deg, right_deg):
+        self.left_deg = left_deg
+        self.mid_deg = mid_deg
+        self.right_deg = right_deg
+
+    def accepts_input(self, now):
+        return now >= self.safe_start_until
+
+    def reset(self, now):
+        self._last_now = now
+        self.safe_start_until = now + self.safe_start_s
+        current = clamp(self.mid_deg, self.left_deg, self.right_deg)
+        self.current_deg = current
+        self.target_deg = current
+        self._filtered = current
+        self._motion_start = current
+        self._motion_end = current
+        self._motion_start_ts = now
+        self._motion_duration = 0.0
+        self.last_sent_deg = current
+
+    def step(self, target, now):
+        dt = self._advance(now)
+        if target is not None and now >= self.safe_start_until:
+            self.target_deg = target
+        self.target_deg = clamp(self.target_deg, self.left_deg, self.right_deg)
+        self._filtered += (self.target_deg - self._filtered) * smoothing_factor(self.smooth_a, dt, self.period_s)
+
+        if abs(self._filtered - self._motion_end) > 1e-4:
+            self._motion_start = self.current_deg
+            self._motion_end = self._filtered
+            self._motion_start_ts = now
+            distance = abs(self._motion_end - self._motion_start)
+            if self.rate_deg_s > 0:
+                self._motion_duration = max(distance / self.rate_deg_s, dt)
+            else:
+                self._motion_duration = 0.0
+
+        if self._motion_duration <= 0.0 or abs(self._motion_end - self._motion_start) <= 1e-6:
+            self.current_deg = self._motion_end
+        else:
+            progress = clamp((now - self._motion_start_ts) / self._motion_duration, 0.0, 1.0)
+            eased = progress * progress * (3.0 - 2.0 * progress)
+            self.current_deg = self._motion_start + (self._motion_end - self._motion_start) * eased
+            if progress >= 1.0:
+                self._motion_start = self._motion_end
+                self._motion_duration = 0.0
+
+        if abs(self.current_deg - self.last_sent_deg) >= self.update_hysteresis_deg:
+            self.last_sent_deg = self.current_deg
+            return self.current_deg
+        return None
+
+
+# --------- Lookup-Tabellen ---------
+class AxisTable:
+    """Rohwert einer Achse → normierter Wert, vorberechnet für den ganzen absinfo-Bereich."""
+
+    def __init__(self, lo, hi, *, centered=True, invert=False):
+        self.key = ("axis", lo, hi, centered, invert)
+        self.lo = lo
+        self.hi = hi
+        norm = norm_axis_centered if centered else norm_axis_trigger
+        sign = -1.0 if invert else 1.0
+        self.values = array("d", (sign * norm(raw, lo, hi) for raw in range(lo, hi + 1)))
+
+    def lookup(self, raw):
+        if raw <= self.lo:
+            return self.values[0]
+        if raw >= self.hi:
+            return self.values[-1]
+        return self.values[raw - self.lo]
+
+
+class SteeringTable:
+    """Rohwert der Lenkachse → (x, geformt, Zielwinkel) für Expo und Lenkwinkel einer ``SteeringStage``."""
+
+    def __init__(self, lo, hi, *, invert, expo, left_deg, mid_deg, right_deg):
+        self.key = ("steering", lo, hi, invert, expo, left_deg, mid_deg, right_deg)
+        self.angles = (left_deg, mid_deg, right_deg)
+        self.lo = lo
+        self.hi = hi
+        sign = -1.0 if invert else 1.0
+        xs = array("d")
+        shaped = array("d")
+        degs = array("d")
+        for raw in range(lo, hi + 1):
+            x = sign * norm_axis_centered(raw, lo, hi)
+            value = clamp(shape_expo(x, expo), -1.0, +1.0)
+            xs.append(x)
+            shaped.append(value)
+            degs.append(axis_to_deg(value, left_deg, mid_deg, right_deg))
+        self.x = xs
+        self.shaped = shaped
+        self.deg = degs
+
+    def lookup(self, raw):
+        """Liefert ``(x, (geformt, zielwinkel))`` passend für ``SteeringStage.step``."""
+        idx = raw - self.lo
+        if idx < 0:
+            idx = 0
+        elif raw > self.hi:
+            idx = self.hi - self.lo
+        return self.x[idx], (self.shaped[idx], self.deg[idx])
+
+
+class MotorShapeTable:
+    """Deadzone/Expo der Motorachse über [-1..+1] in ``steps`` Stufen (Abweichung < 1/steps)."""
+
+    def __init__(self, *, deadzone, expo, steps=MOTOR_SHAPE_TABLE_STEPS):
+        self.key = ("motor", deadzone, expo, steps)
+        self._steps = steps
+        self.values = array("d", (shape_motor(idx / steps - 1.0, deadzone, expo) for idx in range(2 * steps + 1)))
+
+    def lookup(self, y_total):
+        idx = int(round((y_total + 1.0) * self._steps))
+        if idx < 0:
+            idx = 0
+        elif idx > 2 * self._steps:
+            idx = 2 * self._steps
+        return self.values[idx]
+
+
+class PulseTable:
+    """Winkel → Servo-Pulsbreite (µs) in Schritten von ``resolution_deg``."""
+
+    def __init__(self, *, us_min, us_max, range_deg, lo_deg=0.0, hi_deg=None,
+                 resolution_deg=PULSE_TABLE_RESOLUTION_DEG):
+        if hi_deg is None:
+            hi_deg = range_deg
+        self.key = ("pulse", us_min, us_max, range_deg, lo_deg, hi_deg, resolution_deg)
+        self.lo_deg = lo_deg
+        self.hi_deg = hi_deg
+        self._scale = 1.0 / resolution_deg
+        self._last = int(round(range_deg * self._scale))
+        span = us_max - us_min
+        values = []
+        for idx in range(self._last + 1):
+            deg = clamp(clamp(idx * resolution_deg, lo_deg, hi_deg), 0.0, range_deg)
+            values.append(int(us_min + span * (deg / range_deg)))
+        self.values = array("i", values)
+
+    def lookup(self, deg):
+        idx = int(deg * self._scale + 0.5)
+        if idx < 0:
+            idx = 0
+        elif idx > self._last:
+            idx = self._last
+        return self.values[idx]
+
+
+MappingTables = namedtuple(
+    "MappingTables",
+    ("steering", "center", "gas", "brake", "motor_shape", "steer_pulse", "head_pulse"),
+)
+EMPTY_TABLES = MappingTables(None, None, None, None, None, None, None)
+
+
+def _reuse_or_build(current, factory, key):
+    if current is not None and current.key == key:
+        return current
+    if key is None:
+        return None
+    return factory()
+
+
+class MappingEngine:
+    """Hält die aktuellen Lookup-Tabellen und tauscht sie bei Änderungen als Ganzes aus.
+
+    Die Regelschleife liest nur ``tables`` (ein unveränderliches Tupel); ``configure``
+    baut fehlende Tabellen neu auf und ersetzt das Tupel in einem Schritt. ``update``
+    ändert einzelne Parameter, ``update_later`` tut dasselbe in einem Hilfsthread – für
+    Aufrufer wie die Regelschleife, die den Neubau (bei 16-Bit-Achsen 65 536 Einträge)
+    nicht abwarten dürfen. Bis das neue Tupel steht, rechnet die Schleife mit den Formeln.
+    Tabellen größer als ``TABLE_MAX_ENTRIES`` werden nicht gebaut (Fallback auf die Formeln).
+    """
+
+    def __init__(self):
+        self.tables = EMPTY_TABLES
+        self.rebuilds = 0
+        self._params = {}
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._worker = None
+
+    def configure(self, **params):
+        with self._lock:
+            self._params = dict(params)
+            return self._build(**params)
+
+    def update(self, **changes):
+        with self._lock:
+            if not self._params:
+                return self.tables
+            self._params.update(changes)
+            return self._build(**self._params)
+
+    def update_later(self, **changes):
+        """Wie ``update``, aber der Neubau läuft im Thread ``mapping-rebuild``; kehrt sofort zurück."""
+        with self._pending_lock:
+            self._pending.update(changes)
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._rebuild_pending, name="mapping-rebuild", daemon=True)
+                self._worker.start()
+
+    def on_steering_angles(self, left, mid, right):
+        """Listener für Lenkwinkeländerungen (``add_steering_angle_listener``)."""
+        self.update_later(steering_angles=(left, mid, right))
+
+    def _rebuild_pending(self):
+        while True:
+            with self._pending_lock:
+                changes = self._pending
+                if not changes:
+                    self._worker = None
+                    return
+                self._pending = {}
+            self.update(**changes)
+
+    def _build(self, *, steering_range=None, steering_invert=False, steering_expo=0.0, steering_angles=None,
+                  center_range=None, center_invert=False, gas_range=None, brake_range=None,
+                  motor_deadzone=None, motor_expo=0.0, us_min=None, us_max=None, range_deg=None):
+        current = self.tables
+
+        def fits(rng):
+            return rng is not None and 0 < rng[1] - rng[0] < TABLE_MAX_ENTRIES
+
+        steering_key = None
+        if fits(steering_range) and steering_angles is not None:
+            steering_key = ("steering", steering_range[0], steering_range[1], steering_invert, steering_expo,
+                            *steering_angles)
+        center_key = ("axis", *center_range, True, center_invert) if fits(center_range) else None
+        gas_key = ("axis", *gas_range, False, False) if fits(gas_range) else None
+        brake_key = ("axis", *brake_range, False, False) if fits(brake_range) else None
+        motor_key = (
+            ("motor", motor_deadzone, motor_expo, MOTOR_SHAPE_TABLE_STEPS) if motor_deadzone is not None else None
+        )
+        pulse_ready = us_min is not None and us_max is not None and range_deg
+        steer_pulse_key = None
+        if pulse_ready and steering_angles is not None:
+            steer_pulse_key = ("pulse", us_min, us_max, range_deg, steering_angles[0], steering_angles[2],
+                               PULSE_TABLE_RESOLUTION_DEG)
+        head_pulse_key = (
+            ("pulse", us_min, us_max, range_deg, 0.0, range_deg, PULSE_TABLE_RESOLUTION_DEG) if pulse_ready else None
+        )
+
+        tables = MappingTables(
+            _reuse_or_build(current.steering, lambda: SteeringTable(
+                steering_range[0], steering_range[1], invert=steering_invert, expo=steering_expo,
+                left_deg=steering_angles[0], mid_deg=steering_angles[1], right_deg=steering_angles[2],
+            ), steering_key),
+            _reuse_or_build(current.center, lambda: AxisTable(*center_range, invert=center_invert), center_key),
+            _reuse_or_build(current.gas, lambda: AxisTable(*gas_range, centered=False), gas_key),
+            _reuse_or_build(current.brake, lambda: AxisTable(*brake_range, centered=False), brake_key),
+            _reuse_or_build(current.motor_shape, lambda: MotorShapeTable(
+                deadzone=motor_deadzone, expo=motor_expo,
+            ), motor_key),
+            _reuse_or_build(current.steer_pulse, lambda: PulseTable(
+                us_min=us_min, us_max=us_max, range_deg=range_deg,
+                lo_deg=steering_angles[0], hi_deg=steering_angles[2],
+            ), steer_pulse_key),
+            _reuse_or_build(current.head_pulse, lambda: PulseTable(
+                us_min=us_min, us_max=us_max, range_deg=range_deg,
+            ), head_pulse_key),
+        )
+        if tables != current:
+            self.rebuilds += 1
+            self.tables = tables
+        return tables
+
+
+# --------- Offline-Benchmark ---------
+def default_stages(period_s=DEFAULT_PERIOD_S):
+    """Stufen mit den Werkseinstellungen (``STEERING_DEFAULTS``, ``MOTOR_DEFAULTS``, ``HEAD_DEFAULTS``)."""
+
+    steering = SteeringStage(**STEERING_DEFAULTS, period_s=period_s)
+    motor = MotorStage(**MOTOR_DEFAULTS, period_s=period_s)
+    head = HeadStage(**HEAD_DEFAULTS, period_s=period_s)
+    return steering, motor, head
+
+
+def synthetic_inputs(samples, *, period_s=DEFAULT_PERIOD_S, seed=1):
+    """Erzeugt reproduzierbare Eingaben: Lenk-Sinus, Gas/Bremse-Wechsel und D-Pad-Kommandos."""
+
+    rng = random.Random(seed)
+    steering: List[Tuple[float, float]] = []
+    motor: List[Tuple[float, Tuple[float, float, float]]] = []
+    head: List[Tuple[float, Optional[float]]] = []
+    head_targets = (55.0, 90.0, 125.0)
+    for idx in range(samples):
+        now = idx * period_s
+        phase = now * 0.7
+        x = 0.0 if now < 1.5 else clamp(math.sin(phase) + rng.uniform(-0.03, 0.03), -1.0, 1.0)
+        gas = 0.0 if now < 1.5 else max(0.0, math.sin(phase * 0.5))
+        brake = max(0.0, -math.sin(phase * 0.5)) if now >= 1.5 else 0.0
+        steering.append((now, x))
+        motor.append((now, (0.0, gas, brake)))
+        head.append((now, head_targets[idx // 150 % 3] if idx % 150 == 0 else None))
+    return steering, motor, head
+
+
+def benchmark(samples=100_000, *, period_s=DEFAULT_PERIOD_S, seed=1, out=sys.stdout):
+    """Misst die reinen Rechenkosten pro Takt für jede Stufe und gibt sie aus."""
+
+    steering_in, motor_in, head_in = synthetic_inputs(samples, period_s=period_s, seed=seed)
+    steering, motor, head = default_stages(period_s)
+    results = {}
+    for name, stage, data in (
+        ("steering", steering, steering_in),
+        ("motor", motor, motor_in),
+        ("head", head, head_in),
+    ):
+        stage.reset(0.0)
+        t0 = time.perf_counter()
+        stage.run_batch(data)
+        elapsed = time.perf_counter() - t0
+        results[name] = elapsed / samples * 1_000_000.0
+        print(f"{name:>9}: {results[name]:7.2f} µs/Takt  ({samples} Samples)", file=out)
+    total = sum(results.values())
+    print(f"{'gesamt':>9}: {total:7.2f} µs/Takt", file=out)
+    return results
+
+
+def benchmark_mapping(samples=100_000, *, axis_range=(-32768, 32767), seed=1, out=sys.stdout):
+    """Vergleicht Formel-Mapping (norm → Expo → Winkel → µs) mit den Lookup-Tabellen."""
+
+    lo, hi = axis_range
+    left, mid, right = 80.0, 135.0, 180.0
+    expo, deadzone, motor_expo = 0.50, 0.12, 0.25
+    us_min, us_max, range_deg = 600, 2400, 270.0
+    rng = random.Random(seed)
+    raws = [rng.randint(lo, hi) for _ in range(samples)]
+
+    t0 = time.perf_counter()
+    engine = MappingEngine()
+    tables = engine.configure(
+        steering_range=axis_range, steering_invert=True, steering_expo=expo,
+        steering_angles=(left, mid, right), center_range=axis_range, center_invert=True,
+        motor_deadzone=deadzone, motor_expo=motor_expo, us_min=us_min, us_max=us_max, range_deg=range_deg,
+    )
+    build_ms = (time.perf_counter() - t0) * 1000.0
+
+    def formula(raw):
+        x = -norm_axis_centered(raw, lo, hi)
+        deg = axis_to_deg(clamp(shape_expo(x, expo), -1.0, 1.0), left, mid, right)
+        us = int(us_min + (us_max - us_min) * (clamp(deg, left, right) / range_deg))
+        motor = shape_motor(-norm_axis_centered(raw, lo, hi), deadzone, motor_expo)
+        return deg, us, motor
+
+    steering_table = tables.steering
+    pulse_table = tables.steer_pulse
+    center_table = tables.center
+    motor_table = tables.motor_shape
+
+    def lookup(raw):
+        _x, (_shaped, deg) = steering_table.lookup(raw)
+        return deg, pulse_table.lookup(deg), motor_table.lookup(center_table.lookup(raw))
+
+    results = {"build_ms": build_ms}
+    outputs = {}
+    for name, func in (("formel", formula), ("tabelle", lookup)):
+        t0 = time.perf_counter()
+        outputs[name] = [func(raw) for raw in raws]
+        results[name] = (time.perf_counter() - t0) / samples * 1_000_000.0
+        print(f"{name:>9}: {results[name]:7.3f} µs/Sample", file=out)
+    max_deg = max(abs(a[0] - b[0]) for a, b in zip(outputs["formel"], outputs["tabelle"]))
+    max_us = max(abs(a[1] - b[1]) for a, b in zip(outputs["formel"], outputs["tabelle"]))
+    max_motor = max(abs(a[2] - b[2]) for a, b in zip(outputs["formel"], outputs["tabelle"]))
+    results.update(max_deg=max_deg, max_us=max_us, max_motor=max_motor)
+    print(f"{'Aufbau':>9}: {build_ms:7.1f} ms  (Bereich {lo}..{hi})", file=out)
+    print(f"{'Abweichung':>9}: Winkel {max_deg:.2e}°, Puls {max_us} µs, Motor {max_motor:.2e}", file=out)
+    return results
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline-Benchmark der Fahrsteuerungs-Filter")
+    parser.add_argument("--samples", type=int, default=100_000, help="Anzahl simulierter Takte.")
+    parser.add_argument("--seed", type=int, default=1, help="Startwert für das Eingangsrauschen.")
+    parser.add_argument(
+        "--period",
+        type=float,
+        default=DEFAULT_PERIOD_S,
+        help="Simulierte Taktperiode in Sekunden.",
+    )
+    parser.add_argument(
+        "--mapping",
+        action="store_true",
+        help="Statt der Filterstufen das Achsen-Mapping (Formel vs. Lookup-Tabellen) messen.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+    if args.samples <= 0:
+        print("--samples muss positiv sein", file=sys.stderr)
+        return 2
+    if args.mapping:
+        benchmark_mapping(args.samples, seed=args.seed)
+        return 0
+    benchmark(args.samples, period_s=args.period, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""Golden-Test: die Filterstufen rechnen wie die frühere Inline-Schleife in ``tricycle.main()``.
+
+Die Referenz unten ist die Mathematik der Hauptschleife vor dem Auslagern in
+``drive_pipeline`` (Lenkung, Motor, Kopf), nur ohne Hardware. Bei festem Takt
+müssen die Stufen dieselben Werte liefern.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from drive_pipeline import (  # noqa: E402
+    DEFAULT_PERIOD_S,
+    HEAD_DEFAULTS,
+    MOTOR_DEFAULTS,
+    STEERING_DEFAULTS,
+    default_stages,
+    synthetic_inputs,
+)
+
+SAMPLES = 1500  # 30 s Fahrt: Safe-Start, Arming, Deadzone, Brems-Latch, Auto-Zentrierung, Kopfwechsel
+
+
+def _clamp(x, lo, hi):
+    return lo if x < lo else (hi if x > hi else x)
+
+
+def _shape_expo(x, expo):
+    return (1 - expo) * x + (x**3) * expo
+
+
+def _reference_loop(steering_in, motor_in, head_in):
+    s = STEERING_DEFAULTS
+    m = MOTOR_DEFAULTS
+    h = HEAD_DEFAULTS
+    mid, left, right = s["mid_deg"], s["left_deg"], s["right_deg"]
+
+    def axis_to_deg_lenkung(ax):
+        span = (right - mid) if ax >= 0 else (mid - left)
+        if span <= 0:
+            return mid
+        return _clamp(mid + ax * span, left, right)
+
+    t0 = steering_in[0][0]
+    safe_start_motor_until = t0 + m["safe_start_s"]
+    safe_start_servo_until = t0 + s["safe_start_s"]
+    safe_start_head_until = t0 + h["safe_start_s"]
+    current_deg = target_deg = mid
+    last_active_ts = t0
+    last_zero_ts = None
+    last_loop_ts = t0
+    in_deadzone_hold = True
+    motor_speed = motor_target = 0.0
+    brake_latched = False
+    motor_armed = steer_armed = False
+    neutral_ok_since_m = neutral_ok_since_s = None
+    head_current = _clamp(h["mid_deg"], h["left_deg"], h["right_deg"])
+    head_target = head_filtered = head_motion_start = head_motion_end = head_last_sent = head_current
+    head_motion_start_ts = t0
+    head_motion_duration = 0.0
+
+    out_steer, out_motor, out_head = [], [], []
+    for (now, x), (_now_m, (y_centered, gas, brake)), (_now_h, head_cmd) in zip(steering_in, motor_in, head_in):
+        dt = max(0.001, min(0.05, now - last_loop_ts))
+        last_loop_ts = now
+
+        if head_cmd is not None and now >= safe_start_head_until:
+            head_target = head_cmd
+
+        # ===== Lenkservo =====
+        if abs(x) <= s["neutral_thresh"]:
+            if neutral_ok_since_s is None:
+                neutral_ok_since_s = now
+            elif (now - neutral_ok_since_s) * 1000.0 >= s["arm_neutral_ms"]:
+                steer_armed = True
+        else:
+            neutral_ok_since_s = None
+        if now < safe_start_servo_until or not steer_armed:
+            target_deg = mid
+        else:
+            ax_abs = abs(x)
+            if in_deadzone_hold:
+                if ax_abs >= s["deadzone_out"]:
+                    in_deadzone_hold = False
+            elif ax_abs <= s["deadzone_in"]:
+                in_deadzone_hold = True
+            if in_deadzone_hold:
+                shaped = 0.0
+                if last_zero_ts is None:
+                    last_zero_ts = now
+            else:
+                shaped = _shape_expo(x, s["expo"])
+                last_zero_ts = None
+            ax_val_servo = _clamp(shaped, -1.0, 1.0)
+            target_deg = axis_to_deg_lenkung(ax_val_servo)
+            if abs(ax_val_servo) > 0.01:
+                last_active_ts = now
+        if (now - last_active_ts) > s["neutral_hold_s"]:
+            target_deg = mid
+        if target_deg == mid:
+            if last_zero_ts is not None and (now - last_zero_ts) >= s["neutral_snap_s"]:
+                current_deg = mid
+            if abs(current_deg - mid) <= s["center_snap_deg"]:
+                current_deg = mid
+        filtered_target = current_deg + (target_deg - current_deg) * s["smooth_a"]
+        max_step = s["rate_deg_s"] * dt
+        delta = _clamp(filtered_target - current_deg, -max_step, max_step)
+        if 0 < abs(delta) < s["min_step_deg"]:
+            delta = s["min_step_deg"] if delta > 0 else -s["min_step_deg"]
+        if current_deg != mid or target_deg != mid:
+            current_deg += delta
+        out_steer.append(current_deg)
+
+        # ===== Motor =====
+        forward_intent = max(max(0.0, y_centered), gas)
+        y_total = _clamp(y_centered + gas - brake, -1.0, 1.0)
+        if brake >= m["brake_latch_threshold"]:
+            brake_latched = True
+        elif brake_latched and forward_intent >= m["brake_rearm_forward_thresh"]:
+            brake_latched = False
+        if brake_latched and y_total > 0.0:
+            y_total = min(y_total, 0.0)
+        if abs(y_total) <= m["neutral_thresh"]:
+            if neutral_ok_since_m is None:
+                neutral_ok_since_m = now
+            elif (now - neutral_ok_since_m) * 1000.0 >= m["arm_neutral_ms"]:
+                motor_armed = True
+        else:
+            neutral_ok_since_m = None
+        if motor_armed:
+            if abs(y_total) < m["deadzone"]:
+                y_shaped = 0.0
+            else:
+                sign = 1 if y_total >= 0 else -1
+                y_eff = (abs(y_total) - m["deadzone"]) / (1 - m["deadzone"])
+                y_shaped = _shape_expo(sign * y_eff, m["expo"])
+            motor_target = _clamp(y_shaped, -1.0, 1.0)
+        else:
+            motor_target = 0.0
+        filtered_motor = motor_speed + (motor_target - motor_speed) * m["smooth_a"]
+        delta_u = filtered_motor - motor_speed
+        max_rate = m["rate_accel"] if delta_u >= 0 else m["rate_decel"]
+        max_du = max_rate * dt
+        motor_speed += _clamp(delta_u, -max_du, max_du)
+        if now < safe_start_motor_until:
+            motor_speed = 0.0
+        if motor_speed > 0:
+            motor_speed = min(motor_speed, m["limit_forward"])
+        elif motor_speed < 0:
+            motor_speed = max(motor_speed, -m["limit_reverse"])
+        out_motor.append(motor_speed)
+
+        # ===== Kopf-Servo (latchend) =====
+        head_target = _clamp(head_target, h["left_deg"], h["right_deg"])
+        head_filtered += (head_target - head_filtered) * h["smooth_a"]
+        if abs(head_filtered - head_motion_end) > 1e-4:
+            head_motion_start = head_current
+            head_motion_end = head_filtered
+            head_motion_start_ts = now
+            distance = abs(head_motion_end - head_motion_start)
+            head_motion_duration = max(distance / h["rate_deg_s"], dt) if h["rate_deg_s"] > 0 else 0.0
+        if head_motion_duration <= 0.0 or abs(head_motion_end - head_motion_start) <= 1e-6:
+            head_current = head_motion_end
+        else:
+            progress = _clamp((now - head_motion_start_ts) / head_motion_duration, 0.0, 1.0)
+            eased = progress * progress * (3.0 - 2.0 * progress)
+            head_current = head_motion_start + (head_motion_end - head_motion_start) * eased
+            if progress >= 1.0:
+                head_motion_start = head_motion_end
+                head_motion_duration = 0.0
+        if abs(head_current - head_last_sent) >= h["update_hysteresis_deg"]:
+            head_last_sent = head_current
+            out_head.append(head_current)
+        else:
+            out_head.append(None)
+
+    return out_steer, out_motor, out_head
+
+
+def _scripted_tail(start, period_s):
+    """Motor-Fälle, die die synthetischen Eingaben nicht treffen: Brems-Latch und harter Richtungswechsel."""
+    phases = (
+        (1.0, (0.0, 0.0, 0.0)),    # neutral: Arming
+        (1.0, (1.0, 0.0, 0.0)),    # Vollgas
+        (0.6, (-1.0, 0.0, 0.0)),   # sofort rückwärts – Verzögerungsrampe
+        (0.6, (0.0, 0.0, 0.0)),
+        (0.4, (0.0, 0.0, 0.5)),    # Bremse tippen – Latch
+        (1.0, (0.09, 0.09, 0.0)),  # leicht vorwärts unter der Rearm-Schwelle – bleibt gesperrt
+        (1.0, (0.0, 0.4, 0.0)),    # Gas über der Schwelle – Latch gelöst
+    )
+    steering, motor, head = [], [], []
+    now = start
+    for duration, inputs in phases:
+        for _ in range(int(round(duration / period_s))):
+            steering.append((now, 0.0))
+            motor.append((now, inputs))
+            head.append((now, None))
+            now += period_s
+    return steering, motor, head
+
+
+@pytest.fixture(scope="module")
+def golden():
+    synthetic = synthetic_inputs(SAMPLES, period_s=DEFAULT_PERIOD_S, seed=7)
+    tail = _scripted_tail(SAMPLES * DEFAULT_PERIOD_S, DEFAULT_PERIOD_S)
+    inputs = tuple(a + b for a, b in zip(synthetic, tail))
+    steering, motor, head = default_stages(DEFAULT_PERIOD_S)
+    stages = (steering.run_batch(inputs[0]), motor.run_batch(inputs[1]), head.run_batch(inputs[2]))
+    return stages, _reference_loop(*inputs)
+
+
+def test_steering_matches_inline_loop(golden):
+    (steer, _motor, _head), (ref, _ref_motor, _ref_head) = golden
+    assert steer == pytest.approx(ref, abs=1e-9)
+    assert len({round(v, 3) for v in ref}) > 10  # Lenkung hat sich tatsächlich bewegt
+
+
+def test_motor_matches_inline_loop(golden):
+    (_steer, motor, _head), (_ref_steer, ref, _ref_head) = golden
+    assert motor == pytest.approx(ref, abs=1e-9)
+    assert max(ref) > 0.0 and min(ref) < 0.0  # vorwärts und rückwärts gefahren
+
+
+def test_head_matches_inline_loop(golden):
+    (_steer, _motor, head), (_ref_steer, _ref_motor, ref) = golden
+    assert [v is None for v in head] == [v is None for v in ref]
+    assert [v for v in head if v is not None] == pytest.approx([v for v in ref if v is not None], abs=1e-9)
+    assert any(v is not None for v in ref)
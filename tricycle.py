@@ -5,6 +5,10 @@
 #   KONFIGURATION (OBEN)
 # =========================
 
+# Werkseinstellungen der Filterstufen (Lenkung, Motor, Kopf) kommen aus drive_pipeline.py,
+# damit Fahrbetrieb, Replay und Benchmark dieselben Werte nutzen. Abweichungen unten eintragen.
+from drive_pipeline import HEAD_DEFAULTS, MOTOR_DEFAULTS, STEERING_DEFAULTS
+
 # ---- Audio & Dateien ----
 DEFAULT_ALSA_DEVICE  = "default"
 HEADPHONE_VOLUME_DEFAULT = 100
@@ -16,6 +20,20 @@ SOUNDBOARD_PORT_MAX = 65535
 WEB_PORT_DEFAULT = 8081
 WEB_PORT_MIN = 1
 WEB_PORT_MAX = 65535
+WEB_EVENTS_KEEPALIVE_S = 15.0                 # Kommentarzeile im Zustands-Stream (/api/events) ohne Änderungen
+WEB_GZIP_ENABLED = True                       # /api/state gzip-komprimiert, wenn der Client es annimmt
+WEB_GZIP_MIN_BYTES = 1024                     # Kleinere Antworten bleiben unkomprimiert
+WEB_SERVER_MODE = "asyncio"                   # "asyncio" (ein Thread, Keep-Alive, SSE ohne Thread pro Client)
+                                              # oder "threading" (fester Worker-Pool; jeder SSE-Client belegt
+                                              # einen Worker, höchstens WEB_MAX_STREAMS, danach Polling)
+WEB_KEEPALIVE_TIMEOUT_S = 30.0                # asyncio: Leerlauf-Timeout für Keep-Alive-Verbindungen
+WEB_MAX_HEADER_BYTES = 64 * 1024              # asyncio: Obergrenze für Request-Zeile plus Header
+WEB_WORKER_THREADS = 8                        # threading: feste Anzahl Worker-Threads
+WEB_ACCEPT_QUEUE_SIZE = 32                    # threading: angenommene Verbindungen, die auf einen Worker warten
+WEB_MAX_STREAMS = 6                           # threading: gleichzeitige SSE-Streams (je ein blockierter Worker; Rest bleibt für Requests frei)
+WEB_MAX_CONNECTIONS_PER_IP = 6                # Offene Verbindungen pro Client-IP (beide Modi)
+WEB_REQUEST_TIMEOUT_S = 10.0                  # Request-Zeile plus Header müssen in dieser Zeit komplett sein (Slow-Loris)
+WEB_IDLE_TIMEOUT_S = 30.0                     # Leerlauf-Timeout beim Lesen des Bodys (threading auch beim Schreiben)
 
 MAX_SOUND_UPLOAD_SIZE = 20 * 1024 * 1024      # 20 MB Upload-Limit für MP3-Dateien
 
@@ -41,7 +59,24 @@ _UNSET = object()
 GAMEPAD_NAME_EXACT   = "8BitDo Ultimate 2 Wireless Controller"
 GAMEPAD_NAME_FALLBACK= "8BitDo Ultimate C 2.4G Wireless Controller"
 WAIT_FOR_DEVICE_S    = 15.0
-GAMEPAD_MAX_MISSING_SERVO_READS = 25  # ca. 0,5s bei 20ms Loopzeit
+INPUT_DEVICE_DIR     = "/dev/input"
+HOTPLUG_INOTIFY_ENABLED = True           # Trennung/Neuverbindung per inotify statt stat() in jedem Takt
+
+# ---- Zusatz-Controller ----
+SECONDARY_GAMEPADS_ENABLED = False       # Weitere Gamepads (z. B. Betreuer) parallel einlesen
+SECONDARY_GAMEPAD_NAMES = (              # Reihenfolge = Priorität (erster Eintrag gewinnt)
+    GAMEPAD_NAME_EXACT,
+    GAMEPAD_NAME_FALLBACK,
+)
+SECONDARY_SCAN_INTERVAL_S = 1.0
+INPUT_ARBITRATION    = "takeover"        # "priority" | "takeover" | "axis"
+INPUT_TAKEOVER_THRESHOLD = 0.25          # Auslenkung, ab der ein Zusatz-Controller übernimmt
+INPUT_TAKEOVER_HOLD_S = 1.0              # So lange behält er die Kontrolle nach der letzten Aktivität
+INPUT_AXIS_OWNERS    = {                 # Nur für "axis": "primary" oder "secondary" je Kanal
+    "steering": "primary",
+    "motor": "secondary",
+    "head": "primary",
+}
 
 BUTTON_LAYOUT_BASE = [
     ("KEY_304", "A Button"),
@@ -92,9 +127,9 @@ US_MIN               = 600
 US_MAX               = 2400
 SERVO_RANGE_DEG      = 270.0
 
-MID_DEG              = 135.0
-LEFT_MAX_DEG         = 80.0
-RIGHT_MAX_DEG        = 180.0
+MID_DEG              = STEERING_DEFAULTS["mid_deg"]
+LEFT_MAX_DEG         = STEERING_DEFAULTS["left_deg"]
+RIGHT_MAX_DEG        = STEERING_DEFAULTS["right_deg"]
 STEERING_STEP_DEG    = 0.5
 
 # Standard-Lenkwinkel als Dictionary für Persistenz/Defaults
@@ -105,20 +140,20 @@ DEFAULT_STEERING_ANGLES = {
 }
 
 INVERT_SERVO         = True
-DEADZONE_IN          = 0.07
-DEADZONE_OUT         = 0.10
-EXPO_SERVO           = 0.50
-SMOOTH_A_SERVO       = 0.20
-RATE_DEG_S           = 150.0
-MIN_STEP_DEG         = 0.02
-NEUTRAL_HOLD_S       = 2.0
-CENTER_SNAP_DEG      = 0.4
-NEUTRAL_SNAP_S       = 0.10
+DEADZONE_IN          = STEERING_DEFAULTS["deadzone_in"]
+DEADZONE_OUT         = STEERING_DEFAULTS["deadzone_out"]
+EXPO_SERVO           = STEERING_DEFAULTS["expo"]
+SMOOTH_A_SERVO       = STEERING_DEFAULTS["smooth_a"]
+RATE_DEG_S           = STEERING_DEFAULTS["rate_deg_s"]
+MIN_STEP_DEG         = STEERING_DEFAULTS["min_step_deg"]
+NEUTRAL_HOLD_S       = STEERING_DEFAULTS["neutral_hold_s"]
+CENTER_SNAP_DEG      = STEERING_DEFAULTS["center_snap_deg"]
+NEUTRAL_SNAP_S       = STEERING_DEFAULTS["neutral_snap_s"]
 
 # Safe-Start Lenkservo
-SERVO_SAFE_START_S   = 0.8
-SERVO_ARM_NEUTRAL_MS = 400
-SERVO_NEUTRAL_THRESH = 0.08
+SERVO_SAFE_START_S   = STEERING_DEFAULTS["safe_start_s"]
+SERVO_ARM_NEUTRAL_MS = STEERING_DEFAULTS["arm_neutral_ms"]
+SERVO_NEUTRAL_THRESH = STEERING_DEFAULTS["neutral_thresh"]
 
 # ---- Motor (Cytron MDD10A) ----
 MOTOR_AXIS_CENTERED_NAME = "ABS_Y"
@@ -142,36 +177,36 @@ MOTOR_DRIVER_CHANNELS = tuple(dict(channel) for channel in DEFAULT_MOTOR_DRIVER_
 PWM_FREQ_HZ          = 20000
 INVERT_MOTOR         = True
 
-DEADZONE_MOTOR       = 0.12
-EXPO_MOTOR           = 0.25
-SMOOTH_A_MOTOR       = 0.25
-RATE_ACCEL_UNITS_S   = 3.0
-RATE_DECEL_UNITS_S   = 3.5
+DEADZONE_MOTOR       = MOTOR_DEFAULTS["deadzone"]
+EXPO_MOTOR           = MOTOR_DEFAULTS["expo"]
+SMOOTH_A_MOTOR       = MOTOR_DEFAULTS["smooth_a"]
+RATE_ACCEL_UNITS_S   = MOTOR_DEFAULTS["rate_accel"]
+RATE_DECEL_UNITS_S   = MOTOR_DEFAULTS["rate_decel"]
 
-BRAKE_LATCH_THRESHOLD      = 0.05
-BRAKE_REARM_FORWARD_THRESH = 0.10
+BRAKE_LATCH_THRESHOLD      = MOTOR_DEFAULTS["brake_latch_threshold"]
+BRAKE_REARM_FORWARD_THRESH = MOTOR_DEFAULTS["brake_rearm_forward_thresh"]
 
-MOTOR_LIMIT_FWD      = 0.60
-MOTOR_LIMIT_REV      = 0.50
+MOTOR_LIMIT_FWD      = MOTOR_DEFAULTS["limit_forward"]
+MOTOR_LIMIT_REV      = MOTOR_DEFAULTS["limit_reverse"]
 MOTOR_LIMIT_MIN      = 0.0
 MOTOR_LIMIT_MAX      = 1.0
 MOTOR_LIMIT_STEP     = 0.01
-MOTOR_SAFE_START_S   = 1.0
-MOTOR_ARM_NEUTRAL_MS = 500
-MOTOR_NEUTRAL_THRESH = 0.08
+MOTOR_SAFE_START_S   = MOTOR_DEFAULTS["safe_start_s"]
+MOTOR_ARM_NEUTRAL_MS = MOTOR_DEFAULTS["arm_neutral_ms"]
+MOTOR_NEUTRAL_THRESH = MOTOR_DEFAULTS["neutral_thresh"]
 MOTOR_DIR_SWITCH_PAUSE_S = 0.015
 
 # ---- Servo 2 (Kopf per D-Pad, LATCHEND) ----
 GPIO_PIN_HEAD_DEFAULT = 24
 GPIO_PIN_HEAD        = GPIO_PIN_HEAD_DEFAULT
-HEAD_LEFT_DEG        = 55.0
-HEAD_CENTER_DEG      = 90.0
-HEAD_RIGHT_DEG       = 125.0
+HEAD_LEFT_DEG        = HEAD_DEFAULTS["left_deg"]
+HEAD_CENTER_DEG      = HEAD_DEFAULTS["mid_deg"]
+HEAD_RIGHT_DEG       = HEAD_DEFAULTS["right_deg"]
 HEAD_STEP_DEG        = 0.5
-HEAD_SMOOTH_A        = 0.8
-HEAD_RATE_DEG_S      = 80.0
-HEAD_SAFE_START_S    = 0.8
-HEAD_UPDATE_HYSTERESIS_DEG = 0.2
+HEAD_SMOOTH_A        = HEAD_DEFAULTS["smooth_a"]
+HEAD_RATE_DEG_S      = HEAD_DEFAULTS["rate_deg_s"]
+HEAD_SAFE_START_S    = HEAD_DEFAULTS["safe_start_s"]
+HEAD_UPDATE_HYSTERESIS_DEG = HEAD_DEFAULTS["update_hysteresis_deg"]
 
 # Standard-Kopfwinkel als Dictionary für Persistenz/Defaults
 DEFAULT_HEAD_ANGLES = {
@@ -189,23 +224,79 @@ DEFAULT_GPIO_SETTINGS = {
     ],
 }
 
+# ---- Regelschleife ----
+LOOP_PERIOD_S        = 0.02                   # Mindesttakt: Filter & Rampen laufen auch ohne Events weiter
+LOOP_EVENT_DRIVEN    = True                   # Schleife wacht per select() sofort bei Gamepad-Events auf
+LOOP_MIN_EVENT_GAP_S = 0.002                  # Untergrenze zwischen zwei eventgetriggerten Durchläufen
+LOOP_PROFILING_ENABLED = True                 # Laufzeit-Histogramme der Schleife unter /api/timing
+MAPPING_TABLES_ENABLED = False                # Achs-/Winkel-/Puls-Mapping über vorberechnete Tabellen
+SETTINGS_QUEUE_SIZE  = 64                     # Max. offene Einstellungsänderungen Web → Regelschleife
+
+# ---- Ausgabe ----
+OUTPUT_BACKEND          = "pigpio"            # "pigpio" (pigpiod), "sysfs" (Kernel-PWM ohne Daemon) oder "memory"
+OUTPUT_SYSFS_PWM_ROOT   = "/sys/class/pwm"
+OUTPUT_SYSFS_GPIO_ROOT  = "/sys/class/gpio"
+OUTPUT_SYSFS_PWM_CHANNELS = {                 # GPIO → (pwmchip, Kanal); nur diese Pins können PWM/Servo
+    12: (0, 0),
+    18: (0, 0),
+    13: (0, 1),
+    19: (0, 1),
+}
+OUTPUT_COALESCE_ENABLED = True                # Unveränderte PWM-/Servowerte nicht erneut an pigpiod senden
+OUTPUT_REFRESH_S        = 1.0                 # Spätestens nach dieser Zeit wird jeder Wert erneut gesendet
+OUTPUT_BATCHING_ENABLED = True                # Alle Ausgaben eines Takts in einem Socket-Write an pigpiod
+
+# ---- Watchdog ----
+WATCHDOG_ENABLED        = True                # Eigener Thread schaltet den Motor ab, wenn die Regelschleife hängt
+WATCHDOG_DEADLINE_S     = 0.25                # Max. Zeit ohne Takt, danach Motor aus und Servos neutral
+WATCHDOG_TRIP_LOG_SIZE  = 50                  # Anzahl gemerkter Auslösungen (unter /api/timing)
+
+# ---- Echtzeitprozess ----
+RT_PROCESS_ENABLED      = False               # Regelschleife in eigenem Prozess (Web/Audio/Batterie bleiben im Hauptprozess)
+RT_CPU_CORE             = 3                   # Exklusiver CPU-Kern für die Regelschleife (None = keine Affinität)
+RT_SCHED_PRIORITY       = 50                  # SCHED_FIFO-Priorität (0 = normales Scheduling)
+RT_LOCK_MEMORY          = True                # mlockall(): keine Pagefaults in der Regelschleife
+RT_TELEMETRY_INTERVAL_S = 0.5                 # Timing-Snapshots vom Echtzeitprozess an den Webserver
+RT_LINK_POLL_S          = 0.05                # Abfrageintervall für Einstellungen im Hauptprozess
+
 # ---- Debug/Output ----
 PRINT_EVERY_S        = 0.3
+DEBUG_PRINT_ENABLED  = False                  # Zustandszeile alle PRINT_EVERY_S auf stdout (blockiert bei langsamer Konsole)
+TELEMETRY_ENABLED    = True                   # Zustand jedes Takts im Ringpuffer, live unter /api/telemetry (SSE)
+TELEMETRY_CAPACITY   = 4096                   # Einträge im Ringpuffer (~80 s bei 50 Hz)
+TELEMETRY_SSE_INTERVAL_S = 0.1                # Sendeintervall des SSE-Streams
+TELEMETRY_SSE_KEEPALIVE_S = 5.0               # Kommentarzeile, wenn keine Daten anfallen (erkennt getrennte Clients)
+TELEMETRY_MAX_DECIMATION = 1000               # Obergrenze für ?decimation=N
 
 
 # =========================
 #   IMPLEMENTIERUNG
 # =========================
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
 import math
+import mmap
+import multiprocessing
 import os
+import queue
 import re
+import select
+import signal
+import struct
 import sys
 import time
 import json
 import threading
 import subprocess
 import io
+import gzip
+import http.client
 import cgi
+from array import array
+from bisect import bisect_right
+from collections import deque, namedtuple
 from functools import lru_cache
 from pathlib import Path
 from types import MappingProxyType
@@ -222,12 +313,21 @@ except Exception as e:
     board = None  # type: ignore
     adafruit_ina260 = None  # type: ignore
 
-from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from http.server import BaseHTTPRequestHandler, HTTPServer
 
-from evdev import InputDevice, ecodes, list_devices
+from evdev import InputDevice, ecodes
 import pigpio
 
-from webui import load_asset
+from drive_pipeline import (
+    HeadStage,
+    MappingEngine,
+    MotorStage,
+    SteeringStage,
+    clamp,
+    norm_axis_centered,
+    norm_axis_trigger,
+)
+from webui import load_encoded_asset, parse_accept_encoding, preload_assets
 
 
 LEGACY_AUDIO_ID_MAP = {}
@@ -1450,6 +1550,19 @@ def persist_steering_angles(angles):
     return _persist_state(payload)
 
 
+_steering_angle_listeners = []
+
+
+def add_steering_angle_listener(callback):
+    """Registriert ``callback(left, mid, right)``; wird nach jeder Änderung der Lenkwinkel aufgerufen."""
+    _steering_angle_listeners.append(callback)
+
+
+def remove_steering_angle_listener(callback):
+    if callback in _steering_angle_listeners:
+        _steering_angle_listeners.remove(callback)
+
+
 def apply_steering_angles(angles):
     sanitized = sanitize_steering_angles(angles)
     if sanitized is None:
@@ -1459,6 +1572,8 @@ def apply_steering_angles(angles):
         LEFT_MAX_DEG = sanitized["left"]
         MID_DEG = sanitized["mid"]
         RIGHT_MAX_DEG = sanitized["right"]
+    for callback in tuple(_steering_angle_listeners):
+        callback(sanitized["left"], sanitized["mid"], sanitized["right"])
     return True
 
 
@@ -1514,6 +1629,7 @@ class BatteryMonitor:
         self._sensor = None
         self._thread = None
         self._error_logged = False
+        self._listeners = []
 
         if board is None or adafruit_ina260 is None:
             print(
@@ -1620,8 +1736,17 @@ class BatteryMonitor:
                         "charging": False,
                         "timestamp": time.time(),
                     }
+            for callback in tuple(self._listeners):
+                try:
+                    callback()
+                except Exception as exc:
+                    print(f"[BatteryMonitor] Fehler im Listener: {exc}", file=sys.stderr)
             self._stop.wait(self._sample_interval)
 
+    def add_listener(self, callback):
+        """``callback()`` wird nach jeder Messung aus dem Monitor-Thread aufgerufen."""
+        self._listeners.append(callback)
+
     def get_state(self):
         with self._lock:
             return dict(self._state)
@@ -1648,6 +1773,189 @@ class BatteryMonitor:
 
 
 # === Websteuerungszustand ===
+# Unveränderlicher, bereits validierter Parametersatz für die Regelschleife.
+ControlParameters = namedtuple(
+    "ControlParameters",
+    (
+        "generation",
+        "motor_limit_forward",
+        "motor_limit_reverse",
+        "head_left",
+        "head_mid",
+        "head_right",
+    ),
+)
+
+_BATTERY_UNAVAILABLE_JSON = b'{"status": "unavailable"}'
+_STREAMS_BUSY_JSON = b'{"status": "busy"}'
+
+# Typisierte Einstellungsänderung; ``values`` ist immer der vollständige neue Wert der Art.
+SettingsChange = namedtuple("SettingsChange", ("kind", "values"))
+SETTINGS_MOTOR_LIMITS = "motor_limits"        # (vorwärts, rückwärts)
+SETTINGS_STEERING_ANGLES = "steering_angles"  # (links, mitte, rechts)
+SETTINGS_HEAD_ANGLES = "head_angles"          # (links, mitte, rechts)
+
+
+class StateEventHub:
+    """Verteilt Änderungen des Web-Zustands an SSE-Abonnenten (``/api/events``).
+
+    Der Zustand ist in Abschnitte (Top-Level-Schlüssel des Snapshots) geteilt. Jede
+    Veröffentlichung mit Änderungen erhöht die Generation; geänderte Abschnitte merken
+    sich diese Generation und ihr fertig serialisiertes JSON-Fragment. Abonnenten schlafen
+    auf einer Condition und holen sich danach nur die Abschnitte, die neuer sind als ihre
+    zuletzt gesehene Generation – serialisiert wird pro Änderung genau einmal.
+
+    Abschnitte aus ``separate_sections`` (Akkuwerte) werden beim Zusammensetzen des
+    Gesamtzustands als eigene Fragmente angehängt, damit ihre häufigen Änderungen den
+    großen Rest nicht neu zusammenfügen.
+    """
+
+    def __init__(self, *, separate_sections=("battery",)):
+        self._cond = threading.Condition()
+        # Event-IDs gelten nur innerhalb eines Programmlaufs
+        self.epoch = format(time.time_ns() & 0xFFFFFFFF, "x")
+        self.generation = 0
+        self._sections = {}
+        self._separate = tuple(separate_sections)
+        self._core_generation = 0
+        self._core_fragment = (None, b"")
+        self._encoded = (None, b"{}")
+        self._encoded_gzip = (None, None)
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """``callback()`` nach jeder neuen Generation (unter dem Hub-Lock – darf nicht blockieren)."""
+        with self._cond:
+            self._listeners.append(callback)
+
+    def publish(self, snapshot):
+        with self._cond:
+            sections = self._sections
+            changed = [
+                (key, value)
+                for key, value in snapshot.items()
+                if key not in sections or sections[key][1] != value
+            ]
+            if not changed:
+                return self.generation
+            self.generation += 1
+            for key, value in changed:
+                encoded = json.dumps(value).encode("utf-8")
+                member = json.dumps(key).encode("utf-8") + b": " + encoded
+                sections[key] = (self.generation, value, member, encoded)
+                if key not in self._separate:
+                    self._core_generation = self.generation
+            self._cond.notify_all()
+            for callback in self._listeners:
+                callback()
+            return self.generation
+
+    def section_generation(self, key):
+        """Generation der letzten Änderung eines Abschnitts (0, wenn es ihn nicht gibt)."""
+        entry = self._sections.get(key)
+        return entry[0] if entry is not None else 0
+
+    def section_bytes(self, key):
+        """Serialisierter Wert eines Abschnitts (geteiltes bytes-Objekt) oder None."""
+        entry = self._sections.get(key)
+        return entry[3] if entry is not None else None
+
+    def wait(self, generation, timeout=None):
+        """Blockiert, bis eine Generation neuer als ``generation`` vorliegt (oder Timeout)."""
+        with self._cond:
+            if self.generation <= generation:
+                self._cond.wait(timeout)
+            return self.generation
+
+    def _members_locked(self, since):
+        return b",".join(
+            member
+            for section_generation, _value, member, _encoded in self._sections.values()
+            if section_generation > since
+        )
+
+    def full(self):
+        """``(generation, json)`` mit allen Abschnitten."""
+        with self._cond:
+            generation = self.generation
+            return generation, b'{"generation":%d,"state":{%s}}' % (generation, self._members_locked(0))
+
+    def delta(self, since):
+        """``(generation, json)`` mit den seit ``since`` geänderten Abschnitten."""
+        with self._cond:
+            generation = self.generation
+            return generation, b'{"generation":%d,"changes":{%s}}' % (generation, self._members_locked(since))
+
+    def encoded(self):
+        """``(generation, bytes)`` des Gesamtzustands; einmal pro Generation gebaut, danach geteilt."""
+        cached = self._encoded
+        if cached[0] == self.generation:
+            return cached
+        with self._cond:
+            generation = self.generation
+            cached = self._encoded
+            if cached[0] == generation:
+                return cached
+            sections = self._sections
+            if self._core_fragment[0] != self._core_generation:
+                self._core_fragment = (
+                    self._core_generation,
+                    b",".join(entry[2] for key, entry in sections.items() if key not in self._separate),
+                )
+            parts = [self._core_fragment[1]] + [sections[key][2] for key in self._separate if key in sections]
+            cached = self._encoded = (generation, b"{" + b",".join(part for part in parts if part) + b"}")
+            return cached
+
+    def encoded_gzip(self):
+        """Wie ``encoded()``, aber gzip-komprimiert (bei Bedarf einmal pro Generation)."""
+        generation, body = self.encoded()
+        cached = self._encoded_gzip
+        if cached[0] == generation:
+            return cached
+        with self._cond:
+            cached = self._encoded_gzip
+            if cached[0] != generation:
+                cached = self._encoded_gzip = (generation, gzip.compress(body, compresslevel=6, mtime=0))
+            return cached
+
+
+class SettingsSubscription:
+    """Begrenzte Warteschlange für ``SettingsChange``-Meldungen an einen Abonnenten.
+
+    ``post()`` darf aus jedem Thread kommen, ``drain()`` ruft nur der Abonnent auf.
+    Läuft die Warteschlange voll, wird sie auf die jeweils letzte Änderung pro Art
+    zusammengefasst – der Endzustand bleibt dabei erhalten.
+    """
+
+    def __init__(self, maxsize=SETTINGS_QUEUE_SIZE):
+        self.maxsize = max(1, int(maxsize))
+        self._lock = threading.Lock()
+        self._pending = deque()
+        self.posted = 0
+        self.coalesced = 0
+
+    def post(self, change):
+        with self._lock:
+            pending = self._pending
+            if len(pending) >= self.maxsize:
+                latest = {}
+                for queued in pending:
+                    latest[queued.kind] = queued
+                self.coalesced += len(pending) - len(latest)
+                pending = self._pending = deque(latest.values())
+            pending.append(change)
+            self.posted += 1
+
+    def drain(self):
+        """Alle offenen Änderungen in Eingangsreihenfolge (leeres Tupel ohne Lock, wenn nichts ansteht)."""
+        if not self._pending:
+            return ()
+        with self._lock:
+            pending = self._pending
+            self._pending = deque()
+        return pending
+
+
 class WebControlState:
     """Thread-sicherer Zustand für Web-Eingaben."""
 
@@ -1738,6 +2046,86 @@ class WebControlState:
         if sanitized_gpio is None:
             sanitized_gpio = sanitize_gpio_settings(DEFAULT_GPIO_SETTINGS)
         self._gpio_settings = sanitized_gpio
+        self._control_parameters = None
+        self._subscribers = []
+        self._publish_control_parameters_locked()
+        self.events = StateEventHub()
+        self._publish_lock = threading.Lock()
+        self.publish_state()
+        if battery_monitor is not None and hasattr(battery_monitor, "add_listener"):
+            battery_monitor.add_listener(self.publish_state)
+
+    def _publish_control_parameters_locked(self):
+        current = self._control_parameters
+        values = (
+            self._motor_limit_forward,
+            self._motor_limit_reverse,
+            float(self._head_angles["left"]),
+            float(self._head_angles["mid"]),
+            float(self._head_angles["right"]),
+        )
+        if current is not None and tuple(current[1:]) == values:
+            return current
+        generation = current.generation + 1 if current is not None else 1
+        # Referenz-Zuweisung ist atomar; Leser brauchen kein Lock.
+        self._control_parameters = ControlParameters(generation, *values)
+        return self._control_parameters
+
+    def get_control_parameters(self):
+        """Aktueller Parametersatz für die Regelschleife (ohne Lock, ohne Kopie)."""
+        return self._control_parameters
+
+    @property
+    def generation(self):
+        """Steigt bei jeder echten Zustandsänderung (einschließlich Akkuwerten) um eins."""
+        return self.events.generation
+
+    def state_etag(self, compressed=False):
+        suffix = "-gz" if compressed else ""
+        return f'"{self.events.epoch}.{self.events.generation}{suffix}"'
+
+    def battery_etag(self):
+        return f'"{self.events.epoch}.b{self.events.section_generation("battery")}"'
+
+    def encoded_state(self, compressed=False):
+        """``(etag, bytes)`` des Gesamtzustands wie bei ``/api/state``; alle Leser teilen dasselbe Objekt."""
+        events = self.events
+        generation, body = events.encoded_gzip() if compressed else events.encoded()
+        suffix = "-gz" if compressed else ""
+        return f'"{events.epoch}.{generation}{suffix}"', body
+
+    def encoded_state_size(self):
+        return len(self.events.encoded()[1])
+
+    def encoded_battery(self):
+        """``(etag, bytes)`` der Akkuwerte; zwischengespeichert pro Akku-Generation."""
+        events = self.events
+        generation = events.section_generation("battery")
+        body = events.section_bytes("battery") or _BATTERY_UNAVAILABLE_JSON
+        return f'"{events.epoch}.b{generation}"', body
+
+    def publish_state(self):
+        """Gibt den aktuellen Snapshot an die SSE-Abonnenten weiter (nur geänderte Abschnitte)."""
+        # Snapshot und Veröffentlichung gemeinsam serialisieren, sonst überholt ein älterer Stand
+        with self._publish_lock:
+            return self.events.publish(self.snapshot())
+
+    def subscribe(self, maxsize=SETTINGS_QUEUE_SIZE):
+        """Neues Abonnement für Änderungen an Motorlimits, Lenk- und Kopfwinkeln."""
+        subscription = SettingsSubscription(maxsize)
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    def _post_changes_locked(self, changes):
+        for subscription in self._subscribers:
+            for change in changes:
+                subscription.post(change)
 
     def _ensure_volume_defaults_locked(self, audio_id):
         profile = get_audio_volume_profile(audio_id)
@@ -1859,7 +2247,9 @@ class WebControlState:
                 changed = True
             if changed:
                 self._last_update = time.time()
-            return changed
+        if changed:
+            self.publish_state()
+        return changed
 
     def _apply_button_action_updates_locked(self, updates):
         if not isinstance(updates, dict) or not updates:
@@ -2128,7 +2518,41 @@ class WebControlState:
                 gamepad_settings_to_persist = {
                     "disconnect_command": self._disconnect_command,
                 }
-            self._last_update = time.time()
+            if motor_limits_to_persist is not None or head_angles_to_persist is not None:
+                self._publish_control_parameters_locked()
+            changes = []
+            if motor_limits_to_persist is not None:
+                changes.append(SettingsChange(
+                    SETTINGS_MOTOR_LIMITS, (self._motor_limit_forward, self._motor_limit_reverse)
+                ))
+            if steering_angles_to_persist is not None:
+                changes.append(SettingsChange(SETTINGS_STEERING_ANGLES, (
+                    float(self._steering_angles["left"]),
+                    float(self._steering_angles["mid"]),
+                    float(self._steering_angles["right"]),
+                )))
+            if head_angles_to_persist is not None:
+                changes.append(SettingsChange(SETTINGS_HEAD_ANGLES, (
+                    float(self._head_angles["left"]),
+                    float(self._head_angles["mid"]),
+                    float(self._head_angles["right"]),
+                )))
+            if changes:
+                self._post_changes_locked(changes)
+            # Nur echte Änderungen stempeln, sonst wechseln Generation und ETag bei jedem No-op-POST
+            if (
+                persist_audio_id is not None
+                or volume_updates
+                or motor_limits_to_persist is not None
+                or steering_angles_to_persist is not None
+                or head_angles_to_persist is not None
+                or gpio_settings_to_persist is not None
+                or sound_settings_to_persist is not None
+                or link_settings_to_persist is not None
+                or gamepad_settings_to_persist is not None
+                or button_actions_to_persist is not None
+            ):
+                self._last_update = time.time()
             snapshot = self.snapshot_locked()
         if persist_audio_id is not None:
             persist_audio_output(persist_audio_id)
@@ -2167,6 +2591,7 @@ class WebControlState:
             apply_audio_output(new_audio_id)
         if apply_volume_change is not None:
             apply_audio_volume(*apply_volume_change)
+        self.publish_state()
         return self._finalize_snapshot(snapshot)
 
     def refresh_sound_files(self):
@@ -2177,6 +2602,7 @@ class WebControlState:
             snapshot = self.snapshot_locked()
         if button_actions_to_persist is not None:
             persist_button_actions(button_actions_to_persist)
+        self.publish_state()
         return self._finalize_snapshot(snapshot)
 
     def snapshot(self):
@@ -2294,15 +2720,132 @@ class WebControlState:
             apply_audio_volume(audio_id, volume_value)
 
 
+# Bausteine der SSE-Streams, gemeinsam für Thread- und asyncio-Server
+SSE_RESPONSE_HEADERS = (
+    ("Content-Type", "text/event-stream"),
+    ("Cache-Control", "no-store"),
+    ("X-Accel-Buffering", "no"),
+)
+SSE_KEEPALIVE = b": keepalive\n\n"
+
+
+def telemetry_decimation(query):
+    try:
+        decimation = int(query.get("decimation", ["1"])[0])
+    except (TypeError, ValueError):
+        decimation = 1
+    return max(1, min(TELEMETRY_MAX_DECIMATION, decimation))
+
+
+def telemetry_meta_event(decimation):
+    meta = {"fields": list(TelemetryRing.FIELDS), "decimation": decimation, "period_s": LOOP_PERIOD_S}
+    return f"event: meta\ndata: {json.dumps(meta)}\n\n".encode("utf-8")
+
+
+def telemetry_data_event(records, dropped):
+    rows = [
+        [values[0], round(values[1], 4), values[2]] + [round(value, 4) for value in values[3:]]
+        for values in records
+    ]
+    payload = json.dumps({"records": rows, "dropped": dropped}, separators=(",", ":"))
+    return f"data: {payload}\n\n".encode("utf-8")
+
+
+def resume_generation(hub, last_event_id):
+    """Generation aus ``Last-Event-ID``; None, wenn der Client den vollen Zustand braucht."""
+    epoch, _sep, last_generation = (last_event_id or "").partition(".")
+    if epoch != hub.epoch:
+        return None
+    try:
+        seen = int(last_generation)
+    except ValueError:
+        return None
+    return seen if 0 < seen <= hub.generation else None
+
+
+def state_event(hub, kind, generation, payload):
+    return b"event: %s\nid: %s.%d\ndata: %s\n\n" % (kind, hub.epoch.encode("ascii"), generation, payload)
+
+
+class _DeadlineReader:
+    """Lese-Wrapper für ``rfile``: bis ``clear_deadline()`` gilt eine Gesamtfrist statt eines Timeouts pro Read.
+
+    Ein Slow-Loris-Client, der alle paar Sekunden ein Byte schickt, kommt so nicht über
+    ``WEB_REQUEST_TIMEOUT_S`` hinaus. Danach (Body, Upload) gilt der normale Socket-Timeout.
+    """
+
+    def __init__(self, raw, sock, deadline, *, idle_timeout=None, on_timeout=None):
+        self._raw = raw
+        self._sock = sock
+        self._deadline = deadline
+        self._idle_timeout = idle_timeout
+        self._on_timeout = on_timeout
+
+    def clear_deadline(self):
+        if self._deadline is not None:
+            self._deadline = None
+            self._sock.settimeout(self._idle_timeout)
+
+    def _call(self, method, size):
+        if self._deadline is not None:
+            remaining = self._deadline - time.monotonic()
+            if remaining <= 0.0:
+                self._timed_out()
+                raise TimeoutError("Request-Header nicht rechtzeitig vollständig")
+            self._sock.settimeout(remaining)
+        try:
+            return method(size)
+        except TimeoutError:
+            self._timed_out()
+            raise
+
+    def _timed_out(self):
+        if self._on_timeout is not None:
+            self._on_timeout()
+
+    def readline(self, size=-1):
+        return self._call(self._raw.readline, size)
+
+    def read(self, size=-1):
+        return self._call(self._raw.read, size)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
 class ControlRequestHandler(BaseHTTPRequestHandler):
     """HTTP-Endpunkte für die Websteuerung."""
 
     control_state = None  # wird beim Start gesetzt
+    loop_profiler = None  # optional, liefert /api/timing
+    telemetry = None  # optional, TelemetryRing für /api/telemetry
+    timeout = WEB_IDLE_TIMEOUT_S  # Socket-Timeout (StreamRequestHandler)
+    request_timeout = WEB_REQUEST_TIMEOUT_S
 
     CONTROL_PAGE_NAME = "control.html"
     SETTINGS_PAGE_NAME = "settings.html"
     BATTERY_PAGE_NAME = "battery.html"
     MORE_SETTINGS_PAGE_NAME = "more_settings.html"
+    PAGE_NAMES = (CONTROL_PAGE_NAME, SETTINGS_PAGE_NAME, BATTERY_PAGE_NAME, MORE_SETTINGS_PAGE_NAME)
+
+    def setup(self):
+        super().setup()
+        if self.request_timeout:
+            self.rfile = _DeadlineReader(
+                self.rfile,
+                self.connection,
+                time.monotonic() + self.request_timeout,
+                idle_timeout=self.timeout,
+                on_timeout=getattr(self.server, "note_timeout", None),
+            )
+
+    def parse_request(self):
+        ok = super().parse_request()
+        # Header sind vollständig gelesen – ab hier gilt nur noch der Socket-Timeout
+        if isinstance(self.rfile, _DeadlineReader):
+            self.rfile.clear_deadline()
+        return ok
+
     def _write_response(self, status, body, content_type="text/html; charset=utf-8"):
         encoded = body.encode("utf-8")
         self.send_response(status)
@@ -2330,6 +2873,148 @@ class ControlRequestHandler(BaseHTTPRequestHandler):
         if data:
             self.wfile.write(data)
 
+    def _etag_matches(self, etag):
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        candidates = [candidate.strip() for candidate in header.split(",")]
+        return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+    def _write_not_modified(self, etag):
+        self.send_response(304)
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+
+    def _accepts_gzip(self):
+        return parse_accept_encoding(self.headers.get("Accept-Encoding")).get("gzip", 0.0) > 0.0
+
+    def _write_asset(self, name):
+        """Statische Seite aus dem vorkomprimierten Cache, mit ETag und 304."""
+        asset = load_encoded_asset(name)
+        encoding, body = asset.select(self.headers.get("Accept-Encoding"))
+        etag = asset.etag(encoding)
+        if self._etag_matches(etag):
+            self._write_not_modified(etag)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        # Browser darf cachen, fragt aber jedes Mal per If-None-Match nach
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_encoded_json(self, etag, body, *, compressed=False):
+        """Bereits serialisierte JSON-Bytes mit ETag senden (``body`` wird nicht kopiert)."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Vary", "Accept-Encoding")
+        self.send_header("ETag", etag)
+        # Immer revalidieren, aber Antworten dürfen mit ETag zwischengespeichert werden
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _acquire_stream(self):
+        """Reserviert einen Stream-Platz beim Server; sonst 503, der Browser weicht auf Polling aus."""
+        acquire = getattr(self.server, "acquire_stream", None)
+        if acquire is None or acquire():
+            return True
+        self.send_response(503)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(_STREAMS_BUSY_JSON)))
+        self.send_header("Retry-After", "5")
+        self.end_headers()
+        self.wfile.write(_STREAMS_BUSY_JSON)
+        return False
+
+    def _release_stream(self):
+        release = getattr(self.server, "release_stream", None)
+        if release is not None:
+            release()
+
+    def _start_event_stream(self):
+        self.send_response(200)
+        for name, value in SSE_RESPONSE_HEADERS:
+            self.send_header(name, value)
+        self.end_headers()
+        self.close_connection = True
+
+    def _stream_telemetry(self, query):
+        """Server-Sent Events mit den Telemetrie-Einträgen, jede ``decimation``-te Zeile."""
+        ring = self.telemetry
+        if ring is None:
+            self._write_json_response(503, {"status": "unavailable"})
+            return
+        decimation = telemetry_decimation(query)
+        if not self._acquire_stream():
+            return
+        try:
+            self._start_event_stream()
+            cursor = ring.head
+            last_sent = time.monotonic()
+            self.wfile.write(telemetry_meta_event(decimation))
+            self.wfile.flush()
+            while True:
+                time.sleep(TELEMETRY_SSE_INTERVAL_S)
+                cursor, records, dropped = ring.read_since(cursor, decimation)
+                now = time.monotonic()
+                if records or dropped:
+                    self.wfile.write(telemetry_data_event(records, dropped))
+                elif now - last_sent >= TELEMETRY_SSE_KEEPALIVE_S:
+                    self.wfile.write(SSE_KEEPALIVE)
+                else:
+                    continue
+                self.wfile.flush()
+                last_sent = now
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            return
+        finally:
+            self._release_stream()
+
+    def _stream_events(self):
+        """Server-Sent Events: erst der volle Zustand, danach nur geänderte Abschnitte.
+
+        Die Event-ID ist ``<lauf>.<generation>``; nach einem Verbindungsabbruch schickt der
+        Browser sie als ``Last-Event-ID`` und bekommt nur die Änderungen seitdem.
+        """
+        state = self.control_state
+        if state is None:
+            self._write_json_response(503, {"status": "unavailable"})
+            return
+        hub = state.events
+        seen = resume_generation(hub, self.headers.get("Last-Event-ID"))
+        if not self._acquire_stream():
+            return
+        try:
+            self._start_event_stream()
+            if seen is None:
+                seen, payload = hub.full()
+                self.wfile.write(state_event(hub, b"state", seen, payload))
+                self.wfile.flush()
+            while True:
+                generation = hub.wait(seen, WEB_EVENTS_KEEPALIVE_S)
+                if generation <= seen:
+                    self.wfile.write(SSE_KEEPALIVE)
+                else:
+                    generation, payload = hub.delta(seen)
+                    self.wfile.write(state_event(hub, b"delta", generation, payload))
+                    seen = generation
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError, OSError):
+            return
+        finally:
+            self._release_stream()
+
     def _write_json_response(self, status, payload):
         body = json.dumps(payload)
         self._write_response(status, body, "application/json")
@@ -2499,30 +3184,61 @@ class ControlRequestHandler(BaseHTTPRequestHandler):
             self._write_redirect(target)
             return
         if self.path == "/":
-            self._write_response(200, load_asset(self.CONTROL_PAGE_NAME))
+            self._write_asset(self.CONTROL_PAGE_NAME)
             return
         if self.path == "/settings":
-            self._write_response(200, load_asset(self.SETTINGS_PAGE_NAME))
+            self._write_asset(self.SETTINGS_PAGE_NAME)
             return
         if self.path == "/more-settings":
-            self._write_response(200, load_asset(self.MORE_SETTINGS_PAGE_NAME))
+            self._write_asset(self.MORE_SETTINGS_PAGE_NAME)
             return
         if self.path == "/battery":
-            self._write_response(200, load_asset(self.BATTERY_PAGE_NAME))
+            self._write_asset(self.BATTERY_PAGE_NAME)
+            return
+        if path_only == "/api/events":
+            self._stream_events()
             return
         if self.path.startswith("/api/state"):
-            state = self.control_state.snapshot() if self.control_state else {}
-            body = json.dumps(state)
-            self._write_response(200, body, "application/json")
+            if not self.control_state:
+                self._write_response(200, json.dumps({}), "application/json")
+                return
+            state = self.control_state
+            compressed = (
+                WEB_GZIP_ENABLED and self._accepts_gzip() and state.encoded_state_size() >= WEB_GZIP_MIN_BYTES
+            )
+            etag = state.state_etag(compressed)
+            if self._etag_matches(etag):
+                self._write_not_modified(etag)
+                return
+            etag, body = state.encoded_state(compressed)
+            self._write_encoded_json(etag, body, compressed=compressed)
             return
         if self.path.startswith("/api/battery"):
-            payload = {"status": "unavailable"}
-            if self.control_state:
-                state = self.control_state.get_battery_state()
-                if state:
-                    payload = state
-            body = json.dumps(payload)
-            self._write_response(200, body, "application/json")
+            if not self.control_state:
+                self._write_response(200, json.dumps({"status": "unavailable"}), "application/json")
+                return
+            etag = self.control_state.battery_etag()
+            if self._etag_matches(etag):
+                self._write_not_modified(etag)
+                return
+            etag, body = self.control_state.encoded_battery()
+            self._write_encoded_json(etag, body)
+            return
+        if self.path.startswith("/api/timing"):
+            if not self.loop_profiler:
+                self._write_json_response(503, {"status": "unavailable"})
+                return
+            self._write_json_response(200, self.loop_profiler.snapshot())
+            return
+        if self.path.startswith("/api/telemetry"):
+            self._stream_telemetry(parse_qs(parsed.query))
+            return
+        if self.path.startswith("/api/webserver"):
+            stats = getattr(self.server, "stats", None)
+            if stats is None:
+                self._write_json_response(503, {"status": "unavailable"})
+                return
+            self._write_json_response(200, stats())
             return
         if self.path.startswith("/api/sound-preview"):
             if not self.control_state:
@@ -2552,6 +3268,21 @@ class ControlRequestHandler(BaseHTTPRequestHandler):
         if self.path == "/api/sounds/upload":
             self._handle_sound_upload()
             return
+        if self.path == "/api/timing/reset":
+            if not self.loop_profiler:
+                self._write_json_response(503, {"status": "unavailable"})
+                return
+            self.loop_profiler.reset()
+            self._write_json_response(200, {"status": "ok"})
+            return
+        if self.path == "/api/webserver/reset":
+            reset = getattr(self.server, "reset_stats", None)
+            if reset is None:
+                self._write_json_response(503, {"status": "unavailable"})
+                return
+            reset()
+            self._write_json_response(200, {"status": "ok"})
+            return
         if not self.path.startswith("/api/control"):
             self._write_response(404, "Not found", "text/plain; charset=utf-8")
             return
@@ -2595,17 +3326,478 @@ class ControlRequestHandler(BaseHTTPRequestHandler):
         return
 
 
-def start_webserver(state, port=WEB_PORT_DEFAULT):
-    """Startet den HTTP-Server für die Websteuerung."""
+class _BufferedRequest(ControlRequestHandler):
+    """``ControlRequestHandler`` ohne Socket: liest aus einem Puffer, schreibt in einen Puffer.
+
+    Damit bedient der asyncio-Server dieselben Routen wie der Thread-Server, ohne sie zu
+    duplizieren. Antworten tragen immer ``Content-Length`` und laufen über HTTP/1.1.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def __init__(self, command, path, request_version, headers, body, client_address, close_connection,
+                 server=None):
+        # BaseHTTPRequestHandler.__init__ würde sofort vom Socket lesen
+        self.server = server
+        self.command = command
+        self.path = path
+        self.request_version = request_version
+        self.requestline = f"{command} {path} {request_version}"
+        self.headers = headers
+        self.client_address = client_address
+        self.close_connection = close_connection
+        self.rfile = io.BytesIO(body)
+        self.wfile = io.BytesIO()
+
+    def run(self):
+        """Führt den Request aus und liefert die komplette Antwort als bytes."""
+        method = getattr(self, f"do_{self.command}", None)
+        if method is None:
+            self.send_error(501, f"Unsupported method ({self.command!r})")
+        else:
+            method()
+        return self.wfile.getvalue()
+
+
+class BoundedHTTPServer(HTTPServer):
+    """HTTP-Server mit festem Worker-Pool, begrenzter Accept-Queue und Verbindungslimit pro IP.
+
+    Der Accept-Thread (``serve_forever``) reiht Verbindungen nur ein; abgearbeitet werden sie
+    von ``workers`` Threads. Ist die Queue voll oder hat die IP schon zu viele Verbindungen
+    offen, bekommt der Client sofort 503 statt eines neuen Threads. SSE-Streams belegen
+    höchstens ``max_streams`` Worker, damit normale Requests immer durchkommen.
+    """
+
+    REJECT_RESPONSE = (
+        b"HTTP/1.0 503 Service Unavailable\r\nRetry-After: 1\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+    )
+    QUEUE_WAIT_EDGES_US = (100, 1000, 5000, 10000, 50000, 100000, 250000, 500000, 1000000, 5000000)
+
+    def __init__(self, address, handler, *, workers=WEB_WORKER_THREADS, queue_size=WEB_ACCEPT_QUEUE_SIZE,
+                 max_streams=WEB_MAX_STREAMS, per_ip=WEB_MAX_CONNECTIONS_PER_IP):
+        self.request_queue_size = queue_size  # listen()-Backlog, vor dem Binden setzen
+        super().__init__(address, handler)
+        self._pending = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._workers = int(workers)
+        self._max_streams = int(max_streams)
+        self._per_ip_limit = int(per_ip)
+        self._per_ip = {}
+        self.busy = 0
+        self.streams = 0
+        self.queue_wait = TimingHistogram(self.QUEUE_WAIT_EDGES_US)
+        self.reset_stats()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"web-worker-{idx}", daemon=True)
+            for idx in range(self._workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def reset_stats(self):
+        with self._lock:
+            self.peak_busy = self.busy
+            self.peak_queue = 0
+            self.accepted = 0
+            self.saturated = 0
+            self.timeouts = 0
+            self.rejected = {"queue_full": 0, "per_ip": 0, "streams": 0}
+            self.queue_wait.reset()
+
+    def process_request(self, request, client_address):
+        # Läuft im Accept-Thread: nur einreihen, nie blockieren
+        ip = client_address[0]
+        with self._lock:
+            if self._per_ip.get(ip, 0) >= self._per_ip_limit:
+                self.rejected["per_ip"] += 1
+            else:
+                try:
+                    self._pending.put_nowait((request, client_address, time.monotonic()))
+                except queue.Full:
+                    self.rejected["queue_full"] += 1
+                else:
+                    self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+                    self.accepted += 1
+                    if self.busy >= self._workers:
+                        self.saturated += 1
+                    depth = self._pending.qsize()
+                    if depth > self.peak_queue:
+                        self.peak_queue = depth
+                    return
+        # Kein Log pro Ablehnung (Portscanner würden die Konsole fluten) – Zähler in stats()
+        try:
+            request.settimeout(0.5)
+            request.sendall(self.REJECT_RESPONSE)
+        except OSError:
+            pass
+        self.shutdown_request(request)
+
+    def _worker(self):
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            request, client_address, queued_at = item
+            with self._lock:
+                self.queue_wait.add(time.monotonic() - queued_at)
+                self.busy += 1
+                if self.busy > self.peak_busy:
+                    self.peak_busy = self.busy
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+                ip = client_address[0]
+                with self._lock:
+                    self.busy -= 1
+                    remaining = self._per_ip.get(ip, 1) - 1
+                    if remaining > 0:
+                        self._per_ip[ip] = remaining
+                    else:
+                        self._per_ip.pop(ip, None)
+
+    def handle_error(self, request, client_address):
+        exc = sys.exc_info()[1]
+        if isinstance(exc, OSError):
+            # Timeouts und abgebrochene Verbindungen sind im Betrieb normal
+            return
+        print(f"[Web] Fehler bei Anfrage von {client_address[0]}: {exc!r}", file=sys.stderr)
+
+    def note_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def acquire_stream(self):
+        with self._lock:
+            if self.streams >= self._max_streams:
+                self.rejected["streams"] += 1
+                return False
+            self.streams += 1
+            return True
+
+    def release_stream(self):
+        with self._lock:
+            self.streams -= 1
+
+    def server_close(self):
+        super().server_close()
+        for _ in self._threads:
+            try:
+                self._pending.put_nowait(None)
+            except queue.Full:
+                break
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": "threading",
+                "workers": self._workers,
+                "busy": self.busy,
+                "peak_busy": self.peak_busy,
+                "utilization": round(self.busy / self._workers, 3) if self._workers else None,
+                "queue_depth": self._pending.qsize(),
+                "queue_size": self._pending.maxsize,
+                "peak_queue": self.peak_queue,
+                "queue_wait": self.queue_wait.snapshot(),
+                "streams": self.streams,
+                "max_streams": self._max_streams,
+                "clients": len(self._per_ip),
+                "max_connections_per_ip": self._per_ip_limit,
+                "accepted": self.accepted,
+                "saturated": self.saturated,
+                "timeouts": self.timeouts,
+                "rejected": dict(self.rejected),
+            }
+
+
+class AsyncWebServer:
+    """Websteuerung auf asyncio: ein Thread, HTTP/1.1 Keep-Alive, SSE ohne Thread pro Client.
+
+    Normale Routen laufen über ``ControlRequestHandler`` (``_BufferedRequest``); schnelle
+    GET-Antworten direkt im Event-Loop, alles mit Datei- oder Prozesszugriff (POST,
+    Soundvorschau) im Executor. ``/api/events`` und ``/api/telemetry`` sind nativ
+    asynchron. Nach außen wie ``BoundedHTTPServer``: ``shutdown()``, ``server_close()``, ``stats()``.
+    """
+
+    BLOCKING_GET_PREFIXES = ("/api/sound-preview",)
+
+    def __init__(self, port, *, state=None, telemetry=None):
+        self.port = port
+        self.state = state
+        self.telemetry = telemetry
+        self._loop = None
+        self._stop = None
+        self._thread = None
+        self._started = threading.Event()
+        self._startup_error = None
+        self._state_changed = None
+        self._per_ip = {}
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.connections = 0
+        self.requests = 0
+        self.timeouts = 0
+        self.rejected = {"per_ip": 0}
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="web-control", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        if self._startup_error is not None:
+            raise self._startup_error
+        return self
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as exc:
+            if not self._started.is_set():
+                self._startup_error = exc
+                self._started.set()
+            else:
+                print(f"[Web] asyncio-Server beendet: {exc}", file=sys.stderr)
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = self._loop.create_future()
+        self._state_changed = asyncio.Event()
+        server = await asyncio.start_server(
+            self._handle_connection, "0.0.0.0", self.port, reuse_address=True, limit=WEB_MAX_HEADER_BYTES
+        )
+        if self.state is not None:
+            loop = self._loop
+            self.state.events.add_listener(lambda: loop.call_soon_threadsafe(self._wake_state_waiters))
+        self._started.set()
+        async with server:
+            await self._stop
+
+    def _wake_state_waiters(self):
+        event = self._state_changed
+        self._state_changed = asyncio.Event()
+        event.set()
+
+    def shutdown(self):
+        loop = self._loop
+        if loop is not None and self._stop is not None:
+            loop.call_soon_threadsafe(lambda: self._stop.done() or self._stop.set_result(None))
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    def server_close(self):
+        # Socket wird beim Verlassen von ``async with server`` geschlossen
+        return None
+
+    def stats(self):
+        return {
+            "mode": "asyncio",
+            "open_connections": sum(self._per_ip.values()),
+            "clients": len(self._per_ip),
+            "max_connections_per_ip": WEB_MAX_CONNECTIONS_PER_IP,
+            "connections": self.connections,
+            "requests": self.requests,
+            "timeouts": self.timeouts,
+            "rejected": dict(self.rejected),
+        }
+
+    async def _read_head(self, reader):
+        header_lines = []
+        size = 0
+        while True:
+            line = await reader.readline()
+            size += len(line)
+            if size > WEB_MAX_HEADER_BYTES:
+                raise ValueError("Header zu groß")
+            if line in (b"\r\n", b"\n", b""):
+                return header_lines
+            header_lines.append(line)
+
+    async def _read_body(self, reader, length):
+        """Body in Blöcken lesen, jeder Block mit Leerlauf-Timeout; None bei Timeout oder Abbruch."""
+        chunks = []
+        remaining = length
+        while remaining:
+            try:
+                chunk = await asyncio.wait_for(reader.read(min(remaining, 64 * 1024)), WEB_IDLE_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                chunk = b""
+            if not chunk:
+                # Client schickt nichts mehr oder hat aufgelegt: Verbindung und IP-Platz freigeben
+                self.timeouts += 1
+                return None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+        return b"".join(chunks)
+
+    async def _read_request(self, reader):
+        """Request-Zeile, Header und Body; None bei Verbindungsende oder Leerlauf-Timeout."""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), WEB_KEEPALIVE_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            return None
+        if not request_line or not request_line.strip():
+            return None
+        try:
+            # Gesamtfrist für die Header (Slow-Loris), wie im Thread-Server
+            header_lines = await asyncio.wait_for(self._read_head(reader), WEB_REQUEST_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+            raise ValueError("Ungültige Request-Zeile")
+        command, path, version = parts
+        headers = http.client.parse_headers(io.BytesIO(b"".join(header_lines) + b"\r\n"))
+        if headers.get("Transfer-Encoding"):
+            raise ValueError("Transfer-Encoding wird nicht unterstützt")
+        try:
+            length = int(headers.get("Content-Length", "0"))
+        except ValueError:
+            raise ValueError("Ungültige Content-Length") from None
+        if length < 0 or length > MAX_SOUND_UPLOAD_SIZE + WEB_MAX_HEADER_BYTES:
+            raise ValueError("Body zu groß")
+        body = await self._read_body(reader, length) if length else b""
+        if body is None:
+            return None
+        return command, path, version, headers, body
+
+    async def _handle_connection(self, reader, writer):
+        peer = writer.get_extra_info("peername") or ("", 0)
+        ip = peer[0]
+        if self._per_ip.get(ip, 0) >= WEB_MAX_CONNECTIONS_PER_IP:
+            self.rejected["per_ip"] += 1
+            writer.write(BoundedHTTPServer.REJECT_RESPONSE)
+            writer.close()
+            return
+        self._per_ip[ip] = self._per_ip.get(ip, 0) + 1
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except ValueError as exc:
+                    writer.write(
+                        b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+                    )
+                    await writer.drain()
+                    print(f"[Web] Ungültige Anfrage von {peer[0]}: {exc}", file=sys.stderr)
+                    return
+                if request is None:
+                    return
+                self.requests += 1
+                command, path, version, headers, body = request
+                connection = (headers.get("Connection") or "").lower()
+                close = version != "HTTP/1.1" or "close" in connection
+                path_only = urlparse(path).path
+                if command == "GET" and path_only == "/api/events":
+                    await self._stream_events(writer, headers)
+                    return
+                if command == "GET" and path_only == "/api/telemetry":
+                    await self._stream_telemetry(writer, parse_qs(urlparse(path).query))
+                    return
+                handler = _BufferedRequest(command, path, version, headers, body, peer, close, server=self)
+                if command == "GET" and not path_only.startswith(self.BLOCKING_GET_PREFIXES):
+                    response = handler.run()
+                else:
+                    response = await self._loop.run_in_executor(None, handler.run)
+                writer.write(response)
+                await writer.drain()
+                if handler.close_connection:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        except asyncio.CancelledError:
+            # Server wird beendet – offene Verbindungen (v. a. SSE) still schließen
+            return
+        finally:
+            writer.close()
+            remaining = self._per_ip.get(ip, 1) - 1
+            if remaining > 0:
+                self._per_ip[ip] = remaining
+            else:
+                self._per_ip.pop(ip, None)
+
+    @staticmethod
+    def _sse_head():
+        lines = [b"HTTP/1.1 200 OK"]
+        lines += [f"{name}: {value}".encode("latin-1") for name, value in SSE_RESPONSE_HEADERS]
+        lines.append(b"Connection: close")
+        return b"\r\n".join(lines) + b"\r\n\r\n"
+
+    @staticmethod
+    def _unavailable():
+        return b"HTTP/1.1 503 Service Unavailable\r\nContent-Type: application/json\r\n" \
+            b"Content-Length: 25\r\nConnection: close\r\n\r\n{\"status\": \"unavailable\"}"
+
+    async def _stream_events(self, writer, headers):
+        if self.state is None:
+            writer.write(self._unavailable())
+            await writer.drain()
+            return
+        hub = self.state.events
+        seen = resume_generation(hub, headers.get("Last-Event-ID"))
+        writer.write(self._sse_head())
+        if seen is None:
+            seen, payload = hub.full()
+            writer.write(state_event(hub, b"state", seen, payload))
+        await writer.drain()
+        while True:
+            if hub.generation <= seen:
+                try:
+                    await asyncio.wait_for(self._state_changed.wait(), WEB_EVENTS_KEEPALIVE_S)
+                except asyncio.TimeoutError:
+                    writer.write(SSE_KEEPALIVE)
+                    await writer.drain()
+                continue
+            generation, payload = hub.delta(seen)
+            writer.write(state_event(hub, b"delta", generation, payload))
+            seen = generation
+            await writer.drain()
+
+    async def _stream_telemetry(self, writer, query):
+        ring = self.telemetry
+        if ring is None:
+            writer.write(self._unavailable())
+            await writer.drain()
+            return
+        decimation = telemetry_decimation(query)
+        writer.write(self._sse_head())
+        writer.write(telemetry_meta_event(decimation))
+        await writer.drain()
+        cursor = ring.head
+        last_sent = time.monotonic()
+        while True:
+            await asyncio.sleep(TELEMETRY_SSE_INTERVAL_S)
+            cursor, records, dropped = ring.read_since(cursor, decimation)
+            now = time.monotonic()
+            if records or dropped:
+                writer.write(telemetry_data_event(records, dropped))
+            elif now - last_sent >= TELEMETRY_SSE_KEEPALIVE_S:
+                writer.write(SSE_KEEPALIVE)
+            else:
+                continue
+            await writer.drain()
+            last_sent = now
+
+
+def start_webserver(state, port=WEB_PORT_DEFAULT, *, loop_profiler=None, telemetry=None, mode=None):
+    """Startet den HTTP-Server für die Websteuerung (``WEB_SERVER_MODE``: Threads oder asyncio)."""
 
     ControlRequestHandler.control_state = state
+    ControlRequestHandler.loop_profiler = loop_profiler
+    ControlRequestHandler.telemetry = telemetry
+    preload_assets(*ControlRequestHandler.PAGE_NAMES)
     try:
         bound_port = int(port)
     except (TypeError, ValueError):
         bound_port = WEB_PORT_DEFAULT
     if not (WEB_PORT_MIN <= bound_port <= WEB_PORT_MAX):
         bound_port = WEB_PORT_DEFAULT
-    server = ThreadingHTTPServer(("0.0.0.0", bound_port), ControlRequestHandler)
+    if (mode or WEB_SERVER_MODE) == "asyncio":
+        return AsyncWebServer(bound_port, state=state, telemetry=telemetry).start()
+    server = BoundedHTTPServer(("0.0.0.0", bound_port), ControlRequestHandler)
 
     thread = threading.Thread(target=server.serve_forever, name="web-control", daemon=True)
     thread.start()
@@ -2620,6 +3812,11 @@ def validate_configuration():
     if US_MIN >= US_MAX:
         raise ValueError("US_MIN muss kleiner als US_MAX sein")
 
+    if WEB_WORKER_THREADS < 2 or not (0 < WEB_MAX_STREAMS < WEB_WORKER_THREADS):
+        raise ValueError("WEB_MAX_STREAMS muss >0 und kleiner als WEB_WORKER_THREADS (>=2) sein")
+    if WEB_ACCEPT_QUEUE_SIZE < 1 or WEB_MAX_CONNECTIONS_PER_IP < 1:
+        raise ValueError("WEB_ACCEPT_QUEUE_SIZE und WEB_MAX_CONNECTIONS_PER_IP müssen >=1 sein")
+
     if not (0.0 <= LEFT_MAX_DEG <= MID_DEG <= RIGHT_MAX_DEG <= SERVO_RANGE_DEG):
         raise ValueError("Lenkwinkel müssen innerhalb der Servo-Range liegen und sortiert sein")
 
@@ -2649,24 +3846,7 @@ def validate_configuration():
 
 
 # --------- Hilfsfunktionen: Mathe/Mapping ---------
-def clamp(x, lo, hi):
-    return lo if x < lo else (hi if x > hi else x)
-
-def norm_axis_centered(v, lo, hi):
-    """Zentrierte Achse auf [-1..+1]."""
-    if hi == lo: return 0.0
-    mid  = (hi + lo) / 2.0
-    span = (hi - lo) / 2.0
-    return (v - mid) / span
-
-def norm_axis_trigger(v, lo, hi):
-    """Trigger (GAS/BRAKE) auf [0..1]."""
-    if hi == lo: return 0.0
-    return clamp((v - lo) / (hi - lo), 0.0, 1.0)
-
-def shape_expo(x, expo=0.3):
-    return (1 - expo) * x + (x**3) * expo
-
+# clamp, norm_axis_centered und norm_axis_trigger stammen aus drive_pipeline.
 def deg_to_us_unclamped(deg):
     d = clamp(deg, 0.0, SERVO_RANGE_DEG)
     return int(US_MIN + (US_MAX - US_MIN) * (d / SERVO_RANGE_DEG))
@@ -2845,140 +4025,3045 @@ def play_sound_switch(path, alsa_dev=DEFAULT_ALSA_DEVICE, restart_if_same=None):
         return True
 
 
-# --------- evdev / Hardware ---------
-class GamepadDisconnected(Exception):
-    """Signalisiert, dass das Gamepad getrennt wurde."""
+# --------- Regelschleife / Timing ---------
+class LoopScheduler:
+    """Driftfreier Taktgeber für die Hauptschleife auf Basis monotoner Deadlines."""
+
+    def __init__(self, period_s=LOOP_PERIOD_S, *, clock=time.monotonic, sleep=time.sleep):
+        self.period = max(0.001, float(period_s))
+        self._clock = clock
+        self._sleep = sleep
+        self._deadline = None
+        self._last_wake = None
+        self.ticks = 0
+        self.event_wakeups = 0
+        self.overruns = 0
+        self.missed_ticks = 0
+        self.max_lateness = 0.0
+
+    def reset(self, now=None):
+        """Setzt die nächste Deadline eine Periode nach ``now`` (z. B. nach einem Reconnect)."""
+        if now is None:
+            now = self._clock()
+        self._deadline = now + self.period
+        self._last_wake = now
+
+    def wait(self, waiter=None, *, min_gap=0.0):
+        """Wartet bis zur nächsten Deadline.
+
+        ``waiter(timeout)`` darf vorzeitig mit True zurückkehren (z. B. bei Gamepad-Events);
+        die Deadline bleibt dann bestehen. Liefert True, wenn eine Deadline erreicht wurde.
+        """
+        if self._deadline is None:
+            self.reset()
+        now = self._clock()
+        lateness = now - self._deadline
+        if lateness >= 0.0:
+            missed = int(lateness // self.period)
+            self.overruns += 1
+            self.missed_ticks += missed
+            if lateness > self.max_lateness:
+                self.max_lateness = lateness
+            self._deadline += (missed + 1) * self.period
+            return self._woke(now, deadline=True)
+        if waiter is not None:
+            if min_gap > 0.0 and self._last_wake is not None:
+                gap_left = min(self._last_wake + min_gap, self._deadline) - now
+                if gap_left > 0.0:
+                    self._sleep(gap_left)
+            if waiter(self._deadline - self._clock()):
+                now = self._clock()
+                if now < self._deadline:
+                    self.event_wakeups += 1
+                    return self._woke(now, deadline=False)
+        else:
+            self._sleep(-lateness)
+        self._deadline += self.period
+        return self._woke(self._clock(), deadline=True)
 
+    def _woke(self, now, *, deadline):
+        self._last_wake = now
+        self.ticks += 1
+        return deadline
 
-def find_gamepad():
-    t0 = time.monotonic()
-    informed_wait = False
-    while True:
-        devices = []
-        for fn in sorted(list_devices()):
-            try:
-                devices.append(InputDevice(fn))
-            except Exception as e:
-                print(f"! Kann {fn} nicht öffnen: {e}")
+    def stats(self):
+        return {
+            "period_s": self.period,
+            "ticks": self.ticks,
+            "event_wakeups": self.event_wakeups,
+            "overruns": self.overruns,
+            "missed_ticks": self.missed_ticks,
+            "max_lateness_ms": round(self.max_lateness * 1000.0, 3),
+        }
 
-        chosen = None
-        print("Scanne Input-Geräte:")
-        for dev in devices:
-            try:
-                caps = dev.capabilities()
-                has_abs = (ecodes.EV_ABS in caps)
-                has_key = (ecodes.EV_KEY in caps)
-                name = dev.name or ""
-                print(f"  - {dev.path:>16}  name='{name}'  EV_ABS={has_abs} EV_KEY={has_key}")
-                if has_key and (name == GAMEPAD_NAME_EXACT or GAMEPAD_NAME_FALLBACK in name):
-                    chosen = dev
-                    if name == GAMEPAD_NAME_EXACT:
-                        break
-            except Exception as e:
-                print(f"    ! Zugriff auf {dev.path} fehlgeschlagen: {e}")
 
-        if chosen:
-            print(f"Gefunden: {chosen.path}  name='{chosen.name}'")
-            return chosen
+class TimingHistogram:
+    """Histogramm mit festen Buckets in vorallokierten Arrays (Werte in Sekunden)."""
 
-        if WAIT_FOR_DEVICE_S <= 0:
-            print("Kein passendes Gamepad gefunden!", file=sys.stderr)
+    DEFAULT_EDGES_US = (50, 100, 200, 500, 1000, 2000, 5000, 10000, 15000, 20000, 25000, 30000, 50000, 100000)
 
-        if not informed_wait:
-            print(f"Kein Gamepad gefunden – warte bis zu {WAIT_FOR_DEVICE_S:.1f}s …")
-            informed_wait = True
-        if time.monotonic() - t0 > WAIT_FOR_DEVICE_S:
-            print("Timeout: Kein Gamepad gefunden.", file=sys.stderr)
-            sys.exit(1)
-        time.sleep(0.5)
+    def __init__(self, edges_us=DEFAULT_EDGES_US):
+        self._edges_us = tuple(int(edge) for edge in edges_us)
+        self._edges = tuple(edge / 1_000_000.0 for edge in self._edges_us)
+        self._counts = array("Q", [0] * (len(self._edges) + 1))
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
 
+    def add(self, seconds):
+        self._counts[bisect_right(self._edges, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
 
-def resolve_servo_axis(dev):
-    name = dev.name or ""
-    axis_name = SERVO_AXIS_NAME_OVERRIDES.get(name, SERVO_AXIS_NAME_DEFAULT)
-    try:
-        axis_code = getattr(ecodes, axis_name)
-    except AttributeError as exc:
-        print(f"Unbekannte Servo-Achse '{axis_name}' für {name}: {exc}", file=sys.stderr)
-        sys.exit(1)
-    return axis_code, axis_name
+    def reset(self):
+        for idx in range(len(self._counts)):
+            self._counts[idx] = 0
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
 
+    def snapshot(self):
+        count = self.count
+        return {
+            "edges_us": list(self._edges_us),
+            "counts": self._counts.tolist(),
+            "count": count,
+            "mean_us": round(self.total / count * 1_000_000.0, 1) if count else None,
+            "max_us": round(self.maximum * 1_000_000.0, 1),
+        }
 
-def get_abs_range(caps, code):
-    """Kompatibel für unterschiedliche evdev-Formate."""
-    for c, info in caps.get(ecodes.EV_ABS, []):
-        if isinstance(c, int) and c == code:
-            try:
-                return info.min, info.max     # AbsInfo
-            except AttributeError:
-                return info[1][0], info[1][1] # Tupel-Form
-    return None
 
-def read_abs(dev, code):
+class LoopProfiler:
+    """Misst Taktperiode und Phasendauern der Hauptschleife mit geringem Overhead."""
+
+    PHASES = ("events", "steering", "motor", "head", "output")
+
+    def __init__(self, *, scheduler=None, output=None, watchdog=None, enabled=LOOP_PROFILING_ENABLED,
+                 period_s=LOOP_PERIOD_S):
+        self.enabled = bool(enabled)
+        self._scheduler = scheduler
+        self._output = output
+        self._watchdog = watchdog
+        self._period_s = period_s
+        self._last_start = None
+        self.period = TimingHistogram()
+        self.work = TimingHistogram()
+        self.phases = {name: TimingHistogram() for name in self.PHASES}
+        self.work_overruns = 0
+
+    def record_tick(self, t_start, t_events, t_steer, t_steer_out, t_motor, t_motor_out, t_head, t_end):
+        """Erfasst einen Durchlauf anhand der perf_counter()-Zeitpunkte zwischen den Phasen."""
+        if not self.enabled:
+            return
+        if self._last_start is not None:
+            self.period.add(t_start - self._last_start)
+        self._last_start = t_start
+        work = t_end - t_start
+        self.work.add(work)
+        if work > self._period_s:
+            self.work_overruns += 1
+        phases = self.phases
+        phases["events"].add(t_events - t_start)
+        phases["steering"].add(t_steer - t_events)
+        phases["motor"].add(t_motor - t_steer_out)
+        phases["head"].add(t_head - t_motor_out)
+        phases["output"].add((t_steer_out - t_steer) + (t_motor_out - t_motor) + (t_end - t_head))
+
+    def mark_gap(self):
+        """Unterbricht die Periodenmessung (z. B. während auf das Gamepad gewartet wird)."""
+        self._last_start = None
+
+    def reset(self):
+        self.period.reset()
+        self.work.reset()
+        for histogram in self.phases.values():
+            histogram.reset()
+        self.work_overruns = 0
+        self._last_start = None
+        if self._output is not None:
+            self._output.reset_stats()
+        if self._watchdog is not None:
+            self._watchdog.reset_stats()
+
+    def snapshot(self):
+        payload = {
+            "enabled": self.enabled,
+            "period": self.period.snapshot(),
+            "work": self.work.snapshot(),
+            "phases": {name: histogram.snapshot() for name, histogram in self.phases.items()},
+            "work_overruns": self.work_overruns,
+        }
+        if self._scheduler is not None:
+            payload["scheduler"] = self._scheduler.stats()
+        if self._output is not None:
+            payload["output"] = self._output.stats()
+        if self._watchdog is not None:
+            payload["watchdog"] = self._watchdog.stats()
+        return payload
+
+
+class TelemetryRing:
+    """Vorallokierter Ringpuffer mit dem Zustand jedes Takts als gepackte Structs.
+
+    Der Puffer liegt in einem anonymen, geteilten mmap und überlebt damit den Fork des
+    Echtzeitprozesses: die Regelschleife schreibt, der Webserver im Hauptprozess liest.
+    ``record()`` ist ein einzelnes ``pack_into`` plus Zählererhöhung, formatiert wird erst
+    beim Lesen. Jeder Eintrag trägt seine laufende Nummer; Leser erkennen daran überholte
+    Einträge.
+    """
+
+    FIELDS = (
+        "seq", "t", "flags", "axis", "y_centered", "gas", "brake", "steer_target", "steer_pos",
+        "motor_target", "motor_out", "head_target", "head_pos", "dt",
+    )
+    FLAG_STEERING_ARMED = 0x01
+    FLAG_MOTOR_ARMED = 0x02
+    FLAG_BRAKE_LATCHED = 0x04
+
+    _RECORD = struct.Struct("<QdB11f")
+    _HEADER = struct.Struct("<Q")
+    _HEADER_SIZE = 64
+
+    def __init__(self, capacity=TELEMETRY_CAPACITY):
+        self.capacity = max(2, int(capacity))
+        self._buffer = mmap.mmap(-1, self._HEADER_SIZE + self.capacity * self._RECORD.size)
+        self._head = 0
+
+    @property
+    def head(self):
+        """Nummer des nächsten Eintrags (aus dem geteilten Speicher, auch prozessübergreifend)."""
+        return self._HEADER.unpack_from(self._buffer, 0)[0]
+
+    def record(self, t, flags, axis, y_centered, gas, brake, steer_target, steer_pos,
+               motor_target, motor_out, head_target, head_pos, dt):
+        seq = self._head
+        self._RECORD.pack_into(
+            self._buffer,
+            self._HEADER_SIZE + (seq % self.capacity) * self._RECORD.size,
+            seq, t, flags, axis, y_centered, gas, brake, steer_target, steer_pos,
+            motor_target, motor_out, head_target, head_pos, dt,
+        )
+        self._head = seq + 1
+        self._HEADER.pack_into(self._buffer, 0, seq + 1)
+
+    def read_since(self, cursor, decimation=1):
+        """Einträge ab Nummer ``cursor``, nur jede ``decimation``-te (nach laufender Nummer).
+
+        Liefert ``(neuer_cursor, einträge, verloren)``; ``verloren`` zählt Einträge, die der
+        Schreiber überholt hat, bevor sie gelesen wurden.
+        """
+        head = self.head
+        capacity = self.capacity
+        dropped = 0
+        oldest = head - capacity + 1 if head >= capacity else 0
+        if cursor < oldest:
+            dropped = oldest - cursor
+            cursor = oldest
+        if decimation > 1 and cursor % decimation:
+            cursor += decimation - cursor % decimation
+        records = []
+        unpack_from = self._RECORD.unpack_from
+        buffer = self._buffer
+        size = self._RECORD.size
+        seq = cursor
+        while seq < head:
+            values = unpack_from(buffer, self._HEADER_SIZE + (seq % capacity) * size)
+            if values[0] == seq:
+                records.append(values)
+            seq += decimation
+        # Während des Lesens überschriebene Einträge verwerfen (Schreiber läuft ggf. in anderem Prozess)
+        limit = self.head - capacity + 1
+        if records and records[0][0] < limit:
+            kept = [values for values in records if values[0] >= limit]
+            dropped += len(records) - len(kept)
+            records = kept
+        return max(seq, cursor), records, dropped
+
+    def close(self):
+        self._buffer.close()
+
+
+def create_telemetry_ring():
+    return TelemetryRing() if TELEMETRY_ENABLED else None
+
+
+# --------- evdev / Hardware ---------
+class GamepadDisconnected(Exception):
+    """Signalisiert, dass das Gamepad getrennt wurde."""
+
+
+_IN_ATTRIB = 0x00000004
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_NONBLOCK = os.O_NONBLOCK
+_IN_CLOEXEC = os.O_CLOEXEC
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+
+class InputHotplugWatcher:
+    """Beobachtet ``/dev/input`` per inotify auf neue und entfernte Geräteknoten.
+
+    Der Deskriptor wird in das ``select()`` der Regelschleife eingehängt; gelesen wird
+    nur, wenn dort tatsächlich etwas anliegt. So entfällt der ``stat()`` pro Takt.
+    """
+
+    def __init__(self, fd, directory):
+        self._fd = fd
+        self.directory = directory
+        self._ready = False
+        self._removed = set()
+        self._rescan = False
+
+    @classmethod
+    def open(cls, directory=INPUT_DEVICE_DIR):
+        """Liefert einen Watcher oder None, falls inotify nicht verfügbar ist."""
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+            if fd < 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err))
+            mask = _IN_CREATE | _IN_DELETE | _IN_ATTRIB | _IN_DELETE_SELF
+            if libc.inotify_add_watch(fd, os.fsencode(directory), mask) < 0:
+                err = ctypes.get_errno()
+                os.close(fd)
+                raise OSError(err, os.strerror(err))
+        except (AttributeError, OSError) as exc:
+            print(f"[Hotplug] inotify auf {directory} nicht verfügbar, nutze Polling: {exc}", file=sys.stderr)
+            return None
+        return cls(fd, directory)
+
+    def fileno(self):
+        return self._fd
+
+    def notify(self):
+        """Vom select() aufgerufen, wenn der Deskriptor lesbar ist."""
+        self._ready = True
+
+    def _drain(self):
+        """Liest alle anstehenden inotify-Events; liefert True bei neuen/geänderten Knoten."""
+        self._ready = False
+        appeared = False
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+            except OSError as exc:
+                print(f"[Hotplug] Lesefehler: {exc}", file=sys.stderr)
+                self._rescan = True
+                break
+            if not data:
+                break
+            offset = 0
+            while offset + _INOTIFY_EVENT.size <= len(data):
+                _wd, mask, _cookie, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                offset += _INOTIFY_EVENT.size
+                name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+                offset += length
+                if mask & (_IN_Q_OVERFLOW | _IN_DELETE_SELF | _IN_IGNORED):
+                    self._rescan = True
+                elif mask & _IN_DELETE:
+                    self._removed.add(name)
+                elif mask & (_IN_CREATE | _IN_ATTRIB):
+                    self._removed.discard(name)
+                    appeared = True
+        return appeared
+
+    def removed(self, path):
+        """True, wenn der Geräteknoten ``path`` seit dem Öffnen entfernt wurde."""
+        if not self._ready:
+            return False
+        self._drain()
+        if self._rescan:
+            # Eventverlust: einmalig tatsächlich nachsehen
+            self._rescan = False
+            return not os.path.exists(path)
+        return os.path.basename(path) in self._removed
+
+    def forget(self):
+        """Verwirft gemerkte Entfernungen (nach erfolgreicher Neuverbindung)."""
+        self._removed.clear()
+        self._rescan = False
+
+    def wait_for_change(self, timeout):
+        """Blockiert bis zu ``timeout`` Sekunden auf neue oder geänderte Knoten in ``/dev/input``."""
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0.0:
+                return False
+            try:
+                readable, _writable, _errors = select.select([self._fd], [], [], remaining)
+            except (OSError, ValueError):
+                time.sleep(remaining)
+                return False
+            if readable and self._drain():
+                return True
+
+    def close(self):
+        try:
+            os.close(self._fd)
+        except OSError:
+            pass
+
+
+GamepadIdentity = namedtuple("GamepadIdentity", ("name", "phys", "uniq"))
+_InputNodeInfo = namedtuple("_InputNodeInfo", ("key", "identity", "has_abs", "has_key"))
+
+
+def _input_node_sort_key(name):
+    digits = name[len("event"):]
+    return int(digits) if digits.isdigit() else -1
+
+
+class GamepadDiscovery:
+    """Sucht das Gamepad unter ``/dev/input`` mit möglichst wenigen Öffnungen.
+
+    - Das zuletzt verbundene Gerät (Name/phys/uniq) wird zuerst probiert.
+    - Ergebnisse werden pro Knoten (Gerätenummer, Inode, ctime) gecacht; bekannte
+      Nicht-Gamepads werden nicht erneut geöffnet.
+    - Nicht gewählte ``InputDevice``-Objekte werden sofort geschlossen.
+    """
+
+    def __init__(self, *, directory=INPUT_DEVICE_DIR, opener=InputDevice, verbose=True):
+        self.directory = directory
+        self._opener = opener
+        self._verbose = verbose
+        self._cache = {}
+        self.last_identity = None
+        self.opened = 0
+
+    @staticmethod
+    def is_candidate(info):
+        name = info.identity.name
+        return info.has_key and (name == GAMEPAD_NAME_EXACT or GAMEPAD_NAME_FALLBACK in name)
+
+    def _list_nodes(self):
+        try:
+            names = [entry.name for entry in os.scandir(self.directory) if entry.name.startswith("event")]
+        except OSError as exc:
+            print(f"! Kann {self.directory} nicht lesen: {exc}", file=sys.stderr)
+            return []
+        # Neu angelegte Knoten haben meist die höchste Nummer
+        names.sort(key=_input_node_sort_key, reverse=True)
+        return [os.path.join(self.directory, name) for name in names]
+
+    def _probe(self, path, key):
+        dev = self._opener(path)
+        self.opened += 1
+        try:
+            caps = dev.capabilities()
+            identity = GamepadIdentity(
+                dev.name or "",
+                getattr(dev, "phys", "") or "",
+                getattr(dev, "uniq", "") or "",
+            )
+        except Exception:
+            dev.close()
+            raise
+        info = _InputNodeInfo(key, identity, ecodes.EV_ABS in caps, ecodes.EV_KEY in caps)
+        self._cache[path] = info
+        return dev, info
+
+    def _ordered_nodes(self, paths):
+        preferred, fresh, rest = [], [], []
+        for path in paths:
+            info = self._cache.get(path)
+            if info is None:
+                fresh.append(path)
+            elif self.last_identity is not None and info.identity == self.last_identity:
+                preferred.append(path)
+            else:
+                rest.append(path)
+        return preferred + fresh + rest
+
+    def scan(self, *, log=False):
+        """Ein Suchdurchlauf; liefert das geöffnete Gamepad oder None."""
+        paths = self._list_nodes()
+        known = set(paths)
+        for stale in [path for path in self._cache if path not in known]:
+            del self._cache[stale]
+
+        if log:
+            print("Scanne Input-Geräte:")
+        chosen = fallback = None
+        chosen_info = fallback_info = None
+        for path in self._ordered_nodes(paths):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = (st.st_rdev, st.st_ino, st.st_ctime_ns)
+            info = self._cache.get(path)
+            if info is not None and info.key == key and not self.is_candidate(info):
+                continue
+            try:
+                dev, info = self._probe(path, key)
+            except Exception as e:
+                # Direkt nach dem Anlegen fehlen oft noch die Rechte – nächster Durchlauf
+                self._cache.pop(path, None)
+                if log:
+                    print(f"! Kann {path} nicht öffnen: {e}")
+                continue
+            if log:
+                print(
+                    f"  - {path:>16}  name='{info.identity.name}'  "
+                    f"EV_ABS={info.has_abs} EV_KEY={info.has_key}"
+                )
+            if not self.is_candidate(info):
+                dev.close()
+                continue
+            if info.identity == self.last_identity or info.identity.name == GAMEPAD_NAME_EXACT:
+                chosen, chosen_info = dev, info
+                break
+            if fallback is None:
+                fallback, fallback_info = dev, info
+            else:
+                dev.close()
+
+        if chosen is None:
+            chosen, chosen_info = fallback, fallback_info
+        elif fallback is not None:
+            fallback.close()
+        if chosen_info is not None:
+            self.last_identity = chosen_info.identity
+        return chosen
+
+    def find(self, hotplug=None, *, wait_s=WAIT_FOR_DEVICE_S):
+        t0 = time.monotonic()
+        informed_wait = False
+        while True:
+            chosen = self.scan(log=self._verbose and not informed_wait)
+            if chosen:
+                if self._verbose:
+                    print(f"Gefunden: {chosen.path}  name='{chosen.name}'")
+                return chosen
+
+            if wait_s <= 0:
+                print("Kein passendes Gamepad gefunden!", file=sys.stderr)
+
+            if not informed_wait:
+                if self._verbose:
+                    print(f"Kein Gamepad gefunden – warte bis zu {wait_s:.1f}s …")
+                informed_wait = True
+            if time.monotonic() - t0 > wait_s:
+                print("Timeout: Kein Gamepad gefunden.", file=sys.stderr)
+                sys.exit(1)
+            if hotplug is not None:
+                # Neu scannen, sobald udev einen Knoten anlegt (spätestens nach 0,5 s)
+                hotplug.wait_for_change(0.5)
+            else:
+                time.sleep(0.5)
+
+
+def find_gamepad(hotplug=None, discovery=None):
+    if discovery is None:
+        discovery = GamepadDiscovery()
+    return discovery.find(hotplug)
+
+
+def resolve_servo_axis(dev):
+    name = dev.name or ""
+    axis_name = SERVO_AXIS_NAME_OVERRIDES.get(name, SERVO_AXIS_NAME_DEFAULT)
+    try:
+        axis_code = getattr(ecodes, axis_name)
+    except AttributeError as exc:
+        print(f"Unbekannte Servo-Achse '{axis_name}' für {name}: {exc}", file=sys.stderr)
+        sys.exit(1)
+    return axis_code, axis_name
+
+
+def get_abs_range(caps, code):
+    """Kompatibel für unterschiedliche evdev-Formate."""
+    for c, info in caps.get(ecodes.EV_ABS, []):
+        if isinstance(c, int) and c == code:
+            try:
+                return info.min, info.max     # AbsInfo
+            except AttributeError:
+                return info[1][0], info[1][1] # Tupel-Form
+    return None
+
+def read_abs(dev, code):
+    try:
+        return dev.absinfo(code).value
+    except OSError:
+        return None
+
+
+class AxisStateCache:
+    """Hält die aktuellen Achswerte aus dem Event-Strom vor, statt pro Takt absinfo() abzufragen.
+
+    Beim Verbinden wird einmal per ioctl initialisiert. Nach ``SYN_DROPPED`` werden Events
+    bis zum nächsten ``SYN_REPORT`` verworfen und die Achsen anschließend neu eingelesen.
+    """
+
+    def __init__(self, dev, codes):
+        self._dev = dev
+        self._values = {code: None for code in codes if code is not None}
+        self._dropped = False
+        self.resyncs = 0
+        self.resync()
+
+    def resync(self):
+        for code in self._values:
+            value = read_abs(self._dev, code)
+            if value is not None:
+                # Fehlgeschlagenes ioctl: letzten bekannten Wert behalten statt auf None zu fallen
+                self._values[code] = value
+        self._dropped = False
+
+    def handle_event(self, event):
+        etype = event.type
+        if etype == ecodes.EV_ABS:
+            if not self._dropped and event.code in self._values:
+                self._values[event.code] = event.value
+        elif etype == ecodes.EV_SYN:
+            if event.code == ecodes.SYN_DROPPED:
+                self._dropped = True
+            elif event.code == ecodes.SYN_REPORT and self._dropped:
+                self.resync()
+                self.resyncs += 1
+
+    def get(self, code):
+        return self._values.get(code)
+
+
+def wait_for_gamepad_input(dev, timeout, hotplug=None):
+    """Blockiert, bis Events am Gamepad (oder am Hotplug-Watcher) anliegen oder ``timeout`` verstrichen ist."""
+    if timeout <= 0.0:
+        return False
+    fds = [dev.fd] if dev is not None else []
+    if hotplug is not None:
+        fds.append(hotplug.fileno())
+    try:
+        readable, _writable, _errors = select.select(fds, [], [], timeout)
+    except (OSError, ValueError) as exc:
+        # ValueError: FD bereits geschlossen, OSError: Gerät verschwunden
+        print(f"[Gamepad] Warten auf Events fehlgeschlagen: {exc}")
+        raise GamepadDisconnected from None
+    if hotplug is not None and hotplug.fileno() in readable:
+        hotplug.notify()
+    return bool(readable)
+
+
+# --------- Zusatz-Controller ---------
+InputSample = namedtuple("InputSample", ("steer", "motor", "active_ts"))
+
+INPUT_CHANNELS = ("steering", "motor", "head")
+INPUT_ARBITRATION_POLICIES = ("priority", "takeover", "axis")
+
+
+class InputSlot:
+    """Letzter Eingabewert eines Zusatz-Controllers.
+
+    Genau ein Schreiber (Leser-Thread) und ein Leser (Regelschleife): ``sample`` wird als
+    unveränderliches Tupel komplett ersetzt, diskrete Ereignisse laufen über eine deque.
+    Die Regelschleife nimmt dafür keinen Lock.
+    """
+
+    def __init__(self, name, path, priority):
+        self.name = name
+        self.path = path
+        self.priority = priority
+        self.sample = None
+        self.connected = True
+        self.events = deque(maxlen=64)
+
+    def is_active(self, now, hold_s):
+        sample = self.sample
+        return (
+            self.connected
+            and sample is not None
+            and sample.active_ts is not None
+            and now - sample.active_ts <= hold_s
+        )
+
+
+class SecondaryGamepadReader(threading.Thread):
+    """Liest einen Zusatz-Controller im eigenen Thread und füllt dessen ``InputSlot``."""
+
+    def __init__(self, dev, slot, stop_event):
+        super().__init__(name=f"gamepad-{os.path.basename(slot.path)}", daemon=True)
+        self._dev = dev
+        self._slot = slot
+        self._stop_event = stop_event
+
+    def run(self):
+        dev = self._dev
+        slot = self._slot
+        try:
+            self._read_loop(dev, slot)
+        except (OSError, ValueError) as exc:
+            print(f"[Gamepad] Zusatz-Controller {slot.path} getrennt: {exc}")
+        finally:
+            slot.connected = False
+            try:
+                dev.close()
+            except (OSError, AttributeError):
+                pass
+
+    def _read_loop(self, dev, slot):
+        name = dev.name or ""
+        servo_code = getattr(ecodes, SERVO_AXIS_NAME_OVERRIDES.get(name, SERVO_AXIS_NAME_DEFAULT), None)
+        center_code = getattr(ecodes, MOTOR_AXIS_CENTERED_NAME)
+        gas_code = getattr(ecodes, MOTOR_AXIS_GAS_NAME)
+        brake_code = getattr(ecodes, MOTOR_AXIS_BRAKE_NAME)
+        caps = dev.capabilities()
+        rng_servo = get_abs_range(caps, servo_code) if servo_code is not None else None
+        rng_center = get_abs_range(caps, center_code)
+        rng_gas = get_abs_range(caps, gas_code)
+        rng_brake = get_abs_range(caps, brake_code)
+        cache = AxisStateCache(dev, (servo_code, center_code, gas_code, brake_code))
+        threshold = INPUT_TAKEOVER_THRESHOLD
+        active_ts = None
+
+        while slot.connected and not self._stop_event.is_set():
+            readable, _writable, _errors = select.select([dev.fd], [], [], 0.2)
+            if not readable:
+                continue
+            e = dev.read_one()
+            while e:
+                cache.handle_event(e)
+                if e.type == ecodes.EV_ABS:
+                    if e.code == ecodes.ABS_HAT0X and e.value in (-1, 1):
+                        slot.events.append(("head", "left" if e.value == -1 else "right"))
+                    elif e.code == ecodes.ABS_HAT0Y and e.value == -1:
+                        slot.events.append(("head", "mid"))
+                elif e.type == ecodes.EV_KEY and e.value == 1:
+                    button_code = BUTTON_EVENT_TO_CODE.get(e.code)
+                    if button_code:
+                        slot.events.append(("button", button_code))
+                        active_ts = time.monotonic()
+                e = dev.read_one()
+
+            steer = None
+            raw = cache.get(servo_code) if rng_servo is not None else None
+            if raw is not None:
+                steer = norm_axis_centered(raw, *rng_servo)
+                if INVERT_SERVO:
+                    steer = -steer
+            y_centered = gas = brake = 0.0
+            raw = cache.get(center_code) if rng_center is not None else None
+            if raw is not None:
+                y_centered = norm_axis_centered(raw, *rng_center)
+                if INVERT_MOTOR:
+                    y_centered = -y_centered
+            raw = cache.get(gas_code) if rng_gas is not None else None
+            if raw is not None:
+                gas = norm_axis_trigger(raw, *rng_gas)
+            raw = cache.get(brake_code) if rng_brake is not None else None
+            if raw is not None:
+                brake = norm_axis_trigger(raw, *rng_brake)
+
+            if (
+                abs(steer or 0.0) >= threshold
+                or abs(y_centered) >= threshold
+                or gas >= threshold
+                or brake >= threshold
+            ):
+                active_ts = time.monotonic()
+            slot.sample = InputSample(steer, (y_centered, gas, brake), active_ts)
+
+
+class SecondaryInputManager:
+    """Findet Zusatz-Controller und startet pro Gerät einen ``SecondaryGamepadReader``.
+
+    Der Haupt-Controller wird weiterhin direkt in der Regelschleife gelesen; Zusatz-Controller
+    kosten ihn dadurch keine Latenz.
+    """
+
+    def __init__(self, *, directory=INPUT_DEVICE_DIR, names=SECONDARY_GAMEPAD_NAMES,
+                 interval_s=SECONDARY_SCAN_INTERVAL_S, opener=InputDevice):
+        self.directory = directory
+        self._names = tuple(names)
+        self._interval_s = interval_s
+        self._opener = opener
+        self._primary_path = None
+        self._slots = ()
+        self._rejected = {}
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="gamepad-secondary", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+
+    def set_primary(self, path):
+        """Setzt den Haupt-Controller; ein Zusatz-Leser auf demselben Knoten wird beendet."""
+        self._primary_path = path
+        for slot in self._slots:
+            if slot.path == path:
+                slot.connected = False
+        self._slots = tuple(slot for slot in self._slots if slot.path != path)
+
+    def slots(self):
+        """Momentaufnahme der verbundenen Zusatz-Controller (nach Priorität sortiert)."""
+        return self._slots
+
+    def _priority(self, name):
+        for idx, candidate in enumerate(self._names):
+            if name == candidate:
+                return idx
+        return len(self._names)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._scan()
+            self._stop_event.wait(self._interval_s)
+
+    def _scan(self):
+        slots = [slot for slot in self._slots if slot.connected]
+        taken = {slot.path for slot in slots}
+        taken.add(self._primary_path)
+        try:
+            names = [entry.name for entry in os.scandir(self.directory) if entry.name.startswith("event")]
+        except OSError:
+            return
+        changed = len(slots) != len(self._slots)
+        for node in names:
+            path = os.path.join(self.directory, node)
+            if path in taken:
+                continue
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            key = (st.st_rdev, st.st_ino, st.st_ctime_ns)
+            if self._rejected.get(path) == key:
+                continue
+            try:
+                dev = self._opener(path)
+            except Exception:
+                continue
+            name = dev.name or ""
+            if not any(name == candidate or candidate in name for candidate in self._names):
+                self._rejected[path] = key
+                dev.close()
+                continue
+            slot = InputSlot(name, path, self._priority(name))
+            print(f"[Gamepad] Zusatz-Controller verbunden: {path}  name='{name}'")
+            SecondaryGamepadReader(dev, slot, self._stop_event).start()
+            slots.append(slot)
+            changed = True
+        if changed:
+            slots.sort(key=lambda slot: slot.priority)
+            self._slots = tuple(slots)
+
+
+class InputArbiter:
+    """Entscheidet je Kanal (Lenkung, Motor, Kopf), welcher Controller steuert.
+
+    - ``priority``: ein verbundener Zusatz-Controller steuert immer (höchste Priorität zuerst).
+    - ``takeover``: ein Zusatz-Controller übernimmt bei Auslenkung und gibt nach
+      ``hold_s`` Ruhe an den Haupt-Controller zurück.
+    - ``axis``: feste Zuordnung pro Kanal über ``axis_owners``.
+    """
+
+    def __init__(self, policy=INPUT_ARBITRATION, *, hold_s=INPUT_TAKEOVER_HOLD_S, axis_owners=None):
+        if policy not in INPUT_ARBITRATION_POLICIES:
+            print(f"[Gamepad] Unbekannte Arbitrierung '{policy}', nutze 'takeover'", file=sys.stderr)
+            policy = "takeover"
+        self.policy = policy
+        self.hold_s = hold_s
+        owners = dict(INPUT_AXIS_OWNERS if axis_owners is None else axis_owners)
+        self._secondary_channels = frozenset(
+            channel for channel in INPUT_CHANNELS if owners.get(channel) == "secondary"
+        )
+        self.sources = dict.fromkeys(INPUT_CHANNELS, "primary")
+
+    def resolve(self, now, slots):
+        """Liefert pro Kanal den steuernden ``InputSlot`` oder None (Haupt-Controller)."""
+        chosen = None
+        if self.policy == "takeover":
+            for slot in slots:
+                if slot.is_active(now, self.hold_s):
+                    chosen = slot
+                    break
+        else:
+            for slot in slots:
+                if slot.connected and slot.sample is not None:
+                    chosen = slot
+                    break
+        if self.policy == "axis":
+            owners = {
+                channel: (chosen if channel in self._secondary_channels else None)
+                for channel in INPUT_CHANNELS
+            }
+        else:
+            owners = dict.fromkeys(INPUT_CHANNELS, chosen)
+        for channel, slot in owners.items():
+            self.sources[channel] = slot.name if slot is not None else "primary"
+        return owners
+
+
+# --------- pigpio / Motor-Pins ---------
+class CoalescingOutput:
+    """Vorschaltung für pigpio, die unveränderte Ausgabewerte nicht erneut sendet.
+
+    Jeder Aufruf ist ein Socket-Roundtrip zu pigpiod. Gemerkt wird der zuletzt gesendete
+    Wert pro Pin; gleiche Werte werden übersprungen, bis ``refresh_s`` abgelaufen ist.
+    Alle übrigen Attribute werden an das umhüllte Objekt durchgereicht.
+    """
+
+    def __init__(self, pi, *, refresh_s=OUTPUT_REFRESH_S, clock=time.monotonic):
+        self._pi = pi
+        self._refresh_s = refresh_s
+        self._clock = clock
+        self._last = {}
+        self.sent = 0
+        self.skipped = 0
+        self.refreshed = 0
+
+    def __getattr__(self, name):
+        return getattr(self._pi, name)
+
+    def _should_send(self, key, value, now):
+        last = self._last.get(key)
+        if last is None or last[0] != value:
+            return True
+        if now - last[1] >= self._refresh_s:
+            self.refreshed += 1
+            return True
+        self.skipped += 1
+        return False
+
+    def _sent(self, key, value, now):
+        self._last[key] = (value, now)
+        self.sent += 1
+
+    def set_mode(self, pin, mode):
+        # Moduswechsel verwirft den bekannten Pegel des Pins
+        self._last.pop(("write", pin), None)
+        return self._pi.set_mode(pin, mode)
+
+    def write(self, pin, level):
+        key = ("write", pin)
+        now = self._clock()
+        if not self._should_send(key, level, now):
+            return 0
+        result = self._pi.write(pin, level)
+        self._sent(key, level, now)
+        return result
+
+    def hardware_PWM(self, pin, frequency, duty):
+        key = ("pwm", pin)
+        value = (frequency, duty)
+        now = self._clock()
+        if not self._should_send(key, value, now):
+            return 0
+        result = self._pi.hardware_PWM(pin, frequency, duty)
+        self._sent(key, value, now)
+        return result
+
+    def set_servo_pulsewidth(self, pin, pulsewidth):
+        key = ("servo", pin)
+        now = self._clock()
+        if not self._should_send(key, pulsewidth, now):
+            return 0
+        result = self._pi.set_servo_pulsewidth(pin, pulsewidth)
+        self._sent(key, pulsewidth, now)
+        return result
+
+    def invalidate(self):
+        """Vergisst alle gemerkten Werte, der nächste Aufruf je Pin wird sicher gesendet."""
+        self._last.clear()
+        backend_invalidate = getattr(self._pi, "invalidate", None)
+        if backend_invalidate is not None:
+            backend_invalidate()
+
+    def reset_stats(self):
+        self.sent = 0
+        self.skipped = 0
+        self.refreshed = 0
+        backend_reset = getattr(self._pi, "reset_stats", None)
+        if backend_reset is not None:
+            backend_reset()
+
+    def stats(self):
+        total = self.sent + self.skipped
+        payload = {
+            "sent": self.sent,
+            "skipped": self.skipped,
+            "refreshed": self.refreshed,
+            "skip_ratio": round(self.skipped / total, 4) if total else 0.0,
+            "refresh_s": self._refresh_s,
+        }
+        backend_stats = getattr(self._pi, "stats", None)
+        if backend_stats is not None:
+            payload["backend"] = backend_stats()
+        return payload
+
+
+_PI_CMD_MODES = 0
+_PI_CMD_WRITE = 4
+_PI_CMD_SERVO = 8
+_PI_CMD_HP = 86
+_PI_CMD = struct.Struct("<IIII")
+_PI_REPLY = struct.Struct("<IIIi")
+_PI_EXT_U32 = struct.Struct("<I")
+
+
+class BatchedPigpioOutput:
+    """Sammelt die Ausgaben eines Takts und schickt sie gebündelt an pigpiod.
+
+    Zwischen ``begin_batch()`` und ``flush()`` werden ``write``, ``hardware_PWM`` und
+    ``set_servo_pulsewidth`` als fertige Socket-Kommandos gepuffert, in einem ``sendall``
+    übertragen und die Antworten erst danach gelesen (Pipelining statt Roundtrip je Pin).
+    Außerhalb eines Takts wird direkt über die pigpio-Bibliothek gesendet.
+    """
+
+    def __init__(self, pi):
+        self._pi = pi
+        self._sl = pi.sl
+        self._buffer = bytearray()
+        self._pending = 0
+        self._batching = False
+        self.flushes = 0
+        self.commands = 0
+        self.errors = 0
+        self.latency = TimingHistogram()
+
+    def __getattr__(self, name):
+        return getattr(self._pi, name)
+
+    def begin_batch(self):
+        self._batching = True
+
+    def _queue(self, cmd, p1, p2, p3=0, extension=b""):
+        self._buffer += _PI_CMD.pack(cmd, p1, p2, p3)
+        if extension:
+            self._buffer += extension
+        self._pending += 1
+        return 0
+
+    def write(self, pin, level):
+        if not self._batching:
+            return self._pi.write(pin, level)
+        return self._queue(_PI_CMD_WRITE, pin, level)
+
+    def set_servo_pulsewidth(self, pin, pulsewidth):
+        if not self._batching:
+            return self._pi.set_servo_pulsewidth(pin, pulsewidth)
+        return self._queue(_PI_CMD_SERVO, pin, int(pulsewidth))
+
+    def hardware_PWM(self, pin, frequency, duty):
+        if not self._batching:
+            return self._pi.hardware_PWM(pin, frequency, duty)
+        return self._queue(_PI_CMD_HP, pin, int(frequency), _PI_EXT_U32.size, _PI_EXT_U32.pack(int(duty)))
+
+    def set_mode(self, pin, mode):
+        # Moduswechsel nur bei der Einrichtung – Reihenfolge zu gepufferten Befehlen wahren
+        self.flush(keep_batching=self._batching)
+        return self._pi.set_mode(pin, mode)
+
+    def flush(self, *, keep_batching=False):
+        """Sendet alle gepufferten Befehle und wertet die Antworten aus."""
+        self._batching = keep_batching
+        count = self._pending
+        if not count:
+            return 0
+        payload = bytes(self._buffer)
+        self._buffer.clear()
+        self._pending = 0
+        t0 = time.perf_counter()
+        expected = count * _PI_REPLY.size
+        sock = self._sl.s
+        with self._sl.l:
+            sock.sendall(payload)
+            replies = bytearray()
+            while len(replies) < expected:
+                chunk = sock.recv(expected - len(replies))
+                if not chunk:
+                    raise OSError("pigpiod hat die Verbindung geschlossen")
+                replies += chunk
+        self.latency.add(time.perf_counter() - t0)
+        self.flushes += 1
+        self.commands += count
+        failed = 0
+        for offset in range(0, expected, _PI_REPLY.size):
+            if _PI_REPLY.unpack_from(replies, offset)[3] < 0:
+                failed += 1
+        if failed:
+            self.errors += failed
+            print(f"[pigpio] {failed} von {count} Ausgabebefehlen abgelehnt", file=sys.stderr)
+        return count
+
+    def reset_stats(self):
+        self.flushes = 0
+        self.commands = 0
+        self.errors = 0
+        self.latency.reset()
+
+    def stats(self):
+        return {
+            "batched": True,
+            "flushes": self.flushes,
+            "commands": self.commands,
+            "commands_per_flush": round(self.commands / self.flushes, 2) if self.flushes else None,
+            "errors": self.errors,
+            "flush_latency": self.latency.snapshot(),
+        }
+
+
+class MemoryOutput:
+    """Ausgabetreiber ohne Hardware: merkt sich den Zustand je Pin und protokolliert alle Befehle."""
+
+    connected = True
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self.writes = []
+        self.state = {}
+
+    def _log(self, kind, pin, value):
+        self.writes.append((self._clock(), kind, pin, value))
+        self.state[(kind, pin)] = value
+        return 0
+
+    def set_mode(self, pin, mode):
+        return self._log("mode", pin, mode)
+
+    def write(self, pin, level):
+        return self._log("write", pin, level)
+
+    def hardware_PWM(self, pin, frequency, duty):
+        return self._log("pwm", pin, duty)
+
+    def set_servo_pulsewidth(self, pin, pulsewidth):
+        return self._log("servo", pin, pulsewidth)
+
+    def stop(self):
+        return None
+
+
+def _detect_gpio_base(gpio_root):
+    """Ermittelt die sysfs-Nummer von GPIO 0 des SoC-Controllers (neuere Kernel: 512)."""
+    try:
+        chips = [name for name in os.listdir(gpio_root) if name.startswith("gpiochip")]
+    except OSError:
+        return 0
+    for chip in chips:
+        try:
+            label = Path(gpio_root, chip, "label").read_text().strip()
+            base = int(Path(gpio_root, chip, "base").read_text().strip())
+        except (OSError, ValueError):
+            continue
+        if label.startswith("pinctrl-bcm") or label.startswith("pinctrl-rp1"):
+            return base
+    return 0
+
+
+class SysfsPwmOutput:
+    """Ausgabetreiber über das Kernel-PWM-Subsystem (``/sys/class/pwm``), ohne pigpiod.
+
+    Servos und Motor-PWM laufen auf den Hardware-PWM-Kanälen aus ``OUTPUT_SYSFS_PWM_CHANNELS``,
+    DIR-Pins über ``/sys/class/gpio``. Alle Attributdateien bleiben geöffnet, jeder Befehl
+    ist ein einzelnes ``pwrite``; unveränderte Werte werden nicht erneut geschrieben.
+    """
+
+    connected = True
+
+    def __init__(self, *, pwm_root=OUTPUT_SYSFS_PWM_ROOT, gpio_root=OUTPUT_SYSFS_GPIO_ROOT,
+                 channels=OUTPUT_SYSFS_PWM_CHANNELS, gpio_base=None):
+        self._pwm_root = pwm_root
+        self._gpio_root = gpio_root
+        self._channels = dict(channels)
+        self._gpio_base = _detect_gpio_base(gpio_root) if gpio_base is None else gpio_base
+        self._fds = {}
+        self._values = {}
+
+    def _write_attr(self, path, value):
+        data = str(value)
+        if self._values.get(path) == data:
+            return
+        fd = self._fds.get(path)
+        if fd is None:
+            fd = os.open(path, os.O_WRONLY)
+            self._fds[path] = fd
+        os.pwrite(fd, data.encode("ascii"), 0)
+        self._values[path] = data
+
+    @staticmethod
+    def _wait_for(path, timeout=1.0):
+        # Nach export legt der Kernel den Knoten an, udev setzt danach die Rechte
+        deadline = time.monotonic() + timeout
+        while not os.access(path, os.W_OK):
+            if time.monotonic() > deadline:
+                raise OSError(f"{path} nicht beschreibbar")
+            time.sleep(0.01)
+
+    def _pwm_dir(self, pin):
+        try:
+            chip, channel = self._channels[pin]
+        except KeyError:
+            raise ValueError(f"GPIO {pin} hat keinen Hardware-PWM-Kanal (OUTPUT_SYSFS_PWM_CHANNELS)") from None
+        chip_dir = os.path.join(self._pwm_root, f"pwmchip{chip}")
+        pwm_dir = os.path.join(chip_dir, f"pwm{channel}")
+        if not os.path.isdir(pwm_dir):
+            with open(os.path.join(chip_dir, "export"), "w") as fh:
+                fh.write(str(channel))
+            self._wait_for(os.path.join(pwm_dir, "enable"))
+        return pwm_dir
+
+    def _set_pwm(self, pin, period_ns, duty_ns):
+        pwm_dir = self._pwm_dir(pin)
+        if duty_ns <= 0:
+            self._write_attr(os.path.join(pwm_dir, "duty_cycle"), 0)
+            return
+        period_path = os.path.join(pwm_dir, "period")
+        duty_path = os.path.join(pwm_dir, "duty_cycle")
+        if self._values.get(period_path) != str(period_ns):
+            # Kernel verlangt duty_cycle <= period – vor Periodenwechsel zurücksetzen
+            self._write_attr(duty_path, 0)
+            self._write_attr(period_path, period_ns)
+        self._write_attr(duty_path, min(duty_ns, period_ns))
+        self._write_attr(os.path.join(pwm_dir, "enable"), 1)
+
+    def hardware_PWM(self, pin, frequency, duty):
+        period_ns = int(round(1_000_000_000 / frequency)) if frequency > 0 else 0
+        duty_ns = period_ns * int(duty) // 1_000_000
+        self._set_pwm(pin, period_ns, duty_ns)
+        return 0
+
+    def set_servo_pulsewidth(self, pin, pulsewidth):
+        # 0 = Servo stromlos (wie bei pigpio)
+        self._set_pwm(pin, 20_000_000, int(pulsewidth) * 1000)
+        return 0
+
+    def _gpio_dir(self, pin):
+        gpio_dir = os.path.join(self._gpio_root, f"gpio{self._gpio_base + pin}")
+        if not os.path.isdir(gpio_dir):
+            with open(os.path.join(self._gpio_root, "export"), "w") as fh:
+                fh.write(str(self._gpio_base + pin))
+            self._wait_for(os.path.join(gpio_dir, "value"))
+        return gpio_dir
+
+    def invalidate(self):
+        """Vergisst die zuletzt geschriebenen Werte (z. B. nachdem ein anderer Schreiber dazwischen war)."""
+        self._values.clear()
+
+    def set_mode(self, pin, mode):
+        if pin in self._channels:
+            return 0
+        self._write_attr(os.path.join(self._gpio_dir(pin), "direction"), "out" if mode == pigpio.OUTPUT else "in")
+        return 0
+
+    def write(self, pin, level):
+        self._write_attr(os.path.join(self._gpio_dir(pin), "value"), 1 if level else 0)
+        return 0
+
+    def stop(self):
+        for path in [path for path in self._fds if path.endswith(f"{os.sep}enable")]:
+            try:
+                self._write_attr(path, 0)
+            except OSError:
+                pass
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds.clear()
+        self._values.clear()
+
+
+OUTPUT_BACKENDS = ("pigpio", "sysfs", "memory")
+
+
+def open_output_driver(backend=OUTPUT_BACKEND):
+    """Öffnet den konfigurierten Ausgabetreiber; None, wenn er nicht verfügbar ist."""
+
+    if backend == "pigpio":
+        pi = pigpio.pi()
+        if not pi.connected:
+            print("pigpio läuft nicht. sudo systemctl start pigpiod", file=sys.stderr)
+            return None
+        return pi
+    if backend == "sysfs":
+        if not os.path.isdir(OUTPUT_SYSFS_PWM_ROOT):
+            print(f"Kein PWM-Subsystem unter {OUTPUT_SYSFS_PWM_ROOT} (dtoverlay=pwm-2chan?)", file=sys.stderr)
+            return None
+        missing = [
+            pin
+            for pin in [GPIO_PIN_SERVO, GPIO_PIN_HEAD] + [channel.get("pwm") for channel in MOTOR_DRIVER_CHANNELS]
+            if pin is not None and pin not in OUTPUT_SYSFS_PWM_CHANNELS
+        ]
+        if missing:
+            print(
+                f"sysfs-Ausgabe: GPIO {', '.join(str(pin) for pin in missing)} ohne Hardware-PWM-Kanal",
+                file=sys.stderr,
+            )
+            return None
+        return SysfsPwmOutput()
+    if backend == "memory":
+        return MemoryOutput()
+    print(f"Unbekannter Ausgabetreiber '{backend}' (erlaubt: {', '.join(OUTPUT_BACKENDS)})", file=sys.stderr)
+    return None
+
+
+def create_output(raw_pi):
+    """Baut die Ausgabekette: Treiber → Bündelung (nur pigpio) → Unterdrückung unveränderter Werte."""
+
+    out = raw_pi
+    if OUTPUT_BATCHING_ENABLED and hasattr(raw_pi, "sl"):
+        out = BatchedPigpioOutput(out)
+    if OUTPUT_COALESCE_ENABLED:
+        out = CoalescingOutput(out)
+    return out
+
+
+_last_motor_directions = []
+_motor_reversal_until = None  # Gemeinsames Ende der Totzeit bei Richtungswechsel (monotone Uhr)
+
+
+def setup_motor_pins(pi):
+    global _last_motor_directions, _motor_reversal_until
+
+    _last_motor_directions = [None] * len(MOTOR_DRIVER_CHANNELS)
+    _motor_reversal_until = None
+    for channel in MOTOR_DRIVER_CHANNELS:
+        dir_pin = channel.get("dir")
+        pwm_pin = channel.get("pwm")
+        if dir_pin is not None:
+            pi.set_mode(dir_pin, pigpio.OUTPUT)
+            initial_dir = 0 if channel.get("forward_high", True) else 1
+            pi.write(dir_pin, initial_dir)
+        if pwm_pin is not None:
+            pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+
+
+def motor_reversal_pending():
+    """True, solange ein Richtungswechsel auf das Ende der Totzeit wartet."""
+    return _motor_reversal_until is not None
+
+
+def set_motor(pi, speed_norm, now=None):
+    """Setzt die Motorkanäle; Richtungswechsel laufen ohne Blockieren über die Schleifenuhr.
+
+    Bei einem Wechsel gehen alle PWM-Ausgänge auf 0, nach ``MOTOR_DIR_SWITCH_PAUSE_S``
+    (gemeinsam für alle Kanäle) werden die DIR-Pins umgeschaltet und die PWM fortgesetzt.
+    Bis dahin kehrt jeder Aufruf sofort zurück, Lenkung und Kopf laufen weiter.
+    """
+    global _motor_reversal_until
+
+    s = clamp(speed_norm, -1.0, +1.0)
+    if abs(s) < 1e-3:
+        for idx, channel in enumerate(MOTOR_DRIVER_CHANNELS):
+            pwm_pin = channel.get("pwm")
+            if pwm_pin is not None:
+                pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+            _last_motor_directions[idx] = None
+        _motor_reversal_until = None
+        return
+
+    if now is None:
+        now = time.monotonic()
+    direction = 1 if s > 0 else 0
+    duty = int(abs(s) * 1_000_000)   # pigpio hardware_PWM erwartet 0..1_000_000
+
+    desired_dirs = []
+    reversing = False
+    for idx, channel in enumerate(MOTOR_DRIVER_CHANNELS):
+        desired_dir = direction if channel.get("forward_high", True) else 1 - direction
+        desired_dirs.append(desired_dir)
+        last_dir = _last_motor_directions[idx]
+        if channel.get("dir") is not None and last_dir is not None and last_dir != desired_dir:
+            reversing = True
+
+    if reversing and MOTOR_DIR_SWITCH_PAUSE_S > 0:
+        if _motor_reversal_until is None:
+            _motor_reversal_until = now + MOTOR_DIR_SWITCH_PAUSE_S
+        if now < _motor_reversal_until:
+            # Totzeit: alle Kanäle stromlos halten, DIR noch nicht umschalten
+            for channel in MOTOR_DRIVER_CHANNELS:
+                pwm_pin = channel.get("pwm")
+                if pwm_pin is not None:
+                    pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+            return
+    # Totzeit abgelaufen oder Wechsel zurückgenommen
+    _motor_reversal_until = None
+
+    # Erst alle DIR-Pins umschalten, dann die PWM aller Kanäle freigeben
+    for idx, channel in enumerate(MOTOR_DRIVER_CHANNELS):
+        dir_pin = channel.get("dir")
+        if dir_pin is None:
+            continue
+        last_dir = _last_motor_directions[idx]
+        desired_dir = desired_dirs[idx]
+        if last_dir != desired_dir:
+            pwm_pin = channel.get("pwm")
+            if last_dir is not None and pwm_pin is not None:
+                pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+            pi.write(dir_pin, desired_dir)
+        _last_motor_directions[idx] = desired_dir
+
+    for channel in MOTOR_DRIVER_CHANNELS:
+        pwm_pin = channel.get("pwm")
+        if pwm_pin is not None:
+            pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, duty)
+
+
+# --------- Filterstufen ---------
+def create_mapping_engine():
+    """Lookup-Tabellen für das Achs-Mapping.
+
+    Lenkwinkeländerungen bauen die Tabellen in einem Hilfsthread neu – auch im RT-Kindprozess,
+    wo ``apply_steering_angles`` aus der Regelschleife heraus aufgerufen wird.
+    Freigeben mit ``release_mapping_engine``.
+    """
+
+    if not MAPPING_TABLES_ENABLED:
+        return None
+    engine = MappingEngine()
+    add_steering_angle_listener(engine.on_steering_angles)
+    return engine
+
+
+def release_mapping_engine(engine):
+    """Meldet die Tabellen von Lenkwinkeländerungen ab (z. B. nach einem Replay)."""
+    if engine is not None:
+        remove_steering_angle_listener(engine.on_steering_angles)
+
+
+def create_drive_stages():
+    """Erzeugt Lenk-, Motor- und Kopfstufe mit der aktuellen Konfiguration."""
+
+    steering = SteeringStage(
+        left_deg=LEFT_MAX_DEG,
+        mid_deg=MID_DEG,
+        right_deg=RIGHT_MAX_DEG,
+        deadzone_in=DEADZONE_IN,
+        deadzone_out=DEADZONE_OUT,
+        expo=EXPO_SERVO,
+        smooth_a=SMOOTH_A_SERVO,
+        rate_deg_s=RATE_DEG_S,
+        min_step_deg=MIN_STEP_DEG,
+        neutral_hold_s=NEUTRAL_HOLD_S,
+        center_snap_deg=CENTER_SNAP_DEG,
+        neutral_snap_s=NEUTRAL_SNAP_S,
+        safe_start_s=SERVO_SAFE_START_S,
+        arm_neutral_ms=SERVO_ARM_NEUTRAL_MS,
+        neutral_thresh=SERVO_NEUTRAL_THRESH,
+        period_s=LOOP_PERIOD_S,
+    )
+    motor = MotorStage(
+        deadzone=DEADZONE_MOTOR,
+        expo=EXPO_MOTOR,
+        smooth_a=SMOOTH_A_MOTOR,
+        rate_accel=RATE_ACCEL_UNITS_S,
+        rate_decel=RATE_DECEL_UNITS_S,
+        brake_latch_threshold=BRAKE_LATCH_THRESHOLD,
+        brake_rearm_forward_thresh=BRAKE_REARM_FORWARD_THRESH,
+        limit_forward=MOTOR_LIMIT_FWD,
+        limit_reverse=MOTOR_LIMIT_REV,
+        safe_start_s=MOTOR_SAFE_START_S,
+        arm_neutral_ms=MOTOR_ARM_NEUTRAL_MS,
+        neutral_thresh=MOTOR_NEUTRAL_THRESH,
+        period_s=LOOP_PERIOD_S,
+    )
+    head = HeadStage(
+        left_deg=HEAD_LEFT_DEG,
+        mid_deg=HEAD_CENTER_DEG,
+        right_deg=HEAD_RIGHT_DEG,
+        smooth_a=HEAD_SMOOTH_A,
+        rate_deg_s=HEAD_RATE_DEG_S,
+        safe_start_s=HEAD_SAFE_START_S,
+        update_hysteresis_deg=HEAD_UPDATE_HYSTERESIS_DEG,
+        period_s=LOOP_PERIOD_S,
+    )
+    return steering, motor, head
+
+
+class DriveSession:
+    """Fahrbetrieb mit einem verbundenen Gamepad: Events lesen, Stufen rechnen, Ausgänge setzen.
+
+    Gamepad, pigpio-Handle, Parameterquelle und Uhr werden übergeben, damit dieselbe
+    Verarbeitung auch mit Attrappen (Replay, Benchmarks) läuft. Mit ``settings``
+    (``SettingsSubscription``) kommen Einstellungsänderungen als Meldungen und werden
+    genau an der Taktgrenze übernommen; ohne wird ``params_source`` jeden Takt gefragt.
+    """
+
+    def __init__(
+        self,
+        dev,
+        pi,
+        stages,
+        *,
+        params_source,
+        button_callback=None,
+        triggers_enabled=False,
+        scheduler=None,
+        profiler=None,
+        recorder=None,
+        hotplug=None,
+        secondary=None,
+        arbiter=None,
+        mapping=None,
+        settings=None,
+        watchdog=None,
+        telemetry=None,
+        clock=time.monotonic,
+        verbose=True,
+    ):
+        self.dev = dev
+        self.pi = pi
+        self.steering, self.motor, self.head = stages
+        self._params_source = params_source
+        self._button_callback = button_callback
+        self.scheduler = scheduler if scheduler is not None else LoopScheduler(LOOP_PERIOD_S, clock=clock)
+        self.profiler = profiler if profiler is not None else LoopProfiler(enabled=False)
+        self.recorder = recorder
+        self.hotplug = hotplug
+        self.secondary = secondary
+        self._batch = pi if hasattr(pi, "begin_batch") else None
+        self.mapping = mapping
+        self.settings = settings
+        self.watchdog = watchdog
+        self.telemetry = telemetry
+        self._last_tick_now = None
+        self.steering_angles = (LEFT_MAX_DEG, MID_DEG, RIGHT_MAX_DEG)
+        self.arbiter = arbiter if arbiter is not None or secondary is None else InputArbiter()
+        self._clock = clock
+        self._verbose = verbose
+        self.device_path = getattr(dev, "path", None)
+
+        self.servo_axis_code, servo_axis_name = resolve_servo_axis(dev)
+        self.axis_center = getattr(ecodes, MOTOR_AXIS_CENTERED_NAME)
+        self.axis_gas = getattr(ecodes, MOTOR_AXIS_GAS_NAME)
+        self.axis_brake = getattr(ecodes, MOTOR_AXIS_BRAKE_NAME)
+
+        caps = dev.capabilities()
+        if ecodes.EV_ABS not in caps:
+            print("Kein EV_ABS – Controller-Modus prüfen!", file=sys.stderr)
+            sys.exit(1)
+
+        self.axis_cache = AxisStateCache(
+            dev,
+            (self.servo_axis_code, self.axis_center, self.axis_gas, self.axis_brake)
+            + tuple(BUTTON_CODE_TO_EVENT.get(code) for code in AXIS_BUTTON_CODE_SET),
+        )
+        self.axis_button_ranges = {}
+        self.axis_button_states = {}
+        self.axis_event_to_code = {}
+        if triggers_enabled:
+            for code in AXIS_BUTTON_CODE_SET:
+                event_code = BUTTON_CODE_TO_EVENT.get(code)
+                if event_code is None:
+                    continue
+                rng = get_abs_range(caps, event_code)
+                if rng is None:
+                    continue
+                self.axis_button_ranges[code] = rng
+                self.axis_event_to_code[event_code] = code
+                raw_initial = self.axis_cache.get(event_code)
+                if raw_initial is None:
+                    self.axis_button_states[code] = False
+                else:
+                    lo_axis, hi_axis = rng
+                    self.axis_button_states[code] = (
+                        norm_axis_trigger(raw_initial, lo_axis, hi_axis) >= AXIS_BUTTON_PRESS_THRESHOLD
+                    )
+
+        # Achsenbereiche
+        rng_servo  = get_abs_range(caps, self.servo_axis_code)
+        rng_center = get_abs_range(caps, self.axis_center)
+        rng_gas    = get_abs_range(caps, self.axis_gas)
+        rng_brake  = get_abs_range(caps, self.axis_brake)
+
+        if rng_servo is None:
+            print(f"Lenkachse ({servo_axis_name}) nicht gefunden!", file=sys.stderr)
+            sys.exit(1)
+
+        self.rng_servo = rng_servo
+        self.rng_center = rng_center
+        self.rng_gas = rng_gas
+        self.rng_brake = rng_brake
+
+        self._control_generation = None
+        self._last_print_ts = 0.0
+
+    def _log(self, message):
+        if self._verbose:
+            print(message)
+
+    def start(self, now):
+        """Setzt Stufen und Taktgeber zurück und fährt die Servos in die Mitte."""
+        self.steering_angles = (LEFT_MAX_DEG, MID_DEG, RIGHT_MAX_DEG)
+        self.steering.set_angles(*self.steering_angles)
+        if self.settings is not None:
+            # Ausgangszustand; spätere Änderungen liegen bereits in der Warteschlange
+            control_params = self._params_source()
+            self.motor.set_limits(control_params.motor_limit_forward, control_params.motor_limit_reverse)
+            self.head.set_angles(control_params.head_left, control_params.head_mid, control_params.head_right)
+        self.steering.reset(now)
+        self.motor.reset(now)
+        self.head.reset(now)
+
+        self.pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_lenkung(MID_DEG))
+        self.pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(self.head.current_deg))
+
+        if self.mapping is not None:
+            # Tabellen passend zu den absinfo-Bereichen dieses Gamepads
+            self.mapping.configure(
+                steering_range=self.rng_servo,
+                steering_invert=INVERT_SERVO,
+                steering_expo=EXPO_SERVO,
+                steering_angles=self.steering_angles,
+                center_range=self.rng_center,
+                center_invert=INVERT_MOTOR,
+                gas_range=self.rng_gas,
+                brake_range=self.rng_brake,
+                motor_deadzone=DEADZONE_MOTOR,
+                motor_expo=EXPO_MOTOR,
+                us_min=US_MIN,
+                us_max=US_MAX,
+                range_deg=SERVO_RANGE_DEG,
+            )
+
+        self._control_generation = None
+        self._last_print_ts = 0.0
+        self._last_tick_now = None
+        self.scheduler.reset(now)
+        if self.recorder is not None:
+            self.recorder.connect(now, self.dev, self._params_source())
+
+        self._log("Bereit. A = Zentrieren, Start = Beenden. D-Pad L/R setzt Kopf, D-Pad ↑ zentriert (latchend).")
+        self._log(
+            f"Motorachsen: centered={self.rng_center is not None} "
+            f"GAS={self.rng_gas is not None} BRAKE={self.rng_brake is not None}"
+        )
+
+    def recorded_params(self):
+        """Aktuell wirksame Parameter für den Parameter-Marker der Aufzeichnung."""
+        motor = self.motor
+        head = self.head
+        return {
+            "motor_limit_forward": motor.limit_forward,
+            "motor_limit_reverse": motor.limit_reverse,
+            "head_left": head.left_deg,
+            "head_mid": head.mid_deg,
+            "head_right": head.right_deg,
+            "steering_angles": list(self.steering_angles),
+        }
+
+    def _apply_settings_change(self, change):
+        kind, values = change
+        if kind == SETTINGS_MOTOR_LIMITS:
+            self.motor.set_limits(*values)
+        elif kind == SETTINGS_HEAD_ANGLES:
+            self.head.set_angles(*values)
+        elif kind == SETTINGS_STEERING_ANGLES:
+            self.steering_angles = values
+            self.steering.set_angles(*values)
+
+    def run(self):
+        """Regelschleife bis zur Trennung (endet mit ``GamepadDisconnected``)."""
+        now = self._clock()
+        self.start(now)
+        scheduler = self.scheduler
+        hotplug = self.hotplug
+        watchdog = self.watchdog
+        wait_for_input = lambda timeout: wait_for_gamepad_input(self.dev, timeout, hotplug)  # noqa: E731
+        wait_for_hotplug = lambda timeout: wait_for_gamepad_input(None, timeout, hotplug)  # noqa: E731
+        if watchdog is not None:
+            watchdog.arm(now)
+        try:
+            while True:
+                self.tick(self._clock())
+                if LOOP_EVENT_DRIVEN:
+                    # Sofort bei neuen Events weiter, spätestens aber zur nächsten Deadline
+                    scheduler.wait(wait_for_input, min_gap=LOOP_MIN_EVENT_GAP_S)
+                elif hotplug is not None:
+                    scheduler.wait(wait_for_hotplug)
+                else:
+                    scheduler.wait()
+        finally:
+            if watchdog is not None:
+                watchdog.disarm()
+
+    def tick(self, now):
+        """Ein Durchlauf der Regelschleife zum Zeitpunkt ``now``."""
+        batch = self._batch
+        if batch is None:
+            self._tick(now)
+            return
+        batch.begin_batch()
+        try:
+            self._tick(now)
+        finally:
+            # Auch bei Trennung mitten im Takt nichts im Puffer liegen lassen
+            batch.flush()
+
+    def _tick(self, now):
+        t_start = time.perf_counter()
+        dev = self.dev
+        pi = self.pi
+        steering = self.steering
+        motor = self.motor
+        head = self.head
+        axis_cache = self.axis_cache
+
+        if self.watchdog is not None and self.watchdog.beat(now):
+            # Watchdog hat Motor/Servos über seine Verbindung neutral gesetzt:
+            # gemerkte Ausgabewerte verwerfen, Motor erst nach Neutralstellung wieder scharf
+            invalidate = getattr(pi, "invalidate", None)
+            if invalidate is not None:
+                invalidate()
+            motor.reset(now)
+
+        if self.device_path:
+            if self.hotplug is not None:
+                if self.hotplug.removed(self.device_path):
+                    raise GamepadDisconnected
+            elif not os.path.exists(self.device_path):
+                raise GamepadDisconnected
+
+        params_changed = False
+        if self.settings is not None:
+            # Änderungen aus dem Web-Thread gesammelt an der Taktgrenze übernehmen
+            for change in self.settings.drain():
+                self._apply_settings_change(change)
+                params_changed = True
+        else:
+            # Parameter nur bei neuer Generation übernehmen (bereits validiert)
+            control_params = self._params_source()
+            if control_params.generation != self._control_generation:
+                # Erste Übernahme nach start() steht schon im Verbindungs-Marker
+                params_changed = self._control_generation is not None
+                self._control_generation = control_params.generation
+                motor.set_limits(control_params.motor_limit_forward, control_params.motor_limit_reverse)
+                head.set_angles(control_params.head_left, control_params.head_mid, control_params.head_right)
+            angles = (LEFT_MAX_DEG, MID_DEG, RIGHT_MAX_DEG)
+            if angles != self.steering_angles:
+                self.steering_angles = angles
+                steering.set_angles(*angles)
+                params_changed = True
+        if params_changed and self.recorder is not None:
+            self.recorder.params(now, self.recorded_params())
+
+        # Events (Buttons & Kopfsteuerung)
+        head_command = None
+        recorder = self.recorder
+        axis_event_to_code = self.axis_event_to_code
+        try:
+            e = dev.read_one()
+            while e:
+                if recorder is not None:
+                    recorder.event(now, e)
+                axis_cache.handle_event(e)
+                if e.type == ecodes.EV_ABS:
+                    if head.accepts_input(now):
+                        # Kopfservo LATCHEND via D-Pad:
+                        if e.code == ecodes.ABS_HAT0X:
+                            if   e.value == -1: head_command = head.left_deg
+                            elif e.value ==  1: head_command = head.right_deg
+                        elif e.code == ecodes.ABS_HAT0Y:
+                            if e.value == -1: head_command = head.mid_deg
+                    if axis_event_to_code:
+                        axis_code = axis_event_to_code.get(e.code)
+                        if axis_code and axis_code in self.axis_button_ranges:
+                            lo_axis, hi_axis = self.axis_button_ranges[axis_code]
+                            value_norm = norm_axis_trigger(e.value, lo_axis, hi_axis)
+                            if self.axis_button_states.get(axis_code):
+                                if value_norm <= AXIS_BUTTON_RELEASE_THRESHOLD:
+                                    self.axis_button_states[axis_code] = False
+                            else:
+                                if value_norm >= AXIS_BUTTON_PRESS_THRESHOLD:
+                                    self.axis_button_states[axis_code] = True
+                                    self._on_button(axis_code)
+                if e.type == ecodes.EV_KEY and e.value == 1:
+                    button_code = BUTTON_EVENT_TO_CODE.get(e.code)
+                    if button_code:
+                        self._on_button(button_code)
+
+                e = dev.read_one()
+        except OSError as exc:
+            print(f"[Gamepad] Lesefehler: {exc}")
+            raise GamepadDisconnected from None
+
+        # Zusatz-Controller: Werte aus den Slots der Leser-Threads, Zuordnung per Arbiter
+        owners = None
+        if self.secondary is not None:
+            slots = self.secondary.slots()
+            if slots:
+                owners = self.arbiter.resolve(now, slots)
+                head_command = self._drain_secondary(now, slots, owners["head"], head_command)
+
+        t_events = time.perf_counter()
+
+        # Tabellen-Snapshot für diesen Tick; ein Neubau ersetzt nur die Referenz
+        tables = self.mapping.tables if self.mapping is not None else None
+        angles = self.steering_angles
+
+        # ===== Lenkservo =====
+        raw_s = axis_cache.get(self.servo_axis_code)
+        x = 0.0
+        precomputed = None
+        # None nur, solange die Achse noch nie einen Wert hatte – dann Lenkung mittig.
+        # Trennungen erkennen Hotplug-/Pfadprüfung und Lesefehler im Event-Strom.
+        if raw_s is not None:
+            steering_table = tables.steering if tables is not None else None
+            if steering_table is not None and steering_table.angles == angles:
+                x, precomputed = steering_table.lookup(raw_s)
+            else:
+                lo_s, hi_s = self.rng_servo
+                x = norm_axis_centered(raw_s, lo_s, hi_s)
+                if INVERT_SERVO:
+                    x = -x
+        if owners is not None and owners["steering"] is not None:
+            sample = owners["steering"].sample
+            if sample.steer is not None:
+                x = sample.steer
+                precomputed = None
+        current_deg = steering.step(x, now, precomputed)
+
+        # Puls ausgeben
+        t_steer = time.perf_counter()
+        steer_pulse = tables.steer_pulse if tables is not None else None
+        if steer_pulse is not None and (steer_pulse.lo_deg, steer_pulse.hi_deg) == (angles[0], angles[2]):
+            pi.set_servo_pulsewidth(GPIO_PIN_SERVO, steer_pulse.lookup(current_deg))
+        else:
+            pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_unclamped(clamp(current_deg, angles[0], angles[2])))
+        t_steer_out = time.perf_counter()
+
+        # ===== Motor: kombiniert aus centered + GAS - BRAKE =====
+        y_centered = 0.0
+        gas        = 0.0
+        brake      = 0.0
+
+        if self.rng_center is not None:
+            raw_c = axis_cache.get(self.axis_center)
+            if raw_c is not None:
+                if tables is not None and tables.center is not None:
+                    y_centered = tables.center.lookup(raw_c)
+                else:
+                    y_centered = norm_axis_centered(raw_c, *self.rng_center)
+                    if INVERT_MOTOR:
+                        y_centered = -y_centered
+
+        if self.rng_gas is not None:
+            raw_g = axis_cache.get(self.axis_gas)
+            if raw_g is not None:
+                if tables is not None and tables.gas is not None:
+                    gas = tables.gas.lookup(raw_g)
+                else:
+                    gas = norm_axis_trigger(raw_g, *self.rng_gas)  # 0..1
+
+        if self.rng_brake is not None:
+            raw_b = axis_cache.get(self.axis_brake)
+            if raw_b is not None:
+                if tables is not None and tables.brake is not None:
+                    brake = tables.brake.lookup(raw_b)
+                else:
+                    brake = norm_axis_trigger(raw_b, *self.rng_brake)  # 0..1
+
+        if owners is not None and owners["motor"] is not None:
+            y_centered, gas, brake = owners["motor"].sample.motor
+
+        motor_shape = tables.motor_shape if tables is not None else None
+        motor_speed = motor.step(
+            (y_centered, gas, brake), now, motor_shape.lookup if motor_shape is not None else None
+        )
+
+        t_motor = time.perf_counter()
+        set_motor(pi, motor_speed, now)
+        t_motor_out = time.perf_counter()
+
+        # ===== Kopf-Servo (latchend) =====
+        head_out = head.step(head_command, now)
+
+        t_head = time.perf_counter()
+        if head_out is not None:
+            head_pulse = tables.head_pulse if tables is not None else None
+            if head_pulse is not None:
+                pi.set_servo_pulsewidth(GPIO_PIN_HEAD, head_pulse.lookup(head_out))
+            else:
+                pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(head_out))
+
+        if self._batch is not None:
+            self._batch.flush()
+
+        self.profiler.record_tick(
+            t_start, t_events, t_steer, t_steer_out, t_motor, t_motor_out, t_head, time.perf_counter()
+        )
+
+        telemetry = self.telemetry
+        if telemetry is not None:
+            last_now = self._last_tick_now
+            telemetry.record(
+                now,
+                (TelemetryRing.FLAG_STEERING_ARMED if steering.armed else 0)
+                | (TelemetryRing.FLAG_MOTOR_ARMED if motor.armed else 0)
+                | (TelemetryRing.FLAG_BRAKE_LATCHED if motor.brake_latched else 0),
+                steering.axis_value, y_centered, gas, brake,
+                steering.target_deg, current_deg,
+                motor.target, motor_speed,
+                head.target_deg, head.current_deg,
+                now - last_now if last_now is not None else 0.0,
+            )
+        self._last_tick_now = now
+
+        # Debug-Ausgabe
+        if DEBUG_PRINT_ENABLED and self._verbose and (now - self._last_print_ts) > PRINT_EVERY_S:
+            self._last_print_ts = now
+            armM = "ARMED" if motor.armed else "SAFE"
+            armS = "ARMED" if steering.armed else "SAFE"
+            print(
+                f"{armS}/{armM} | SERVO x={steering.axis_value:+.3f} tgt={steering.target_deg:6.1f}° pos={current_deg:6.1f}°  |  "
+                f"MOTOR tgt={motor.target:+.3f} out={motor_speed:+.3f}  |  "
+                f"HEAD tgt={head.target_deg:5.1f}° pos={head.current_deg:5.1f}°  |  "
+                f"LOOP overruns={self.scheduler.overruns} missed={self.scheduler.missed_ticks}"
+                + (f"  |  SRC {self.arbiter.sources}" if self.secondary is not None else "")
+            )
+
+    def _drain_secondary(self, now, slots, head_owner, head_command):
+        """Verarbeitet Buttons und Kopf-Kommandos der Zusatz-Controller."""
+        head = self.head
+        if head_owner is not None:
+            head_command = None
+        for slot in slots:
+            events = slot.events
+            while events:
+                kind, value = events.popleft()
+                if kind == "button":
+                    self._on_button(value)
+                elif slot is head_owner and head.accepts_input(now):
+                    if value == "left":
+                        head_command = head.left_deg
+                    elif value == "right":
+                        head_command = head.right_deg
+                    else:
+                        head_command = head.mid_deg
+        return head_command
+
+    def _on_button(self, button_code):
+        callback = self._button_callback
+        if callback is not None:
+            callback(button_code)
+
+
+def drive_forever(
+    pi,
+    stages,
+    *,
+    scheduler,
+    profiler,
+    params_source,
+    on_connected=None,
+    on_button=None,
+    on_disconnected=None,
+    recorder=None,
+    settings=None,
+    watchdog=None,
+    telemetry=None,
+):
+    """Wartet auf ein Gamepad, fährt bis zur Trennung und beginnt von vorn (Ende nur per KeyboardInterrupt)."""
+
+    hotplug = InputHotplugWatcher.open() if HOTPLUG_INOTIFY_ENABLED else None
+    discovery = GamepadDiscovery()
+    secondary = None
+    if SECONDARY_GAMEPADS_ENABLED:
+        secondary = SecondaryInputManager()
+    mapping = create_mapping_engine()
+    try:
+        _drive_forever(
+            pi,
+            stages,
+            scheduler=scheduler,
+            profiler=profiler,
+            params_source=params_source,
+            on_connected=on_connected,
+            on_button=on_button,
+            on_disconnected=on_disconnected,
+            recorder=recorder,
+            hotplug=hotplug,
+            discovery=discovery,
+            secondary=secondary,
+            mapping=mapping,
+            settings=settings,
+            watchdog=watchdog,
+            telemetry=telemetry,
+        )
+    finally:
+        if secondary is not None:
+            secondary.stop()
+        if hotplug is not None:
+            hotplug.close()
+
+
+def _drive_forever(pi, stages, *, scheduler, profiler, params_source, on_connected, on_button,
+                   on_disconnected, recorder, hotplug, discovery, secondary, mapping=None, settings=None,
+                   watchdog=None, telemetry=None):
+    arbiter = InputArbiter() if secondary is not None else None
+    while True:
+        dev = find_gamepad(hotplug, discovery)
+        if hotplug is not None:
+            hotplug.forget()
+        if secondary is not None:
+            secondary.set_primary(dev.path)
+            secondary.start()
+        device_name = dev.name or ""
+        if on_connected is not None:
+            on_connected(device_name)
+
+        session = DriveSession(
+            dev,
+            pi,
+            stages,
+            params_source=params_source,
+            button_callback=on_button,
+            triggers_enabled=device_name == GAMEPAD_NAME_EXACT,
+            scheduler=scheduler,
+            profiler=profiler,
+            recorder=recorder,
+            hotplug=hotplug,
+            secondary=secondary,
+            arbiter=arbiter,
+            mapping=mapping,
+            settings=settings,
+            watchdog=watchdog,
+            telemetry=telemetry,
+        )
+        try:
+            session.run()
+        except GamepadDisconnected:
+            profiler.mark_gap()
+            print("Gamepad getrennt – warte auf erneute Verbindung …")
+            try:
+                dev.close()
+            except (OSError, AttributeError) as e:
+                print(f"[Gamepad] Fehler beim Schließen des Gamepad-Devices: {e}", file=sys.stderr)
+            set_motor(pi, 0.0)
+            pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_lenkung(MID_DEG))
+            pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(HEAD_CENTER_DEG))
+            if on_disconnected is not None:
+                on_disconnected()
+            if recorder is not None:
+                recorder.disconnect(time.monotonic())
+            time.sleep(0.5)
+
+
+def release_outputs(pi):
+    """Schaltet Servos und Motor stromlos (Programmende)."""
+
+    try:
+        pi.set_servo_pulsewidth(GPIO_PIN_SERVO, 0)
+        pi.set_servo_pulsewidth(GPIO_PIN_HEAD, 0)
+        set_motor(pi, 0.0)
+    except (OSError, AttributeError) as e:
+        print(f"[Cleanup] Fehler beim Freigeben von Servo/Motor: {e}", file=sys.stderr)
+
+
+def open_recorder(path):
+    if not path:
+        return None
+    try:
+        recorder = InputRecorder(path)
+    except OSError as exc:
+        print(f"[Recorder] Aufzeichnung nicht möglich: {exc}", file=sys.stderr)
+        return None
+    print(f"[Recorder] Zeichne Eingaben auf: {path}")
+    return recorder
+
+
+# --------- Watchdog ---------
+def force_outputs_neutral(pi):
+    """Motor-PWM auf 0, Lenkung und Kopf in die Mitte – ohne den Zustand von ``set_motor`` anzufassen."""
+
+    invalidate = getattr(pi, "invalidate", None)
+    if invalidate is not None:
+        invalidate()
+    for channel in MOTOR_DRIVER_CHANNELS:
+        pwm_pin = channel.get("pwm")
+        if pwm_pin is not None:
+            pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+    pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_lenkung(MID_DEG))
+    pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(HEAD_CENTER_DEG))
+
+
+class LoopWatchdog:
+    """Überwacht den Takt der Regelschleife aus einem eigenen Thread.
+
+    Die Schleife meldet jeden Durchlauf per ``beat(now)`` (nur eine Zuweisung). Bleibt der
+    Takt länger als ``deadline_s`` aus, schaltet der Watchdog über eine eigene Ausgabe-
+    verbindung den Motor ab und die Servos neutral – ein blockierter pigpio-Socket der
+    Schleife hält ihn nicht auf. Jede Auslösung wird mit Zeitpunkt und Stillstandsdauer
+    protokolliert, die Abstände zwischen zwei Takten landen in einem Histogramm.
+    """
+
+    GAP_EDGES_US = (10000, 20000, 30000, 50000, 100000, 150000, 250000, 500000, 1000000, 2000000)
+
+    def __init__(self, output, *, deadline_s=WATCHDOG_DEADLINE_S, log_size=WATCHDOG_TRIP_LOG_SIZE,
+                 clock=time.monotonic):
+        self._output = output
+        self.deadline_s = float(deadline_s)
+        self._clock = clock
+        self._armed = False
+        self._last_beat = None
+        self._tripped_at = None
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._log_lock = threading.Lock()
+        self.trips = deque(maxlen=log_size)
+        self.trip_count = 0
+        self.gaps = TimingHistogram(self.GAP_EDGES_US)
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """Beendet den Thread und schließt die eigene Ausgabeverbindung."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        try:
+            self._output.stop()
+        except (OSError, AttributeError) as e:
+            print(f"[Watchdog] Fehler beim Schließen der Ausgabeverbindung: {e}", file=sys.stderr)
+
+    def arm(self, now):
+        """Beginnt die Überwachung (Sitzungsstart)."""
+        self._last_beat = now
+        self._tripped_at = None
+        self._armed = True
+
+    def disarm(self):
+        """Beendet die Überwachung (Sitzungsende, Warten auf das Gamepad)."""
+        self._armed = False
+
+    def beat(self, now):
+        """Herzschlag aus der Schleife; True, wenn der Watchdog seit dem letzten Takt ausgelöst hat."""
+        last = self._last_beat
+        self._last_beat = now
+        if last is not None:
+            self.gaps.add(now - last)
+        if self._tripped_at is None:
+            return False
+        self._recovered(now, last)
+        return True
+
+    def _recovered(self, now, last):
+        self._tripped_at = None
+        with self._log_lock:
+            if self.trips and self.trips[-1]["stall_s"] is None and last is not None:
+                self.trips[-1]["stall_s"] = round(now - last, 4)
+        print("[Watchdog] Regelschleife läuft wieder", file=sys.stderr)
+
+    def _run(self):
+        interval = max(0.005, self.deadline_s / 4.0)
+        while not self._stop_event.wait(interval):
+            if not self._armed or self._tripped_at is not None:
+                continue
+            last = self._last_beat
+            if last is None:
+                continue
+            now = self._clock()
+            late = now - last
+            if late > self.deadline_s:
+                self._trip(now, late)
+
+    def _trip(self, now, late):
+        self._tripped_at = now
+        self.trip_count += 1
+        t_write = time.perf_counter()
+        error = None
+        try:
+            force_outputs_neutral(self._output)
+        except (OSError, AttributeError, ValueError) as exc:
+            error = str(exc)
+        write_s = time.perf_counter() - t_write
+        with self._log_lock:
+            self.trips.append(
+                {
+                    "time": round(time.time(), 3),
+                    "late_s": round(late, 4),
+                    "write_s": round(write_s, 6),
+                    "stall_s": None,  # wird bei Wiederanlauf ergänzt
+                    "error": error,
+                }
+            )
+        print(
+            f"[Watchdog] Kein Takt seit {late * 1000:.0f} ms – Motor aus, Servos neutral"
+            + (f" (Fehler: {error})" if error else ""),
+            file=sys.stderr,
+        )
+
+    def reset_stats(self):
+        with self._log_lock:
+            self.trips.clear()
+        self.trip_count = 0
+        self.gaps.reset()
+
+    def stats(self):
+        with self._log_lock:
+            trips = [dict(trip) for trip in self.trips]
+        return {
+            "deadline_ms": round(self.deadline_s * 1000.0, 1),
+            "armed": self._armed,
+            "tripped": self._tripped_at is not None,
+            "trip_count": self.trip_count,
+            "trips": trips,
+            "gaps": self.gaps.snapshot(),
+        }
+
+
+def start_watchdog():
+    """Startet den Watchdog mit eigener Ausgabeverbindung; None, wenn abgeschaltet oder nicht möglich."""
+
+    if not WATCHDOG_ENABLED:
+        return None
+    output = open_output_driver(OUTPUT_BACKEND)
+    if output is None:
+        print("[Watchdog] Keine eigene Ausgabeverbindung – Watchdog inaktiv", file=sys.stderr)
+        return None
+    watchdog = LoopWatchdog(output)
+    watchdog.start()
+    return watchdog
+
+
+# --------- Aufzeichnung & Replay ---------
+RECORDING_MAGIC = b"SAWREC1\n"
+RECORD_MARKER = 0xFFFF
+RECORD_MARKER_CONNECT = 1
+RECORD_MARKER_DISCONNECT = 2
+RECORD_MARKER_PARAMS = 3
+_RECORD_STRUCT = struct.Struct("<dHHi")  # Zeitstempel, Typ, Code, Wert – 16 Byte pro Event
+
+
+class InputRecorder:
+    """Schreibt alle Gamepad-Events der Regelschleife in eine kompakte Binärdatei.
+
+    Jeder Datensatz enthält Zeitstempel (monotone Uhr), Typ, Code und Wert. Verbindungs-
+    Marker tragen zusätzlich JSON-Metadaten (Name, Achsbereiche, Startwerte, Parameter);
+    Parameter-Marker halten spätere Änderungen aus der Weboberfläche fest.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        is_new = not self.path.exists() or self.path.stat().st_size == 0
+        self._fh = open(self.path, "ab")
+        if is_new:
+            self._fh.write(RECORDING_MAGIC)
+
+    def connect(self, now, dev, params=None):
+        abs_info = {}
+        try:
+            for code, info in dev.capabilities().get(ecodes.EV_ABS, []):
+                try:
+                    abs_info[str(code)] = [info.min, info.max, info.value]
+                except AttributeError:
+                    continue
+        except OSError as exc:
+            print(f"[Recorder] Achsinformationen nicht lesbar: {exc}", file=sys.stderr)
+        meta = {
+            "name": dev.name or "",
+            "path": getattr(dev, "path", None),
+            "abs": abs_info,
+            "steering_angles": [LEFT_MAX_DEG, MID_DEG, RIGHT_MAX_DEG],
+            "params": params._asdict() if params is not None else None,
+        }
+        self._write_blob(now, RECORD_MARKER_CONNECT, meta)
+
+    def params(self, now, values):
+        """Parameteränderung während der Fahrt (Motorlimits, Kopf- und Lenkwinkel)."""
+        self._write_blob(now, RECORD_MARKER_PARAMS, values)
+
+    def _write_blob(self, now, marker, payload):
+        blob = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self._fh.write(_RECORD_STRUCT.pack(now, RECORD_MARKER, marker, len(blob)))
+        self._fh.write(blob)
+
+    def event(self, now, event):
+        self._fh.write(_RECORD_STRUCT.pack(now, event.type, event.code, event.value))
+
+    def disconnect(self, now):
+        self._fh.write(_RECORD_STRUCT.pack(now, RECORD_MARKER, RECORD_MARKER_DISCONNECT, 0))
+        self._fh.flush()
+
+    def close(self):
+        try:
+            self._fh.close()
+        except OSError as exc:
+            print(f"[Recorder] Fehler beim Schließen der Aufzeichnung: {exc}", file=sys.stderr)
+
+
+RecordedSession = namedtuple("RecordedSession", ("meta", "start", "events", "end", "params"))
+
+
+def read_recording(path):
+    """Liest eine Aufzeichnung und liefert die enthaltenen Verbindungen als ``RecordedSession``."""
+
+    data = Path(path).read_bytes()
+    if not data.startswith(RECORDING_MAGIC):
+        raise ValueError(f"Keine gültige Aufzeichnung: {path}")
+    offset = len(RECORDING_MAGIC)
+    size = _RECORD_STRUCT.size
+    sessions = []
+    current = None
+    while offset + size <= len(data):
+        ts, etype, code, value = _RECORD_STRUCT.unpack_from(data, offset)
+        offset += size
+        if etype == RECORD_MARKER:
+            if code in (RECORD_MARKER_CONNECT, RECORD_MARKER_PARAMS):
+                blob = data[offset:offset + value]
+                offset += value
+                try:
+                    meta = json.loads(blob.decode("utf-8"))
+                except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                    raise ValueError(f"Beschädigte Metadaten in {path}: {exc}") from None
+                if code == RECORD_MARKER_CONNECT:
+                    current = RecordedSession(meta, ts, [], None, [])
+                    sessions.append(current)
+                elif current is not None:
+                    current.params.append((ts, meta))
+            elif code == RECORD_MARKER_DISCONNECT and current is not None:
+                sessions[-1] = current._replace(end=ts)
+                current = None
+            continue
+        if current is not None:
+            current.events.append((ts, etype, code, value))
+    return sessions
+
+
+_ReplayAbsInfo = namedtuple("_ReplayAbsInfo", ("value", "min", "max"))
+_ReplayEvent = namedtuple("_ReplayEvent", ("type", "code", "value"))
+
+
+class ReplayInputDevice:
+    """InputDevice-Attrappe, die aufgezeichnete Events wiedergibt."""
+
+    path = None
+
+    def __init__(self, meta):
+        self.name = meta.get("name") or ""
+        self._abs = {}
+        for code, entry in (meta.get("abs") or {}).items():
+            lo, hi, value = entry
+            self._abs[int(code)] = [value, lo, hi]
+        self._pending = deque()
+
+    def capabilities(self):
+        return {
+            ecodes.EV_ABS: [(code, _ReplayAbsInfo(*entry)) for code, entry in sorted(self._abs.items())],
+            ecodes.EV_KEY: [],
+        }
+
+    def absinfo(self, code):
+        entry = self._abs.get(code)
+        if entry is None:
+            raise OSError(f"Achse {code} nicht aufgezeichnet")
+        return _ReplayAbsInfo(*entry)
+
+    def push(self, etype, code, value):
+        if etype == ecodes.EV_ABS and code in self._abs:
+            self._abs[code][0] = value
+        self._pending.append(_ReplayEvent(etype, code, value))
+
+    def read_one(self):
+        return self._pending.popleft() if self._pending else None
+
+    def close(self):
+        self._pending.clear()
+
+
+class VirtualClock:
+    """Manuell fortgeschaltete Uhr für Replay und Benchmarks."""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def replay_recording(path, *, event_driven=LOOP_EVENT_DRIVEN, period_s=LOOP_PERIOD_S):
+    """Spielt eine Aufzeichnung schneller als Echtzeit durch die Regelschleife.
+
+    Liefert je Verbindung die Ausgabebefehle als Liste ``(t, art, pin, wert)`` mit ``t``
+    relativ zum Verbindungsbeginn sowie die ausgelösten Button-Aktionen.
+    """
+
+    sessions = read_recording(path)
+    # Replay stellt die aufgezeichneten Lenkwinkel global ein – danach den alten Stand zurück
+    previous_angles = {"left": LEFT_MAX_DEG, "mid": MID_DEG, "right": RIGHT_MAX_DEG}
+    mapping = create_mapping_engine()
     try:
-        return dev.absinfo(code).value
-    except OSError:
-        return None
+        return [
+            _replay_session(recorded, mapping, event_driven=event_driven, period_s=period_s)
+            for recorded in sessions
+        ]
+    finally:
+        release_mapping_engine(mapping)
+        apply_steering_angles(previous_angles)
 
 
-# --------- pigpio / Motor-Pins ---------
-_last_motor_directions = []
+def _apply_recorded_steering_angles(angles):
+    if isinstance(angles, list) and len(angles) == 3:
+        apply_steering_angles({"left": angles[0], "mid": angles[1], "right": angles[2]})
 
 
-def setup_motor_pins(pi):
-    global _last_motor_directions
+def _recorded_control_parameters(generation, values, previous=None):
+    def pick(key, default):
+        value = values.get(key)
+        if value is not None:
+            return value
+        return getattr(previous, key) if previous is not None else default
 
-    _last_motor_directions = [None] * len(MOTOR_DRIVER_CHANNELS)
-    for channel in MOTOR_DRIVER_CHANNELS:
-        dir_pin = channel.get("dir")
-        pwm_pin = channel.get("pwm")
-        if dir_pin is not None:
-            pi.set_mode(dir_pin, pigpio.OUTPUT)
-            initial_dir = 0 if channel.get("forward_high", True) else 1
-            pi.write(dir_pin, initial_dir)
-        if pwm_pin is not None:
-            pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
+    return ControlParameters(
+        generation,
+        pick("motor_limit_forward", MOTOR_LIMIT_FWD),
+        pick("motor_limit_reverse", MOTOR_LIMIT_REV),
+        pick("head_left", HEAD_LEFT_DEG),
+        pick("head_mid", HEAD_CENTER_DEG),
+        pick("head_right", HEAD_RIGHT_DEG),
+    )
 
 
-def set_motor(pi, speed_norm):
-    global _last_motor_directions
+def _replay_session(recorded, mapping, *, event_driven, period_s):
+    """Eine aufgezeichnete Verbindung durch die Regelschleife; Parameter-Marker zum aufgezeichneten Takt."""
+
+    meta = recorded.meta
+    _apply_recorded_steering_angles(meta.get("steering_angles"))
+    current_params = [_recorded_control_parameters(1, meta.get("params") or {})]
+    param_changes = recorded.params
+    param_idx = 0
+
+    def apply_params_until(t):
+        # Marker wurden im Takt geschrieben, der die Änderung übernommen hat
+        nonlocal param_idx
+        while param_idx < len(param_changes) and param_changes[param_idx][0] <= t:
+            values = param_changes[param_idx][1]
+            previous = current_params[0]
+            current_params[0] = _recorded_control_parameters(previous.generation + 1, values, previous)
+            angles = values.get("steering_angles")
+            _apply_recorded_steering_angles(angles)
+            if mapping is not None and isinstance(angles, list) and len(angles) == 3:
+                # Replay soll deterministisch sein: nicht auf den Hilfsthread warten
+                mapping.update(steering_angles=tuple(angles))
+            param_idx += 1
+
+    clock = VirtualClock(recorded.start)
+    recording_pi = MemoryOutput(clock)
+    pi = CoalescingOutput(recording_pi, clock=clock) if OUTPUT_COALESCE_ENABLED else recording_pi
+    dev = ReplayInputDevice(meta)
+    buttons = []
+    setup_motor_pins(pi)
+    session = DriveSession(
+        dev,
+        pi,
+        create_drive_stages(),
+        params_source=lambda: current_params[0],
+        button_callback=lambda code: buttons.append((clock.now - recorded.start, code)),
+        triggers_enabled=dev.name == GAMEPAD_NAME_EXACT,
+        scheduler=LoopScheduler(period_s, clock=clock),
+        mapping=mapping,
+        clock=clock,
+        verbose=False,
+    )
+    session.start(recorded.start)
+    events = recorded.events
+    end = recorded.end if recorded.end is not None else (events[-1][0] if events else recorded.start)
+    next_tick = recorded.start + period_s
+    idx = 0
+    try:
+        while True:
+            next_event = events[idx][0] if idx < len(events) else None
+            if next_event is not None and next_event <= next_tick:
+                # Events tragen den Zeitstempel des Durchlaufs, der sie verarbeitet hat
+                while idx < len(events) and events[idx][0] <= next_event:
+                    _ts, etype, code, value = events[idx]
+                    dev.push(etype, code, value)
+                    idx += 1
+                if event_driven and next_event < next_tick:
+                    apply_params_until(next_event)
+                    clock.now = next_event
+                    session.tick(next_event)
+                continue
+            if next_tick > end:
+                break
+            apply_params_until(next_tick)
+            clock.now = next_tick
+            session.tick(next_tick)
+            next_tick += period_s
+    except GamepadDisconnected:
+        pass
+    set_motor(pi, 0.0)
+    return {
+        "name": meta.get("name"),
+        "writes": [(t - recorded.start, kind, pin, value) for t, kind, pin, value in recording_pi.writes],
+        "buttons": buttons,
+    }
 
-    s = clamp(speed_norm, -1.0, +1.0)
-    if abs(s) < 1e-3:
-        for idx, channel in enumerate(MOTOR_DRIVER_CHANNELS):
-            pwm_pin = channel.get("pwm")
-            if pwm_pin is not None:
-                pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
-            _last_motor_directions[idx] = None
-        return
 
-    direction = 1 if s > 0 else 0
-    duty = int(abs(s) * 1_000_000)   # pigpio hardware_PWM erwartet 0..1_000_000
+def run_replay(path, output=None):
+    """CLI-Einstieg für ``--replay``: gibt die Ausgabebefehle als CSV aus (Datei oder stdout)."""
 
-    for idx, channel in enumerate(MOTOR_DRIVER_CHANNELS):
-        dir_pin = channel.get("dir")
-        pwm_pin = channel.get("pwm")
-        forward_high = channel.get("forward_high", True)
-        desired_dir = direction if forward_high else 1 - direction
+    try:
+        results = replay_recording(path)
+    except (OSError, ValueError) as exc:
+        print(f"[Replay] {exc}", file=sys.stderr)
+        return 1
+    lines = ["session,t,kind,pin,value"]
+    for idx, result in enumerate(results):
+        for t, kind, pin, value in result["writes"]:
+            lines.append(f"{idx},{t:.6f},{kind},{pin},{value}")
+        for t, code in result["buttons"]:
+            lines.append(f"{idx},{t:.6f},button,,{code}")
+    text = "\n".join(lines) + "\n"
+    if output:
+        Path(output).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
+    total = sum(len(result["writes"]) for result in results)
+    print(f"[Replay] {len(results)} Verbindung(en), {total} Ausgabebefehle", file=sys.stderr)
+    return 0
 
-        if dir_pin is not None:
-            last_dir = _last_motor_directions[idx]
-            if last_dir is None:
-                pi.write(dir_pin, desired_dir)
-            elif desired_dir != last_dir:
-                if pwm_pin is not None:
-                    pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, 0)
-                if MOTOR_DIR_SWITCH_PAUSE_S > 0:
-                    time.sleep(MOTOR_DIR_SWITCH_PAUSE_S)
-                pi.write(dir_pin, desired_dir)
-            _last_motor_directions[idx] = desired_dir
 
-        if pwm_pin is not None:
-            pi.hardware_PWM(pwm_pin, PWM_FREQ_HZ, duty)
+# --------- Echtzeitprozess ---------
+_MCL_CURRENT = 1
+_MCL_FUTURE = 2
+
+
+def apply_realtime_settings(*, cpu_core=RT_CPU_CORE, priority=RT_SCHED_PRIORITY, lock_memory=RT_LOCK_MEMORY):
+    """Pinnt den aktuellen Prozess auf einen Kern, setzt SCHED_FIFO und sperrt den Speicher.
+
+    Jeder Schritt ist optional; fehlende Rechte werden gemeldet, der Prozess läuft dann normal weiter.
+    """
+
+    if cpu_core is not None:
+        try:
+            os.sched_setaffinity(0, {cpu_core})
+        except (AttributeError, OSError, ValueError) as exc:
+            print(f"[RT] CPU-Affinität auf Kern {cpu_core} nicht möglich: {exc}", file=sys.stderr)
+    if priority:
+        try:
+            os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+        except (AttributeError, OSError) as exc:
+            print(f"[RT] SCHED_FIFO (Priorität {priority}) nicht möglich: {exc}", file=sys.stderr)
+    if lock_memory:
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            if libc.mlockall(_MCL_CURRENT | _MCL_FUTURE) != 0:
+                err = ctypes.get_errno()
+                raise OSError(err, os.strerror(err))
+        except (AttributeError, OSError) as exc:
+            print(f"[RT] mlockall nicht möglich: {exc}", file=sys.stderr)
+
+
+class RtChildLink:
+    """Kindseite des IPC-Kanals zwischen Echtzeitprozess und Hauptprozess.
+
+    Nachrichten sind Tupel ``(art, daten)``. Vom Hauptprozess kommen ``params``,
+    ``steering``, ``gpio``, ``reset_timing`` und ``stop``; zurück gehen ``connected``,
+    ``button``, ``disconnected`` und ``timing``.
+    """
+
+    def __init__(self, conn, *, telemetry_source=None, on_gpio=None,
+                 interval_s=RT_TELEMETRY_INTERVAL_S, clock=time.monotonic):
+        self._conn = conn
+        self._params = None
+        self._telemetry_source = telemetry_source
+        self._on_gpio = on_gpio
+        self._interval_s = interval_s
+        self._clock = clock
+        self._next_telemetry = 0.0
+
+    def _parent_gone(self):
+        print("[RT] Hauptprozess nicht erreichbar – beende Regelschleife", file=sys.stderr)
+        raise KeyboardInterrupt
+
+    def _send(self, kind, payload=None):
+        try:
+            self._conn.send((kind, payload))
+        except (OSError, ValueError):
+            self._parent_gone()
+
+    def _handle(self, kind, payload):
+        if kind == "params":
+            self._params = payload
+        elif kind == "steering":
+            apply_steering_angles(payload)
+        elif kind == "gpio":
+            if apply_gpio_settings(payload) and self._on_gpio is not None:
+                self._on_gpio()
+        elif kind == "reset_timing":
+            if self._telemetry_source is not None:
+                self._telemetry_source.reset()
+        elif kind == "stop":
+            raise KeyboardInterrupt
+
+    def drain(self):
+        """Verarbeitet alle anstehenden Nachrichten, ohne zu blockieren."""
+        try:
+            while self._conn.poll():
+                kind, payload = self._conn.recv()
+                self._handle(kind, payload)
+        except (EOFError, OSError):
+            self._parent_gone()
+
+    def wait_for_params(self):
+        """Blockiert, bis der Hauptprozess die ersten Steuerparameter geschickt hat."""
+        while self._params is None:
+            try:
+                self._conn.poll(None)
+            except (EOFError, OSError):
+                self._parent_gone()
+            self.drain()
+        return self._params
+
+    def control_parameters(self):
+        """Parameterquelle für ``DriveSession``; verschickt nebenbei die Timing-Telemetrie."""
+        self.drain()
+        source = self._telemetry_source
+        if source is not None:
+            now = self._clock()
+            if now >= self._next_telemetry:
+                self._next_telemetry = now + self._interval_s
+                self._send("timing", source.snapshot())
+        return self._params
+
+    def connected(self, device_name):
+        self._send("connected", device_name)
+
+    def button(self, button_code):
+        self._send("button", button_code)
+
+    def disconnected(self):
+        self._send("disconnected")
+
+
+def _raise_keyboard_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _rt_process_main(conn, record_path, telemetry=None):
+    """Einstiegspunkt des Echtzeitprozesses: pigpio, Gamepad und Regelschleife."""
+
+    signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
+    apply_realtime_settings()
+
+    raw_pi = open_output_driver()
+    if raw_pi is None:
+        sys.exit(1)
+    pi = create_output(raw_pi)
+
+    setup_motor_pins(pi)
+    set_motor(pi, 0.0)
+
+    def reconfigure_pins():
+        setup_motor_pins(pi)
+        set_motor(pi, 0.0)
+
+    stages = create_drive_stages()
+    scheduler = LoopScheduler(LOOP_PERIOD_S)
+    watchdog = start_watchdog()
+    profiler = LoopProfiler(
+        scheduler=scheduler, output=pi if hasattr(pi, "stats") else None, watchdog=watchdog
+    )
+    link = RtChildLink(conn, telemetry_source=profiler, on_gpio=reconfigure_pins)
+    recorder = open_recorder(record_path)
+
+    try:
+        link.wait_for_params()
+        drive_forever(
+            pi,
+            stages,
+            scheduler=scheduler,
+            profiler=profiler,
+            params_source=link.control_parameters,
+            on_connected=link.connected,
+            on_button=link.button,
+            on_disconnected=link.disconnected,
+            recorder=recorder,
+            watchdog=watchdog,
+            telemetry=telemetry,
+        )
+    except KeyboardInterrupt:
+        print("[RT] Beende – Servo & Motor freigeben …")
+    finally:
+        release_outputs(pi)
+        if watchdog is not None:
+            watchdog.close()
+        raw_pi.stop()
+        if recorder is not None:
+            recorder.close()
+        conn.close()
+
+
+class RtProcessLink:
+    """Hauptprozess-Seite des Echtzeitprozesses.
+
+    Ein Hintergrund-Thread schickt geänderte Steuerparameter, Lenkwinkel und GPIO-Belegung
+    an den Echtzeitprozess und führt dessen Meldungen (Buttons, Verbindungsstatus) aus.
+    Für ``/api/timing`` verhält sich das Objekt wie ein ``LoopProfiler``.
+    """
+
+    def __init__(self, conn, process, *, params_source, on_connected=None, on_button=None,
+                 on_disconnected=None, poll_s=RT_LINK_POLL_S):
+        self._conn = conn
+        self.process = process
+        self._params_source = params_source
+        self._on_connected = on_connected
+        self._on_button = on_button
+        self._on_disconnected = on_disconnected
+        self._poll_s = poll_s
+        self._send_lock = threading.Lock()
+        self._timing = None
+        self._sent_generation = None
+        self._sent_steering = None
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="rt-link", daemon=True)
+        self._thread.start()
+
+    def _send(self, kind, payload=None):
+        with self._send_lock:
+            try:
+                self._conn.send((kind, payload))
+                return True
+            except (OSError, ValueError) as exc:
+                print(f"[RT] Nachricht an Echtzeitprozess fehlgeschlagen ({kind}): {exc}", file=sys.stderr)
+                return False
+
+    def send_gpio(self, settings):
+        return self._send("gpio", settings)
+
+    def _push_settings(self):
+        params = self._params_source()
+        if params.generation != self._sent_generation:
+            if self._send("params", params):
+                self._sent_generation = params.generation
+        steering = (LEFT_MAX_DEG, MID_DEG, RIGHT_MAX_DEG)
+        if steering != self._sent_steering:
+            if self._send("steering", {"left": steering[0], "mid": steering[1], "right": steering[2]}):
+                self._sent_steering = steering
+
+    def _dispatch(self, kind, payload):
+        if kind == "timing":
+            self._timing = payload
+        elif kind == "button":
+            if self._on_button is not None:
+                self._on_button(payload)
+        elif kind == "connected":
+            if self._on_connected is not None:
+                self._on_connected(payload)
+        elif kind == "disconnected":
+            if self._on_disconnected is not None:
+                self._on_disconnected()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._push_settings()
+            try:
+                if not self._conn.poll(self._poll_s):
+                    continue
+                kind, payload = self._conn.recv()
+            except (EOFError, OSError):
+                if not self._stop_event.is_set():
+                    print("[RT] Verbindung zum Echtzeitprozess beendet", file=sys.stderr)
+                return
+            try:
+                self._dispatch(kind, payload)
+            except Exception as exc:
+                print(f"[RT] Fehler bei Meldung {kind!r}: {exc}", file=sys.stderr)
+
+    def snapshot(self):
+        payload = dict(self._timing) if self._timing else {"enabled": False}
+        payload["rt_process"] = {"pid": self.process.pid, "alive": self.process.is_alive()}
+        return payload
+
+    def reset(self):
+        self._send("reset_timing")
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self.process.is_alive():
+            self._send("stop")
+            self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._conn.close()
+
+
+def start_rt_process(record_path=None, telemetry=None):
+    """Startet den Echtzeitprozess per fork – vor allen Threads des Hauptprozesses aufrufen.
+
+    ``telemetry`` (``TelemetryRing``) liegt in geteiltem Speicher und bleibt nach dem Fork
+    für den Webserver im Hauptprozess lesbar.
+    """
+
+    ctx = multiprocessing.get_context("fork")
+    parent_conn, child_conn = ctx.Pipe(duplex=True)
+    process = ctx.Process(
+        target=_rt_process_main,
+        args=(child_conn, record_path, telemetry),
+        name="saw-tricycle-rt",
+        daemon=True,
+    )
+    process.start()
+    child_conn.close()
+    return parent_conn, process
+
+
+# --------- Discovery-Benchmark ---------
+class _FakeInputNode:
+    """InputDevice-Attrappe mit simulierten Kosten für Öffnen und Capability-Abfrage."""
+
+    def __init__(self, path, identities, open_cost_s, caps_cost_s):
+        time.sleep(open_cost_s)
+        self.path = path
+        identity = identities.get(os.path.basename(path))
+        self._is_pad = identity is not None
+        if identity is None:
+            identity = GamepadIdentity("Fake HID Device", "usb-fake/input0", "")
+        self.name, self.phys, self.uniq = identity
+        self._caps_cost_s = caps_cost_s
+
+    def capabilities(self):
+        time.sleep(self._caps_cost_s)
+        if self._is_pad:
+            return {ecodes.EV_KEY: [], ecodes.EV_ABS: []}
+        return {ecodes.EV_KEY: []}
+
+    def close(self):
+        pass
+
+
+def _legacy_find(directory, opener):
+    """Nachbildung der bisherigen Suche: alle Knoten öffnen, nichts cachen, 0,5 s Pause."""
+    while True:
+        chosen = None
+        for name in sorted(os.listdir(directory)):
+            if not name.startswith("event"):
+                continue
+            try:
+                dev = opener(os.path.join(directory, name))
+                caps = dev.capabilities()
+            except OSError:
+                continue
+            if ecodes.EV_KEY in caps and (dev.name == GAMEPAD_NAME_EXACT or GAMEPAD_NAME_FALLBACK in dev.name):
+                chosen = dev
+        if chosen is not None:
+            return chosen
+        time.sleep(0.5)
+
+
+def benchmark_discovery(*, nodes=20, rounds=5, open_cost_s=0.003, caps_cost_s=0.001, seed=1):
+    """Misst Kaltstart-Suche und Wiederverbindungszeit mit Fake-Knoten in einem Temp-Verzeichnis."""
+
+    import random
+    import tempfile
+
+    rng = random.Random(seed)
+    pad = GamepadIdentity(GAMEPAD_NAME_EXACT, "bt-hci0", "e4:17:d8:00:00:01")
+    results = {}
+    for mode in ("legacy", "discovery"):
+        with tempfile.TemporaryDirectory() as directory:
+            identities = {}
+            for idx in range(nodes):
+                Path(directory, f"event{idx}").touch()
+            pad_node = f"event{nodes - 1}"
+            identities[pad_node] = pad
+
+            def opener(path):
+                if not os.path.exists(path):
+                    raise OSError(f"{path} existiert nicht")
+                return _FakeInputNode(path, identities, open_cost_s, caps_cost_s)
+
+            hotplug = InputHotplugWatcher.open(directory) if mode == "discovery" else None
+            discovery = GamepadDiscovery(directory=directory, opener=opener, verbose=False)
+            if mode == "discovery":
+                find = lambda: discovery.find(hotplug)  # noqa: E731
+            else:
+                find = lambda: _legacy_find(directory, opener)  # noqa: E731
+
+            t0 = time.perf_counter()
+            find()
+            cold_s = time.perf_counter() - t0
+
+            latencies = []
+            opened_before = discovery.opened
+            for round_idx in range(rounds):
+                os.remove(os.path.join(directory, pad_node))
+                del identities[pad_node]
+                pad_node = f"event{nodes + round_idx}"
+                created = {}
+
+                def replug(node=pad_node):
+                    identities[node] = pad
+                    Path(directory, node).touch()
+                    created["t"] = time.perf_counter()
+
+                timer = threading.Timer(rng.uniform(0.05, 0.5), replug)
+                timer.start()
+                find()
+                latencies.append(time.perf_counter() - created["t"])
+                timer.join()
+            if hotplug is not None:
+                hotplug.close()
+            latencies.sort()
+            results[mode] = {
+                "cold_scan_ms": round(cold_s * 1000.0, 2),
+                "reconnect_median_ms": round(latencies[len(latencies) // 2] * 1000.0, 2),
+                "reconnect_max_ms": round(latencies[-1] * 1000.0, 2),
+                "opens_per_reconnect": round((discovery.opened - opened_before) / rounds, 1) if mode == "discovery" else nodes,
+            }
+    return results
+
+
+def run_discovery_benchmark():
+    results = benchmark_discovery()
+    for mode, values in results.items():
+        print(
+            f"{mode:>10}: Kaltstart {values['cold_scan_ms']:7.2f} ms | Wiederverbindung "
+            f"Median {values['reconnect_median_ms']:7.2f} ms, max {values['reconnect_max_ms']:7.2f} ms | "
+            f"Öffnungen {values['opens_per_reconnect']}"
+        )
+    return 0
+
+
+# --------- Ausgabe-Benchmark ---------
+def _fake_sysfs_tree(root, channels, gpio_pins):
+    """Legt eine minimale /sys/class/pwm- und /sys/class/gpio-Struktur als Dateien an."""
+    pwm_root = os.path.join(root, "pwm")
+    gpio_root = os.path.join(root, "gpio")
+    for chip, channel in set(channels.values()):
+        pwm_dir = os.path.join(pwm_root, f"pwmchip{chip}", f"pwm{channel}")
+        os.makedirs(pwm_dir, exist_ok=True)
+        for attr in ("period", "duty_cycle", "enable"):
+            Path(pwm_dir, attr).write_text("0")
+    for pin in gpio_pins:
+        gpio_dir = os.path.join(gpio_root, f"gpio{pin}")
+        os.makedirs(gpio_dir, exist_ok=True)
+        for attr in ("direction", "value"):
+            Path(gpio_dir, attr).write_text("0")
+    return pwm_root, gpio_root
+
+
+def _benchmark_ticks(pi, ticks):
+    setup_motor_pins(pi)
+    batch = pi if hasattr(pi, "begin_batch") else None
+    t0 = time.perf_counter()
+    for idx in range(ticks):
+        phase = (idx % 200) / 200.0
+        if batch is not None:
+            batch.begin_batch()
+        pi.set_servo_pulsewidth(GPIO_PIN_SERVO, 1000 + int(1000 * phase))
+        set_motor(pi, math.sin(phase * 2.0 * math.pi) * 0.5, idx * LOOP_PERIOD_S)
+        pi.set_servo_pulsewidth(GPIO_PIN_HEAD, 1500)
+        if batch is not None:
+            batch.flush()
+    return (time.perf_counter() - t0) / ticks
+
+
+def benchmark_output(backends=("memory", "sysfs"), *, ticks=2000):
+    """Vergleicht Ausgabetreiber (roh und mit Ausgabekette) in µs pro Takt."""
+
+    import tempfile
+
+    results = {}
+    for backend in backends:
+        with tempfile.TemporaryDirectory() as root:
+            if backend == "sysfs":
+                # Datei-Attrappe: misst den Syscall-Pfad, nicht die Kernel-PWM selbst
+                pins = [GPIO_PIN_SERVO, GPIO_PIN_HEAD] + [
+                    channel["pwm"] for channel in MOTOR_DRIVER_CHANNELS if channel.get("pwm") is not None
+                ]
+                channels = {pin: (idx // 2, idx % 2) for idx, pin in enumerate(pins)}
+                dir_pins = [channel["dir"] for channel in MOTOR_DRIVER_CHANNELS if channel.get("dir") is not None]
+                pwm_root, gpio_root = _fake_sysfs_tree(root, channels, dir_pins)
+                factory = lambda: SysfsPwmOutput(  # noqa: E731
+                    pwm_root=pwm_root, gpio_root=gpio_root, channels=channels, gpio_base=0
+                )
+            elif backend == "pigpio":
+                factory = lambda: open_output_driver("pigpio")  # noqa: E731
+            else:
+                factory = MemoryOutput
+            entry = {}
+            for variant in ("raw", "chain"):
+                driver = factory()
+                if driver is None:
+                    break
+                pi = driver if variant == "raw" else create_output(driver)
+                entry[f"{variant}_us_per_tick"] = round(_benchmark_ticks(pi, ticks) * 1_000_000.0, 2)
+                driver.stop()
+            results[backend] = entry
+    return results
+
+
+def run_output_benchmark(backends):
+    for backend, values in benchmark_output(backends or ("memory", "sysfs")).items():
+        if not values:
+            print(f"{backend:>8}: nicht verfügbar")
+            continue
+        print(
+            f"{backend:>8}: roh {values['raw_us_per_tick']:8.2f} µs/Takt | "
+            f"mit Ausgabekette {values['chain_us_per_tick']:8.2f} µs/Takt"
+        )
+    return 0
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Saw-Tricycle Fahrsteuerung")
+    parser.add_argument("--record", metavar="DATEI", help="Gamepad-Events in DATEI aufzeichnen.")
+    parser.add_argument(
+        "--replay",
+        metavar="DATEI",
+        help="Aufzeichnung offline durch die Regelschleife schicken (ohne Hardware) und beenden.",
+    )
+    parser.add_argument(
+        "--replay-output",
+        metavar="CSV",
+        help="Ausgabebefehle des Replays in diese Datei statt nach stdout schreiben.",
+    )
+    parser.add_argument(
+        "--benchmark-output",
+        nargs="*",
+        choices=OUTPUT_BACKENDS,
+        metavar="TREIBER",
+        help="Ausgabetreiber vergleichen (Standard: memory sysfs; sysfs auf Datei-Attrappe) und beenden.",
+    )
+    parser.add_argument(
+        "--benchmark-discovery",
+        action="store_true",
+        help="Gamepad-Suche mit simulierten Geräteknoten vermessen und beenden.",
+    )
+    return parser.parse_args(argv)
 
 
 # --------- Main ---------
-def main():
+def main(argv=None):
+    args = parse_args(argv)
+    if args.replay:
+        return run_replay(args.replay, args.replay_output)
+    if args.benchmark_discovery:
+        return run_discovery_benchmark()
+    if args.benchmark_output is not None:
+        return run_output_benchmark(args.benchmark_output)
+    record_path = args.record
+
     persisted_steering = load_persisted_steering_angles()
     if not apply_steering_angles(persisted_steering):
         apply_steering_angles(DEFAULT_STEERING_ANGLES)
@@ -2990,21 +7075,29 @@ def main():
         apply_gpio_settings(DEFAULT_GPIO_SETTINGS)
     validate_configuration()
 
-    MOTOR_AXIS_CENTERED = getattr(ecodes, MOTOR_AXIS_CENTERED_NAME)
-    MOTOR_AXIS_GAS      = getattr(ecodes, MOTOR_AXIS_GAS_NAME)
-    MOTOR_AXIS_BRAKE    = getattr(ecodes, MOTOR_AXIS_BRAKE_NAME)
+    pi = raw_pi = None
+    profiler = watchdog = None
+    rt_conn = rt_process = rt_link = None
+    telemetry = create_telemetry_ring()
+    if RT_PROCESS_ENABLED:
+        # Fork vor dem Start aller Threads (Webserver, Batterie, pigpio-Callbacks)
+        rt_conn, rt_process = start_rt_process(record_path, telemetry)
+        print(f"Regelschleife läuft im Echtzeitprozess (PID {rt_process.pid})")
+    else:
+        raw_pi = open_output_driver()
+        if raw_pi is None:
+            sys.exit(1)
+        pi = create_output(raw_pi)
 
-    # pigpio
-    pi = pigpio.pi()
-    if not pi.connected:
-        print("pigpio läuft nicht. sudo systemctl start pigpiod", file=sys.stderr)
-        sys.exit(1)
+        setup_motor_pins(pi)
+        set_motor(pi, 0.0)
 
-    setup_motor_pins(pi)
-    set_motor(pi, 0.0)
-    safe_start_motor_until = time.monotonic() + MOTOR_SAFE_START_S
-    safe_start_servo_until = time.monotonic() + SERVO_SAFE_START_S
-    safe_start_head_until  = time.monotonic() + HEAD_SAFE_START_S
+        stages = create_drive_stages()
+        scheduler = LoopScheduler(LOOP_PERIOD_S)
+        watchdog = start_watchdog()
+        profiler = LoopProfiler(
+            scheduler=scheduler, output=pi if hasattr(pi, "stats") else None, watchdog=watchdog
+        )
 
     # Webserver für Remote-Steuerung
     persisted_audio = load_persisted_audio_state()
@@ -3020,6 +7113,8 @@ def main():
         if sanitized is None:
             return False
         apply_gpio_settings(sanitized)
+        if rt_link is not None:
+            return rt_link.send_gpio(sanitized)
         setup_motor_pins(pi)
         set_motor(pi, 0.0)
         return True
@@ -3043,21 +7138,6 @@ def main():
         gpio_apply_callback=apply_gpio_from_web,
         battery_monitor=battery_monitor,
     )
-    web_server = None
-    try:
-        port = web_state.get_web_port()
-        web_server = start_webserver(web_state, port=port)
-        print(f"Websteuerung aktiv: http://<IP>:{port}/ (Override schaltet Gamepad aus)")
-    except Exception as exc:
-        print(f"Webserver konnte nicht gestartet werden: {exc}", file=sys.stderr)
-        web_server = None
-
-    # Audioausgabe direkt beim Start anwenden
-    web_state.apply_current_audio_output()
-
-    startup_sound_path = web_state.get_startup_sound_path()
-    if startup_sound_path and os.path.isfile(startup_sound_path):
-        play_sound_switch(startup_sound_path, web_state.get_selected_alsa_device())
 
     def execute_disconnect_action():
         command = web_state.get_disconnect_command()
@@ -3094,401 +7174,89 @@ def main():
                     file=sys.stderr,
                 )
 
-    try:
-        while True:
-            dev = find_gamepad()
-            device_path = getattr(dev, "path", None)
-            device_name = dev.name or ""
-            if device_name == GAMEPAD_NAME_EXACT:
-                web_state.set_button_profile(include_triggers=True, enabled=True)
-            elif GAMEPAD_NAME_FALLBACK in device_name:
-                web_state.set_button_profile(include_triggers=False, enabled=False)
-            else:
-                web_state.set_button_profile(include_triggers=False, enabled=True)
-            triggers_enabled = device_name == GAMEPAD_NAME_EXACT
-            servo_axis_code, servo_axis_name = resolve_servo_axis(dev)
-
-            safe_start_motor_until = time.monotonic() + MOTOR_SAFE_START_S
-            safe_start_servo_until = time.monotonic() + SERVO_SAFE_START_S
-            safe_start_head_until  = time.monotonic() + HEAD_SAFE_START_S
-
-            connected_sound_path = web_state.get_connected_sound_path()
-            if connected_sound_path and os.path.isfile(connected_sound_path):
-                play_sound_switch(connected_sound_path, web_state.get_selected_alsa_device())
-
-            caps = dev.capabilities()
-            if ecodes.EV_ABS not in caps:
-                print("Kein EV_ABS – Controller-Modus prüfen!", file=sys.stderr)
-                sys.exit(1)
-
-            axis_button_ranges = {}
-            axis_button_states = {}
-            axis_event_to_code = {}
-            if triggers_enabled:
-                for code in AXIS_BUTTON_CODE_SET:
-                    event_code = BUTTON_CODE_TO_EVENT.get(code)
-                    if event_code is None:
-                        continue
-                    rng = get_abs_range(caps, event_code)
-                    if rng is None:
-                        continue
-                    axis_button_ranges[code] = rng
-                    axis_event_to_code[event_code] = code
-                    raw_initial = read_abs(dev, event_code)
-                    if raw_initial is None:
-                        axis_button_states[code] = False
-                    else:
-                        lo_axis, hi_axis = rng
-                        axis_button_states[code] = (
-                            norm_axis_trigger(raw_initial, lo_axis, hi_axis) >= AXIS_BUTTON_PRESS_THRESHOLD
-                        )
-
-            # Achsenbereiche
-            rng_servo  = get_abs_range(caps, servo_axis_code)
-            rng_center = get_abs_range(caps, MOTOR_AXIS_CENTERED)
-            rng_gas    = get_abs_range(caps, MOTOR_AXIS_GAS)
-            rng_brake  = get_abs_range(caps, MOTOR_AXIS_BRAKE)
-
-            if rng_servo is None:
-                print(f"Lenkachse ({servo_axis_name}) nicht gefunden!", file=sys.stderr)
-                sys.exit(1)
-
-            lo_s, hi_s = rng_servo
-            lo_c, hi_c = (rng_center if rng_center else (0, 0))
-            lo_g, hi_g = (rng_gas if rng_gas else (0, 0))
-            lo_b, hi_b = (rng_brake if rng_brake else (0, 0))
-
-            have_center = rng_center is not None
-            have_gas    = rng_gas    is not None
-            have_brake  = rng_brake  is not None
-
-            # Startzustände
-            current_deg      = MID_DEG
-            target_deg       = MID_DEG
-            ax_val_servo     = 0.0
-            last_active_ts   = time.monotonic()
-            last_zero_ts     = None
-            last_print_ts    = 0.0
-            last_loop_ts     = time.monotonic()
-            in_deadzone_hold = True
-
-            pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_lenkung(MID_DEG))
-
-            motor_speed  = 0.0
-            motor_target = 0.0
-            brake_latched = False
-
-            motor_armed        = False
-            neutral_ok_since_m = None
-            steer_armed        = False
-            neutral_ok_since_s = None
-
-            head_current     = clamp(HEAD_CENTER_DEG, HEAD_LEFT_DEG, HEAD_RIGHT_DEG)
-            head_target      = head_current
-            head_filtered    = head_current
-            head_motion_start = head_current
-            head_motion_end   = head_current
-            head_motion_start_ts = time.monotonic()
-            head_motion_duration = 0.0
-            head_last_sent   = head_current
-            pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(head_current))
-
-            missing_servo_reads = 0
-
-            print("Bereit. A = Zentrieren, Start = Beenden. D-Pad L/R setzt Kopf, D-Pad ↑ zentriert (latchend).")
-            print(f"Motorachsen: centered={have_center} GAS={have_gas} BRAKE={have_brake}")
+    def on_gamepad_connected(device_name):
+        if device_name == GAMEPAD_NAME_EXACT:
+            web_state.set_button_profile(include_triggers=True, enabled=True)
+        elif GAMEPAD_NAME_FALLBACK in device_name:
+            web_state.set_button_profile(include_triggers=False, enabled=False)
+        else:
+            web_state.set_button_profile(include_triggers=False, enabled=True)
+
+        connected_sound_path = web_state.get_connected_sound_path()
+        if connected_sound_path and os.path.isfile(connected_sound_path):
+            play_sound_switch(connected_sound_path, web_state.get_selected_alsa_device())
+
+    def on_gamepad_disconnected():
+        web_state.set_button_profile(include_triggers=False, enabled=True)
+        execute_disconnect_action()
+
+    if rt_process is not None:
+        rt_link = RtProcessLink(
+            rt_conn,
+            rt_process,
+            params_source=web_state.get_control_parameters,
+            on_connected=on_gamepad_connected,
+            on_button=run_button_action,
+            on_disconnected=on_gamepad_disconnected,
+        )
 
-            try:
-                while True:
-                    now = time.monotonic()
-                    dt = max(0.001, min(0.05, now - last_loop_ts))
-                    last_loop_ts = now
-
-                    if device_path and not os.path.exists(device_path):
-                        raise GamepadDisconnected
-
-                    control_snapshot = web_state.snapshot()
-                    head_snapshot = control_snapshot.get("head_angles")
-                    head_left = HEAD_LEFT_DEG
-                    head_mid = HEAD_CENTER_DEG
-                    head_right = HEAD_RIGHT_DEG
-                    if isinstance(head_snapshot, dict):
-                        left_val = head_snapshot.get("left")
-                        mid_val = head_snapshot.get("mid")
-                        right_val = head_snapshot.get("right")
-                        if isinstance(left_val, (int, float)) and math.isfinite(left_val):
-                            head_left = clamp(float(left_val), HEAD_LEFT_DEG, HEAD_RIGHT_DEG)
-                        if isinstance(mid_val, (int, float)) and math.isfinite(mid_val):
-                            head_mid = clamp(float(mid_val), HEAD_LEFT_DEG, HEAD_RIGHT_DEG)
-                        if isinstance(right_val, (int, float)) and math.isfinite(right_val):
-                            head_right = clamp(float(right_val), HEAD_LEFT_DEG, HEAD_RIGHT_DEG)
-
-                    # Events (Buttons & Kopfsteuerung)
-                    try:
-                        e = dev.read_one()
-                        while e:
-                            if e.type == ecodes.EV_ABS:
-                                if now >= safe_start_head_until:
-                                    # Kopfservo LATCHEND via D-Pad:
-                                    if e.code == ecodes.ABS_HAT0X:
-                                        if   e.value == -1: head_target = HEAD_LEFT_DEG
-                                        elif e.value ==  1: head_target = HEAD_RIGHT_DEG
-                                    elif e.code == ecodes.ABS_HAT0Y:
-                                        if e.value == -1: head_target = HEAD_CENTER_DEG
-                                if axis_event_to_code:
-                                    axis_code = axis_event_to_code.get(e.code)
-                                    if axis_code and axis_code in axis_button_ranges:
-                                        lo_axis, hi_axis = axis_button_ranges[axis_code]
-                                        value_norm = norm_axis_trigger(e.value, lo_axis, hi_axis)
-                                        if axis_button_states.get(axis_code):
-                                            if value_norm <= AXIS_BUTTON_RELEASE_THRESHOLD:
-                                                axis_button_states[axis_code] = False
-                                        else:
-                                            if value_norm >= AXIS_BUTTON_PRESS_THRESHOLD:
-                                                axis_button_states[axis_code] = True
-                                                run_button_action(axis_code)
-                            if e.type == ecodes.EV_KEY and e.value == 1:
-                                button_code = BUTTON_EVENT_TO_CODE.get(e.code)
-                                if button_code:
-                                    run_button_action(button_code)
-
-                            e = dev.read_one()
-                    except OSError as exc:
-                        print(f"[Gamepad] Lesefehler: {exc}")
-                        raise GamepadDisconnected from None
-
-                    # ===== Lenkservo =====
-                    raw_s = read_abs(dev, servo_axis_code)
-                    x = 0.0
-                    if raw_s is None:
-                        missing_servo_reads += 1
-                        if missing_servo_reads >= GAMEPAD_MAX_MISSING_SERVO_READS:
-                            raise GamepadDisconnected
-                    else:
-                        missing_servo_reads = 0
-                        x = norm_axis_centered(raw_s, lo_s, hi_s)
-                        if INVERT_SERVO:
-                            x = -x
-                    # Arming
-                    if abs(x) <= SERVO_NEUTRAL_THRESH:
-                        if neutral_ok_since_s is None:
-                            neutral_ok_since_s = now
-                        elif (now - neutral_ok_since_s) * 1000.0 >= SERVO_ARM_NEUTRAL_MS:
-                            steer_armed = True
-                    else:
-                        neutral_ok_since_s = None
+    web_server = None
+    try:
+        port = web_state.get_web_port()
+        web_server = start_webserver(
+            web_state, port=port, loop_profiler=rt_link or profiler, telemetry=telemetry
+        )
+        print(f"Websteuerung aktiv: http://<IP>:{port}/ (Override schaltet Gamepad aus)")
+    except Exception as exc:
+        print(f"Webserver konnte nicht gestartet werden: {exc}", file=sys.stderr)
+        web_server = None
 
-                    # Safe-Start / un-armed
-                    if (now < safe_start_servo_until) or (not steer_armed):
-                        ax_val_servo = 0.0
-                        target_deg   = MID_DEG
-                    else:
-                        ax_abs = abs(x)
-                        if in_deadzone_hold:
-                            if ax_abs >= DEADZONE_OUT:
-                                in_deadzone_hold = False
-                        else:
-                            if ax_abs <= DEADZONE_IN:
-                                in_deadzone_hold = True
-
-                        if in_deadzone_hold:
-                            shaped = 0.0
-                            if last_zero_ts is None:
-                                last_zero_ts = now
-                        else:
-                            shaped = shape_expo(x, EXPO_SERVO)
-                            last_zero_ts = None
-
-                        ax_val_servo = clamp(shaped, -1.0, +1.0)
-                        target_deg   = axis_to_deg_lenkung(ax_val_servo)
-                        if abs(ax_val_servo) > 0.01:
-                            last_active_ts = now
-
-                    # Auto-Zentrierung nach Inaktivität
-                    if (now - last_active_ts) > NEUTRAL_HOLD_S:
-                        target_deg = MID_DEG
-
-                    # Snap auf Mitte
-                    if target_deg == MID_DEG:
-                        if last_zero_ts is not None and (now - last_zero_ts) >= NEUTRAL_SNAP_S:
-                            current_deg = MID_DEG
-                        if abs(current_deg - MID_DEG) <= CENTER_SNAP_DEG:
-                            current_deg = MID_DEG
-
-                    # Sanftes Nachführen
-                    filtered_target = current_deg + (target_deg - current_deg) * SMOOTH_A_SERVO
-                    max_step = RATE_DEG_S * dt
-                    delta = clamp(filtered_target - current_deg, -max_step, +max_step)
-                    if 0 < abs(delta) < MIN_STEP_DEG:
-                        delta = MIN_STEP_DEG if delta > 0 else -MIN_STEP_DEG
-                    if (current_deg != MID_DEG) or (target_deg != MID_DEG):
-                        current_deg += delta
-
-                    # Puls ausgeben
-                    pi.set_servo_pulsewidth(
-                        GPIO_PIN_SERVO,
-                        deg_to_us_lenkung(current_deg if current_deg != MID_DEG else MID_DEG),
-                    )
+    # Audioausgabe direkt beim Start anwenden
+    web_state.apply_current_audio_output()
 
-                    # ===== Motor: kombiniert aus centered + GAS - BRAKE =====
-                    y_centered = 0.0
-                    gas        = 0.0
-                    brake      = 0.0
-                    forward_intent = 0.0
-
-                    if have_center:
-                        raw_c = read_abs(dev, MOTOR_AXIS_CENTERED)
-                        if raw_c is not None:
-                            y_centered = norm_axis_centered(raw_c, lo_c, hi_c)
-                            if INVERT_MOTOR:
-                                y_centered = -y_centered
-                            forward_intent = max(0.0, y_centered)
-
-                    if have_gas:
-                        raw_g = read_abs(dev, MOTOR_AXIS_GAS)
-                        if raw_g is not None:
-                            gas = norm_axis_trigger(raw_g, lo_g, hi_g)  # 0..1
-                            forward_intent = max(forward_intent, gas)
-
-                    if have_brake:
-                        raw_b = read_abs(dev, MOTOR_AXIS_BRAKE)
-                        if raw_b is not None:
-                            brake = norm_axis_trigger(raw_b, lo_b, hi_b)  # 0..1
-
-                    y_total = clamp(y_centered + gas - brake, -1.0, +1.0)
-                    if brake >= BRAKE_LATCH_THRESHOLD:
-                        brake_latched = True
-                    elif brake_latched and forward_intent >= BRAKE_REARM_FORWARD_THRESH:
-                        brake_latched = False
-
-                    if brake_latched and y_total > 0.0:
-                        y_total = min(y_total, 0.0)
-
-                    # Arming & Deadzone
-                    if abs(y_total) <= MOTOR_NEUTRAL_THRESH:
-                        if neutral_ok_since_m is None:
-                            neutral_ok_since_m = now
-                        elif (now - neutral_ok_since_m) * 1000.0 >= MOTOR_ARM_NEUTRAL_MS:
-                            motor_armed = True
-                    else:
-                        neutral_ok_since_m = None
-
-                    if motor_armed:
-                        if abs(y_total) < DEADZONE_MOTOR:
-                            y_shaped = 0.0
-                        else:
-                            sign = 1 if y_total >= 0 else -1
-                            denominator = 1 - DEADZONE_MOTOR
-                            if denominator <= 0.0:
-                                # Sicherheitscheck: wenn DEADZONE_MOTOR >= 1, verwende Rohwert
-                                y_shaped = sign
-                            else:
-                                y_eff = (abs(y_total) - DEADZONE_MOTOR) / denominator
-                                y_shaped = shape_expo(sign * y_eff, EXPO_MOTOR)
-                        motor_target = clamp(y_shaped, -1.0, +1.0)
-                    else:
-                        motor_target = 0.0
-
-                    # Filter + Safe-Start
-                    filtered_motor = motor_speed + (motor_target - motor_speed) * SMOOTH_A_MOTOR
-                    delta_u = filtered_motor - motor_speed
-                    max_rate = RATE_ACCEL_UNITS_S if delta_u >= 0 else RATE_DECEL_UNITS_S
-                    max_du = max_rate * dt
-                    step_u = clamp(delta_u, -max_du, +max_du)
-                    motor_speed += step_u
-
-                    if now < safe_start_motor_until:
-                        motor_speed = 0.0
-                        motor_target = 0.0
-
-                    # Limits
-                    limit_forward = MOTOR_LIMIT_FWD
-                    limit_reverse = MOTOR_LIMIT_REV
-                    limits_snapshot = control_snapshot.get("motor_limits")
-                    if isinstance(limits_snapshot, dict):
-                        forward_limit = sanitize_motor_limit(limits_snapshot.get("forward"))
-                        if forward_limit is not None:
-                            limit_forward = forward_limit
-                        reverse_limit = sanitize_motor_limit(limits_snapshot.get("reverse"))
-                        if reverse_limit is not None:
-                            limit_reverse = reverse_limit
-
-                    if motor_speed > 0:
-                        motor_speed = min(motor_speed, limit_forward)
-                    elif motor_speed < 0:
-                        motor_speed = max(motor_speed, -limit_reverse)
-
-                    set_motor(pi, motor_speed)
-
-                    # ===== Kopf-Servo (latchend) =====
-                    head_target = clamp(head_target, HEAD_LEFT_DEG, HEAD_RIGHT_DEG)
-                    head_filtered += (head_target - head_filtered) * HEAD_SMOOTH_A
-
-                    if abs(head_filtered - head_motion_end) > 1e-4:
-                        head_motion_start = head_current
-                        head_motion_end = head_filtered
-                        head_motion_start_ts = now
-                        distance = abs(head_motion_end - head_motion_start)
-                        if HEAD_RATE_DEG_S > 0:
-                            head_motion_duration = max(distance / HEAD_RATE_DEG_S, dt)
-                        else:
-                            head_motion_duration = 0.0
-
-                    if head_motion_duration <= 0.0 or abs(head_motion_end - head_motion_start) <= 1e-6:
-                        head_current = head_motion_end
-                    else:
-                        progress = clamp((now - head_motion_start_ts) / head_motion_duration, 0.0, 1.0)
-                        eased = progress * progress * (3.0 - 2.0 * progress)
-                        head_current = head_motion_start + (head_motion_end - head_motion_start) * eased
-
-                        if progress >= 1.0:
-                            head_motion_start = head_motion_end
-                            head_motion_duration = 0.0
-
-                    if abs(head_current - head_last_sent) >= HEAD_UPDATE_HYSTERESIS_DEG:
-                        pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(head_current))
-                        head_last_sent = head_current
-
-                    # Debug-Ausgabe
-                    if (now - last_print_ts) > PRINT_EVERY_S:
-                        last_print_ts = now
-                        armM = "ARMED" if motor_armed else "SAFE"
-                        armS = "ARMED" if steer_armed else "SAFE"
-                        print(
-                            f"{armS}/{armM} | SERVO x={ax_val_servo:+.3f} tgt={target_deg:6.1f}° pos={current_deg:6.1f}°  |  "
-                            f"MOTOR tgt={motor_target:+.3f} out={motor_speed:+.3f}  |  "
-                            f"HEAD tgt={head_target:5.1f}° pos={head_current:5.1f}°"
-                        )
-
-                    time.sleep(0.02)
-            except GamepadDisconnected:
-                web_state.set_button_profile(include_triggers=False, enabled=True)
-                print("Gamepad getrennt – warte auf erneute Verbindung …")
-                try:
-                    dev.close()
-                except (OSError, AttributeError) as e:
-                    print(f"[Gamepad] Fehler beim Schließen des Gamepad-Devices: {e}", file=sys.stderr)
-                set_motor(pi, 0.0)
-                pi.set_servo_pulsewidth(GPIO_PIN_SERVO, deg_to_us_lenkung(MID_DEG))
-                pi.set_servo_pulsewidth(GPIO_PIN_HEAD, deg_to_us_unclamped(HEAD_CENTER_DEG))
-                execute_disconnect_action()
-                safe_start_motor_until = time.monotonic() + MOTOR_SAFE_START_S
-                safe_start_servo_until = time.monotonic() + SERVO_SAFE_START_S
-                safe_start_head_until  = time.monotonic() + HEAD_SAFE_START_S
-                time.sleep(0.5)
-                continue
+    startup_sound_path = web_state.get_startup_sound_path()
+    if startup_sound_path and os.path.isfile(startup_sound_path):
+        play_sound_switch(startup_sound_path, web_state.get_selected_alsa_device())
 
+    recorder = None
+    exit_code = None
+    try:
+        if rt_link is not None:
+            rt_link.start()
+            while rt_process.is_alive():
+                rt_process.join(0.5)
+            print(f"Echtzeitprozess beendet (Exitcode {rt_process.exitcode})", file=sys.stderr)
+            exit_code = rt_process.exitcode or None
+        else:
+            recorder = open_recorder(record_path)
+            drive_forever(
+                pi,
+                stages,
+                scheduler=scheduler,
+                profiler=profiler,
+                params_source=web_state.get_control_parameters,
+                on_connected=on_gamepad_connected,
+                on_button=run_button_action,
+                on_disconnected=on_gamepad_disconnected,
+                recorder=recorder,
+                settings=web_state.subscribe(),
+                watchdog=watchdog,
+                telemetry=telemetry,
+            )
     except KeyboardInterrupt:
         print("\nBeende – Servo & Motor freigeben …")
     finally:
-        try:
-            pi.set_servo_pulsewidth(GPIO_PIN_SERVO, 0)
-            pi.set_servo_pulsewidth(GPIO_PIN_HEAD, 0)
-            set_motor(pi, 0.0)
-        except (OSError, AttributeError) as e:
-            print(f"[Cleanup] Fehler beim Freigeben von Servo/Motor: {e}", file=sys.stderr)
+        if rt_link is not None:
+            rt_link.stop()
+        else:
+            release_outputs(pi)
+        if watchdog is not None:
+            watchdog.close()
         stop_current_sound()
-        pi.stop()
+        if raw_pi is not None:
+            raw_pi.stop()
+        if recorder is not None:
+            recorder.close()
         try:
             web_server.shutdown()
             web_server.server_close()
@@ -3498,7 +7266,8 @@ def main():
             battery_monitor.stop()
         except (RuntimeError, AttributeError) as e:
             print(f"[Cleanup] Fehler beim Beenden des Battery-Monitors: {e}", file=sys.stderr)
+    return exit_code
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -1,7 +1,20 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
+import mimetypes
+from dataclasses import dataclass, field
 from functools import lru_cache
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:  # pragma: no cover - optional dependency
+    import brotli  # type: ignore
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None  # type: ignore
+
+# Preferred order when the client accepts several encodings.
+ENCODING_PREFERENCE = ("br", "gzip")
 
 
 @lru_cache(maxsize=None)
@@ -14,4 +27,78 @@ def load_asset(name: str) -> str:
     return path.read_text(encoding="utf-8")
 
 
-__all__ = ["load_asset"]
+@dataclass(frozen=True)
+class EncodedAsset:
+    """A bundled asset as ready-to-send bytes, with precompressed variants and strong ETags."""
+
+    name: str
+    content_type: str
+    digest: str
+    variants: Dict[Optional[str], bytes] = field(default_factory=dict)
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        # Each representation needs its own strong validator.
+        return f'"{self.digest}-{encoding}"' if encoding else f'"{self.digest}"'
+
+    def select(self, accept_encoding: Optional[str]) -> Tuple[Optional[str], bytes]:
+        """Pick the best variant for an ``Accept-Encoding`` header: ``(encoding, body)``."""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in ENCODING_PREFERENCE:
+            if encoding in self.variants and accepted.get(encoding, accepted.get("*", 0.0)) > 0.0:
+                return encoding, self.variants[encoding]
+        return None, self.variants[None]
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each coding in an ``Accept-Encoding`` header to its q-value."""
+    accepted: Dict[str, float] = {}
+    for item in (header or "").split(","):
+        coding, _sep, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        params = params.strip().replace(" ", "")
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[coding] = quality
+    return accepted
+
+
+@lru_cache(maxsize=None)
+def load_encoded_asset(name: str) -> EncodedAsset:
+    """Return a bundled asset encoded once as identity, gzip and (if available) brotli bytes."""
+    raw = load_asset(name).encode("utf-8")
+    content_type, _encoding = mimetypes.guess_type(name)
+    if content_type is None:
+        content_type = "application/octet-stream"
+    if content_type.startswith("text/"):
+        content_type = f"{content_type}; charset=utf-8"
+    variants: Dict[Optional[str], bytes] = {None: raw}
+    compressed = gzip.compress(raw, compresslevel=9, mtime=0)
+    if len(compressed) < len(raw):
+        variants["gzip"] = compressed
+    if brotli is not None:
+        compressed = brotli.compress(raw, quality=11)
+        if len(compressed) < len(raw):
+            variants["br"] = compressed
+    digest = hashlib.sha256(raw).hexdigest()[:20]
+    return EncodedAsset(name=name, content_type=content_type, digest=digest, variants=variants)
+
+
+def preload_assets(*names: str) -> None:
+    """Encode and compress the given assets up front so the first request does not pay for it."""
+    for name in names:
+        load_encoded_asset(name)
+
+
+__all__ = [
+    "EncodedAsset",
+    "load_asset",
+    "load_encoded_asset",
+    "parse_accept_encoding",
+    "preload_assets",
+]